@@ -0,0 +1,144 @@
+# ann_benchmark.py
+"""
+Offline recall and latency harness for the movie vector search.
+
+Encodes a held-out set of prompts, computes the exact top-k for each one by
+brute force over every movie vector, then runs QdrantDB.search_similar_movies
+with each search setting (hnsw_ef values, and exact search) and reports
+recall@k against the brute-force results together with search latency.
+
+Run from the backend/ folder against the configured Qdrant server:
+    python ann_benchmark.py --prompts ../data/eval_prompts.txt --k 10 --ef 16,32,64,128,256
+    python ann_benchmark.py --synthetic 5000 --stub-encoder --output ann.json
+
+Embedded stores (QDRANT_LOCATION, --synthetic) always search exhaustively, so
+they only exercise the harness; measure recall against a real server.
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from benchmark import build_catalog, install_stub_modules, percentile, seed_movies
+
+DEFAULT_PROMPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'eval_prompts.txt')
+
+
+def load_prompts(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def load_movie_vectors(db, batch_size=1024):
+    """Scroll every movie vector out of Qdrant as (point ids, normalized matrix)"""
+    from config import Config
+
+    ids, vectors = [], []
+    offset = None
+    while True:
+        points, offset = db._call('scroll',
+            collection_name=Config.MOVIES_COLLECTION,
+            limit=batch_size,
+            offset=offset,
+            with_payload=False,
+            with_vectors=True
+        )
+        for point in points:
+            ids.append(point.id)
+            vectors.append(point.vector)
+        if offset is None:
+            break
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return ids, matrix
+
+
+def exact_top_k(ids, matrix, queries, k):
+    """Brute-force cosine top-k point ids for each query"""
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ matrix.T
+    top = np.argsort(-scores, axis=1)[:, :k]
+    return [[ids[i] for i in row] for row in top]
+
+
+def evaluate(db, queries, truth, k, hnsw_ef=None, exact=None):
+    """Recall@k and per-query latency for one search setting"""
+    # One untimed query so connection setup doesn't land in the first sample
+    db.search_similar_movies(queries[0], limit=k, hnsw_ef=hnsw_ef, exact=exact)
+
+    recalls, latencies = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        results = db.search_similar_movies(query, limit=k, hnsw_ef=hnsw_ef, exact=exact)
+        latencies.append(time.perf_counter() - start)
+        found = {result.id for result in results}
+        recalls.append(len(found & set(expected)) / len(expected))
+
+    latencies.sort()
+    return {
+        'recall_at_k': round(float(np.mean(recalls)), 4),
+        'min_recall': round(float(np.min(recalls)), 4),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall/latency harness for HNSW search settings")
+    parser.add_argument('--prompts', default=DEFAULT_PROMPTS, help="Held-out prompts, one per line")
+    parser.add_argument('--k', type=int, default=10, help="Results per query")
+    parser.add_argument('--ef', default='16,32,64,128,256', help="Comma-separated hnsw_ef values to compare")
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help="Seed an embedded store with this many synthetic movies instead of using Qdrant")
+    parser.add_argument('--stub-encoder', action='store_true', help="Use a hash-based encoder instead of the real model")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write machine-readable results to this JSON file")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        os.environ['QDRANT_LOCATION'] = ':memory:'
+    if args.stub_encoder:
+        install_stub_modules(True)
+
+    from config import Config
+    from models import QdrantDB
+    from projection import VECTOR_DIM
+    from embedding_service import encode_text
+
+    db = QdrantDB()
+    if args.synthetic:
+        os.environ.setdefault('BENCH_EMBEDDING_DIM', str(Config.EMBEDDING_DIM))
+        seed_movies(db, build_catalog(args.synthetic, args.seed), VECTOR_DIM, args.seed)
+    if Config.QDRANT_LOCATION:
+        print("Note: embedded Qdrant ignores HNSW settings and always searches exhaustively")
+
+    prompts = load_prompts(args.prompts)
+    queries = np.stack([np.asarray(encode_text(prompt), dtype=np.float32) for prompt in prompts])
+    ids, matrix = load_movie_vectors(db)
+    truth = exact_top_k(ids, matrix, queries, args.k)
+    print(f"{len(prompts)} prompts, {len(ids)} movies, k={args.k}")
+
+    settings = [('default', {})]
+    settings += [(f"hnsw_ef={ef}", {'hnsw_ef': int(ef)}) for ef in args.ef.split(',') if ef]
+    settings += [('exact', {'exact': True})]
+
+    results = {}
+    print(f"\n{'setting':<14}{'recall@k':>10}{'min':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, params in settings:
+        result = evaluate(db, queries, truth, args.k, **params)
+        results[name] = result
+        print(f"{name:<14}{result['recall_at_k']:>10.4f}{result['min_recall']:>8.2f}"
+              f"{result['mean_ms']:>10.3f}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'k': args.k, 'prompts': len(prompts), 'movies': len(ids), 'settings': results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 #app.py
-from flask import Flask, request, jsonify, send_from_directory, Blueprint
+from flask import Flask, request, jsonify, send_from_directory, Blueprint, Response
 from flask_cors import CORS
 from functools import wraps
 import os
@@ -8,7 +8,12 @@ from config import Config
 from auth import register_user, login_user, verify_token
 from models import QdrantDB
 from embedding_service import compute_user_embedding
-from recommendation_service import wili_check, get_recommendations
+from recommendation_service import wili_check, get_recommendations, get_recommendation_page
+from feed_service import feed_worker, get_feed
+from similar_service import get_similar_movies
+from profiling import create_profiler
+from static_assets import static_assets
+import metrics
 
 app = Flask(__name__, static_folder='../frontend')
 app.config.from_object(Config)
@@ -17,6 +22,21 @@ app.config.from_object(Config)
 CORS(app, origins="*", supports_credentials=True)
 
 db = QdrantDB()
+profiler = create_profiler()
+
+@app.before_request
+def start_request_trace():
+    metrics.begin_request()
+    if profiler:
+        profiler.begin()
+
+@app.after_request
+def finish_request_trace(response):
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    trace = metrics.end_request(endpoint, request.method, response.status_code)
+    if profiler:
+        profiler.end(endpoint, trace)
+    return response
 
 # Create API blueprint
 api = Blueprint('api', __name__, url_prefix='/api')
@@ -131,31 +151,56 @@ def submit_survey():
     user_id = request.user['user_id']
     db.update_user_embedding(user_id, user_embedding)
     
+    # Rebuild the user's feed in the background
+    feed_worker.enqueue(user_id, selected_movie_ids)
+    
     return jsonify({
         'message': 'Survey completed successfully',
         'embedding_computed': True
     }), 200
 
+# Personalized feed
+@api.route('/feed', methods=['GET'])
+@token_required
+def get_user_feed():
+    """Get the user's precomputed feed"""
+    limit = request.args.get('limit', type=int)
+    
+    result, error = get_feed(request.user['user_id'], limit=limit)
+    
+    if error:
+        return jsonify({'error': error}), 404
+    
+    return jsonify(result), 200
+
+# More like this
+@api.route('/movies/<movie_id>/similar', methods=['GET'])
+@token_required
+def similar_movies(movie_id):
+    """Get the movies most similar to a given movie"""
+    limit = request.args.get('limit', default=Config.SIMILAR_MOVIES_LIMIT, type=int)
+    
+    result, error = get_similar_movies(movie_id, limit=max(limit, 1))
+    
+    if error:
+        return jsonify({'error': error}), 404
+    
+    return jsonify(result), 200
+
 # Use Case A: Wili check
 @api.route('/wili/check', methods=['POST'])
 @token_required
 def check_movie():
     """Check if user would like a specific movie"""
-    print("=== INSIDE check_movie FUNCTION ===")
     data = request.json
-    print(f"Request data: {data}")
     movie_title = data.get('movie_title')
-    print(f"Movie title: {movie_title}")
     
     if not movie_title:
         return jsonify({'error': 'Movie title is required'}), 400
     
     user_id = request.user['user_id']
-    print(f"User ID: {user_id}")
     
     result, error = wili_check(user_id, movie_title)
-    print(f"Result: {result}")
-    print(f"Error: {error}")
     
     if error:
         return jsonify({'error': error}), 404
@@ -166,27 +211,30 @@ def check_movie():
 @api.route('/recommendations', methods=['POST'])
 @token_required
 def get_movie_recommendations():
-    """Get movie recommendations based on prompt and filters"""
+    """Get movie recommendations based on prompt and filters, or the next page for a cursor"""
     data = request.json
     prompt = data.get('prompt')
+    cursor = data.get('cursor')
     min_rating = data.get('min_rating')
     min_release_date = data.get('min_release_date')
     genre = data.get('genre')
     
-    if not prompt:
+    if cursor:
+        page, error = get_recommendation_page(cursor)
+    elif not prompt:
         return jsonify({'error': 'Prompt is required'}), 400
-    
-    recommendations, error = get_recommendations(
-        user_prompt=prompt,
-        min_rating=min_rating,
-        min_release_date=min_release_date,
-        genre=genre
-    )
+    else:
+        page, error = get_recommendations(
+            user_prompt=prompt,
+            min_rating=min_rating,
+            min_release_date=min_release_date,
+            genre=genre
+        )
     
     if error:
         return jsonify({'error': error}), 400
     
-    return jsonify({'recommendations': recommendations}), 200
+    return jsonify(page), 200
 
 # Health check
 @api.route('/health', methods=['GET'])
@@ -196,10 +244,19 @@ def health_check():
 # Register blueprint BEFORE static routes
 app.register_blueprint(api)
 
+# Prometheus metrics
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 # Serve static files - MUST BE LAST
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
+    # Built frontend (build_static.py): served from memory with caching headers
+    if static_assets:
+        return static_assets.response(path or 'index.html', request)
+    
     if path == "":
         return send_from_directory(app.static_folder, 'index.html')
     else:
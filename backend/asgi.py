@@ -0,0 +1,180 @@
+# asgi.py
+"""
+Async (ASGI) serving mode.
+
+The recommendation, wili and survey endpoints are served by async handlers
+that await Qdrant and Gemini instead of holding a thread each; every other
+route (auth, metrics, static files) is delegated to the Flask app.
+
+Run from the backend/ folder:
+    python asgi.py
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+from functools import wraps
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from config import Config
+from auth import verify_token
+from app import app as flask_app
+from feed_service import feed_worker
+from async_recommendation_service import (
+    db, compute_user_embedding_async, wili_check_async, get_recommendations_async,
+    get_recommendation_page_async
+)
+import metrics
+
+
+def token_required(handler):
+    @wraps(handler)
+    async def decorated(request):
+        token = request.headers.get('Authorization')
+
+        if not token:
+            return JSONResponse({'error': 'Token is missing'}, status_code=401)
+
+        # Remove 'Bearer ' prefix if present
+        if token.startswith('Bearer '):
+            token = token[7:]
+
+        payload = verify_token(token)
+        if not payload:
+            return JSONResponse({'error': 'Token is invalid or expired'}, status_code=401)
+
+        request.state.user = payload
+        return await handler(request)
+
+    return decorated
+
+
+def traced(path):
+    """Record request metrics for an async handler the same way Flask's hooks do"""
+    def decorator(handler):
+        @wraps(handler)
+        async def wrapper(request):
+            metrics.begin_request()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            finally:
+                metrics.end_request(path, request.method, status)
+        return wrapper
+    return decorator
+
+
+@traced('/api/survey/movies')
+@token_required
+async def get_survey_movies(request):
+    """Get random movies for survey"""
+    exclude = request.query_params.get('exclude')
+    exclude_ids = exclude.split(',') if exclude else []
+
+    movies = await db.get_random_movies(count=Config.MOVIES_PER_ROUND, exclude_ids=exclude_ids)
+
+    movie_list = []
+    for movie in movies:
+        movie_list.append({
+            'movie_id': movie.payload['movie_id'],
+            'title': movie.payload['title'],
+            'genre': movie.payload.get('genre', 'N/A'),
+            'rating': movie.payload.get('rating', 'N/A'),
+            'release_date': movie.payload.get('release_date', 'N/A')
+        })
+
+    return JSONResponse({'movies': movie_list}, status_code=200)
+
+
+@traced('/api/survey/submit')
+@token_required
+async def submit_survey(request):
+    """Submit completed survey and compute user embedding"""
+    data = await request.json()
+    selected_movie_ids = data.get('movie_ids', [])
+
+    if len(selected_movie_ids) != Config.TOTAL_MOVIES_TO_SELECT:
+        return JSONResponse({
+            'error': f'Please select exactly {Config.TOTAL_MOVIES_TO_SELECT} movies'
+        }, status_code=400)
+
+    user_embedding = await compute_user_embedding_async(selected_movie_ids)
+
+    user_id = request.state.user['user_id']
+    await db.update_user_embedding(user_id, user_embedding)
+    feed_worker.enqueue(user_id, selected_movie_ids)
+
+    return JSONResponse({
+        'message': 'Survey completed successfully',
+        'embedding_computed': True
+    }, status_code=200)
+
+
+@traced('/api/wili/check')
+@token_required
+async def check_movie(request):
+    """Check if user would like a specific movie"""
+    data = await request.json()
+    movie_title = data.get('movie_title')
+
+    if not movie_title:
+        return JSONResponse({'error': 'Movie title is required'}, status_code=400)
+
+    result, error = await wili_check_async(request.state.user['user_id'], movie_title)
+
+    if error:
+        return JSONResponse({'error': error}, status_code=404)
+
+    return JSONResponse(result, status_code=200)
+
+
+@traced('/api/recommendations')
+@token_required
+async def get_movie_recommendations(request):
+    """Get movie recommendations based on prompt and filters, or the next page for a cursor"""
+    data = await request.json()
+    prompt = data.get('prompt')
+
+    if data.get('cursor'):
+        page, error = await get_recommendation_page_async(data['cursor'])
+    elif not prompt:
+        return JSONResponse({'error': 'Prompt is required'}, status_code=400)
+    else:
+        page, error = await get_recommendations_async(
+            user_prompt=prompt,
+            min_rating=data.get('min_rating'),
+            min_release_date=data.get('min_release_date'),
+            genre=data.get('genre')
+        )
+
+    if error:
+        return JSONResponse({'error': error}, status_code=400)
+
+    return JSONResponse(page, status_code=200)
+
+
+# Same CORS policy as the Flask app; OPTIONS is listed so preflights reach the middleware
+cors = [Middleware(CORSMiddleware, allow_origins=['*'], allow_credentials=True,
+                   allow_methods=['*'], allow_headers=['*'])]
+
+routes = [
+    Route('/api/survey/movies', get_survey_movies, methods=['GET', 'OPTIONS'], middleware=cors),
+    Route('/api/survey/submit', submit_survey, methods=['POST', 'OPTIONS'], middleware=cors),
+    Route('/api/wili/check', check_movie, methods=['POST', 'OPTIONS'], middleware=cors),
+    Route('/api/recommendations', get_movie_recommendations, methods=['POST', 'OPTIONS'], middleware=cors),
+    # Everything else (auth, feed, health, metrics, static files) stays on Flask
+    Mount('/', app=WSGIMiddleware(flask_app)),
+]
+
+app = Starlette(routes=routes)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host='0.0.0.0', port=5000)
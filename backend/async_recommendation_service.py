@@ -0,0 +1,350 @@
+# async_recommendation_service.py
+"""
+asyncio versions of the wili, recommendation and survey pipelines.
+
+They share prompt building, filtering and response formatting with
+recommendation_service, but await Qdrant and Gemini instead of blocking a
+thread, and run CPU-bound encoding on the dedicated encoding executor.
+"""
+import asyncio
+import contextvars
+import time
+import numpy as np
+from models import AsyncQdrantDB
+from embedding_service import encode_text_async, combine_embeddings, average_embeddings
+from config import Config
+from recommendation_service import (
+    gemini_model, load_movie_context, build_explanation_prompt, build_batch_explanation_prompt,
+    parse_batch_explanations, no_synopsis_explanation, fallback_explanation, find_mentioned_movie,
+    build_filters, format_recommendation, format_wili_result, recommendation_cache,
+    recommendation_cache_key, new_candidates, has_next_page, purge_due, next_cursor, cursor_live,
+    decode_cursor, candidate_page, scored_movies, EXPIRED_LIST_ERROR
+)
+from wili_calibration import wili_likelihood
+from cache import AsyncSingleFlight
+from llm_gateway import llm_gateway
+import metrics
+
+db = AsyncQdrantDB()
+recommendation_flight = AsyncSingleFlight()
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking call on the default executor, keeping the request's metrics context"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(None, context.run, fn, *args)
+
+
+async def compute_user_embedding_async(movie_ids):
+    """
+    Compute user embedding by averaging the embeddings of selected movies
+
+    Args:
+        movie_ids: List of movie IDs selected by the user
+
+    Returns:
+        numpy array of the averaged embedding
+    """
+    movies = await asyncio.gather(*(db.get_movie_by_id(movie_id) for movie_id in movie_ids))
+    embeddings = [movie.vector for movie in movies if movie and movie.vector]
+
+    return average_embeddings(embeddings)
+
+
+async def generate_explanation_async(movie_title, movie_id, user_prompt):
+    """
+    Generate AI explanation for why a movie was recommended
+
+    Args:
+        movie_title: Title of the recommended movie
+        movie_id: ID of the movie
+        user_prompt: User's original prompt
+
+    Returns:
+        AI-generated explanation string
+    """
+    with metrics.span('explanation'):
+        synopsis = await run_blocking(load_movie_context, movie_id)
+
+        if not synopsis:
+            return no_synopsis_explanation()
+
+        return await explain_with_synopsis_async(movie_title, synopsis, user_prompt)
+
+
+async def explain_with_synopsis_async(movie_title, synopsis, user_prompt):
+    """Ask Gemini to explain one recommendation whose synopsis is already loaded"""
+    prompt = build_explanation_prompt(movie_title, synopsis, user_prompt)
+
+    try:
+        with metrics.span('llm'):
+            response = await llm_gateway.generate_async(gemini_model, prompt)
+        return response.text
+    except Exception as e:
+        print(f"Error generating explanation: {e}")
+        return fallback_explanation(movie_title)
+
+
+async def generate_explanations_async(movies, user_prompt):
+    """
+    Generate AI explanations for several recommendations with one Gemini call
+
+    Movies the batched response does not cover are explained concurrently,
+    one call each.
+
+    Args:
+        movies: List of (movie_id, movie_title) tuples
+        user_prompt: User's original prompt
+
+    Returns:
+        Dictionary of movie ID to explanation string
+    """
+    with metrics.span('explanation'):
+        synopses = await asyncio.gather(*(run_blocking(load_movie_context, movie_id) for movie_id, _ in movies))
+
+        explanations = {}
+        pending = []
+        for (movie_id, movie_title), synopsis in zip(movies, synopses):
+            if synopsis:
+                pending.append((movie_id, movie_title, synopsis))
+            else:
+                explanations[movie_id] = no_synopsis_explanation()
+
+        if len(pending) > 1:
+            prompt = build_batch_explanation_prompt(pending, user_prompt)
+            try:
+                with metrics.span('llm'):
+                    response = await llm_gateway.generate_async(gemini_model, prompt)
+            except Exception as e:
+                print(f"Error generating explanations: {e}")
+                explanations.update({movie_id: fallback_explanation(title) for movie_id, title, _ in pending})
+                return explanations
+
+            parsed = parse_batch_explanations(response.text, [movie_id for movie_id, _, _ in pending])
+            if len(parsed) < len(pending):
+                metrics.record_error('llm_batch_parse')
+            explanations.update(parsed)
+
+        missing = [movie for movie in pending if movie[0] not in explanations]
+        fallbacks = await asyncio.gather(*(
+            explain_with_synopsis_async(movie_title, synopsis, user_prompt)
+            for _, movie_title, synopsis in missing
+        ))
+        explanations.update({movie_id: text for (movie_id, _, _), text in zip(missing, fallbacks)})
+
+        return explanations
+
+
+async def wili_check_async(user_id, movie_title):
+    """
+    Use Case A: Check if user would like a specific movie
+
+    Args:
+        user_id: User's ID
+        movie_title: Title of movie to check
+
+    Returns:
+        Dictionary with likelihood percentage and explanation
+    """
+    try:
+        user = await db.get_user_by_id(user_id)
+        if user is None:
+            return None, "User not found"
+
+        user_embedding = user.vector
+
+        # Check if user has completed survey; signup stores an all-zero profile
+        if user_embedding is None or not np.any(user_embedding):
+            return None, "Please complete the movie survey first to get personalized recommendations"
+
+        movie = await db.search_movie_by_title(movie_title)
+        if not movie:
+            return None, f"Movie '{movie_title}' not found in database"
+
+        movie = await db.get_movie_by_id(movie.payload['movie_id'])
+        if movie is None or movie.vector is None:
+            return None, f"Movie '{movie_title}' data is incomplete"
+
+        # The first check after a profile change scores the whole catalog; keep it off the event loop
+        likelihood = await run_blocking(wili_likelihood, user_embedding, movie.vector)
+        return format_wili_result(movie, likelihood), None
+
+    except Exception as e:
+        metrics.record_error('wili_check')
+        print(f"Error in wili_check_async: {e}")
+        return None, f"An error occurred: {str(e)}"
+
+
+async def explain_results_async(results, user_prompt):
+    """Format one page of search results, explaining only the movies on it"""
+    if Config.BATCH_EXPLANATIONS:
+        explanations = await generate_explanations_async(
+            [(result.payload['movie_id'], result.payload['title']) for result in results],
+            user_prompt
+        )
+        return [format_recommendation(result, explanations[result.payload['movie_id']])
+                for result in results]
+
+    # Explanations are independent, so request them concurrently
+    explanations = await asyncio.gather(*(
+        generate_explanation_async(result.payload['title'], result.payload['movie_id'], user_prompt)
+        for result in results
+    ))
+
+    return [format_recommendation(result, explanation)
+            for result, explanation in zip(results, explanations)]
+
+
+async def get_recommendations_async(user_prompt, min_rating=None, min_release_date=None, genre=None):
+    """
+    Use Case B: Get movie recommendations based on prompt and filters
+
+    Args:
+        user_prompt: User's text prompt
+        min_rating: Minimum rating filter (optional)
+        min_release_date: Minimum release date filter (optional)
+        genre: Genre filter (optional)
+
+    Returns:
+        Dictionary with the first page of recommendations and the cursor for the next one
+    """
+    try:
+        key = recommendation_cache_key(user_prompt, min_rating, min_release_date, genre)
+    except (TypeError, ValueError) as e:
+        return None, f"An error occurred: {str(e)}"
+
+    # The response cache is shared with the threaded pipeline
+    hit, page = recommendation_cache.get(key)
+    hit = hit and cursor_live(page)
+    metrics.record_cache('recommendations', hit)
+    if hit:
+        return page, None
+
+    async def compute():
+        with llm_gateway.request_scope() as llm_scope:
+            page, error = await _compute_recommendations_async(
+                user_prompt, min_rating, min_release_date, genre)
+        if error is None and not llm_scope.failed:
+            recommendation_cache.set(key, page)
+        return page, error
+
+    (page, error), shared = await recommendation_flight.do(key, compute)
+    if shared:
+        metrics.record_coalesced('recommendations')
+
+    return page, error
+
+
+async def _compute_recommendations_async(user_prompt, min_rating=None, min_release_date=None, genre=None):
+    """Run the encode, search and explanation pipeline for one request"""
+    try:
+        movie_mentioned = find_mentioned_movie(await db.list_movies(limit=100), user_prompt)
+
+        if movie_mentioned:
+            full_movie = await db.get_movie_by_id(movie_mentioned.payload['movie_id'])
+            movie_embedding = full_movie.vector
+
+            text_without_movie = user_prompt.lower().replace(movie_mentioned.payload['title'].lower(), '').strip()
+            if text_without_movie:
+                text_embedding = await encode_text_async(text_without_movie)
+                query_embedding = combine_embeddings(movie_embedding, text_embedding)
+            else:
+                query_embedding = movie_embedding
+        else:
+            query_embedding = await encode_text_async(user_prompt)
+
+        filter_param = build_filters(min_rating, min_release_date, genre)
+        results = await db.search_similar_movies(
+            query_embedding, filters=filter_param, limit=Config.RECOMMENDATION_CANDIDATES)
+        candidates = await store_candidates_async(user_prompt, query_embedding, results)
+
+        return {
+            'recommendations': await explain_results_async(results[:Config.RECOMMENDATION_PAGE_SIZE], user_prompt),
+            'next_cursor': next_cursor(candidates, 0)
+        }, None
+
+    except Exception as e:
+        metrics.record_error('recommendations')
+        print(f"Error in get_recommendations_async: {e}")
+        return None, f"An error occurred: {str(e)}"
+
+
+async def store_candidates_async(user_prompt, query_embedding, results):
+    """Rank-ordered candidates of a search, stored for later pages when there are any"""
+    candidates = new_candidates(user_prompt, results)
+    if has_next_page(candidates):
+        list_id = candidates['list_id']
+        await db.store_recommendation_list(list_id, query_embedding,
+                                           {k: v for k, v in candidates.items() if k != 'list_id'})
+        if purge_due():
+            await db.purge_recommendation_lists(int(time.time()), Config.RECOMMENDATION_LISTS_MAX)
+    return candidates
+
+
+async def load_candidates_async(list_id):
+    """
+    A stored candidate list
+
+    Returns:
+        Tuple of (candidates, error message)
+    """
+    stored = await db.get_recommendation_list(list_id)
+    if stored is None or stored['expires'] <= time.time():
+        return None, EXPIRED_LIST_ERROR
+    return dict(stored, list_id=list_id), None
+
+
+async def get_recommendation_page_async(cursor):
+    """
+    Serve a later page of recommendations from the candidate list behind a cursor
+
+    Args:
+        cursor: next_cursor from the previous page
+
+    Returns:
+        Dictionary with the page of recommendations and the cursor for the next one
+    """
+    decoded, error = decode_cursor(cursor)
+    if error:
+        return None, error
+    list_id, offset = decoded
+
+    key = ('page', list_id, offset)
+    hit, page = recommendation_cache.get(key)
+    metrics.record_cache('recommendations', hit)
+    if hit:
+        return page, None
+
+    async def compute():
+        with llm_gateway.request_scope() as llm_scope:
+            page, error = await _compute_recommendation_page_async(list_id, offset)
+        if error is None and not llm_scope.failed:
+            recommendation_cache.set(key, page)
+        return page, error
+
+    (page, error), shared = await recommendation_flight.do(key, compute)
+    if shared:
+        metrics.record_coalesced('recommendations')
+
+    return page, error
+
+
+async def _compute_recommendation_page_async(list_id, offset):
+    """Hydrate and explain one page of the stored candidate list behind a cursor"""
+    try:
+        candidates, error = await load_candidates_async(list_id)
+        if error:
+            return None, error
+        movie_ids, scores = candidate_page(candidates, offset)
+        results = scored_movies(await db.get_movies_by_movie_ids(movie_ids), movie_ids, scores)
+
+        return {
+            'recommendations': await explain_results_async(results, candidates['user_prompt']),
+            'next_cursor': next_cursor(candidates, offset)
+        }, None
+
+    except Exception as e:
+        metrics.record_error('recommendations')
+        print(f"Error in get_recommendation_page_async: {e}")
+        return None, f"An error occurred: {str(e)}"
@@ -3,14 +3,18 @@ import jwt
 from datetime import datetime, timedelta
 from config import Config
 from models import QdrantDB
+from projection import VECTOR_DIM
+import metrics
 
 bcrypt = Bcrypt()
 db = QdrantDB()
 
+@metrics.timed('bcrypt_hash')
 def hash_password(password):
     """Hash a password"""
     return bcrypt.generate_password_hash(password).decode('utf-8')
 
+@metrics.timed('bcrypt_check')
 def check_password(password_hash, password):
     """Verify a password against its hash"""
     return bcrypt.check_password_hash(password_hash, password)
@@ -43,7 +47,7 @@ def register_user(username, password):
     
     # For now, create a zero embedding (will be updated after survey)
     import numpy as np
-    zero_embedding = np.zeros(Config.EMBEDDING_DIM)
+    zero_embedding = np.zeros(VECTOR_DIM)
     
     # Hash password and create user
     password_hash = hash_password(password)
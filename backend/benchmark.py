@@ -0,0 +1,630 @@
+# benchmark.py
+"""
+End-to-end load and latency benchmark for the Wili API.
+
+Starts app.py against an in-memory Qdrant store seeded with a synthetic
+catalog and a stub Gemini model, replays a mix of signup, login, survey,
+wili and recommendation traffic at each concurrency level, and reports
+throughput plus p50/p95/p99 latency per endpoint and per internal stage.
+
+Run from the backend/ folder:
+    python benchmark.py --concurrency 1,8,32 --requests 300 --llm-latency-ms 400
+    python benchmark.py --stub-encoder --output bench.json --baseline previous.json
+"""
+import argparse
+import asyncio
+import hashlib
+import http.client
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+GENRES = ['action', 'adventure', 'animation', 'comedy', 'crime', 'drama', 'fantasy',
+          'horror', 'mystery', 'romance', 'sci-fi', 'thriller', 'war', 'western']
+TITLE_WORDS = ['Crimson', 'Silent', 'Broken', 'Electric', 'Hollow', 'Golden', 'Last',
+               'Midnight', 'Iron', 'Paper', 'Frozen', 'Burning', 'Velvet', 'Hidden',
+               'Distant', 'Wild', 'Neon', 'Glass', 'Savage', 'Quiet']
+TITLE_NOUNS = ['Harbor', 'Empire', 'Garden', 'Signal', 'Frontier', 'Orchard', 'Machine',
+               'Witness', 'Kingdom', 'Shadow', 'River', 'Station', 'Letter', 'Circus',
+               'Voyage', 'Prophet', 'Canyon', 'Reckoning', 'Choir', 'Labyrinth']
+PROMPTS = [
+    "I want a dark, dystopian movie with a slow burn mystery",
+    "Something funny and light to watch with my family tonight",
+    "A tense thriller with a great twist ending",
+    "An epic adventure with stunning visuals and a big score",
+    "A romantic drama that will make me cry",
+    "A clever heist movie with a charismatic crew",
+    "Something like {title} but more hopeful",
+    "Movies similar to {title}",
+]
+REVIEW_SENTENCES = [
+    "The cinematography is breathtaking and every frame feels deliberate.",
+    "The pacing drags in the middle but the final act more than makes up for it.",
+    "A career-best performance from the lead carries the whole film.",
+    "The score lingers long after the credits roll.",
+    "It never quite decides what kind of story it wants to tell.",
+    "Sharp dialogue and a surprisingly emotional core.",
+]
+
+# Default traffic mix (relative weights)
+DEFAULT_MIX = {
+    'signup': 5,
+    'login': 10,
+    'survey_movies': 10,
+    'survey_submit': 5,
+    'wili_check': 35,
+    'recommendations': 30,
+    'recommendations_next': 5,
+}
+
+
+# ---------- stubs ----------
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubGeminiModel:
+    """Stand-in for genai.GenerativeModel that sleeps instead of calling the API"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.prompt_chars = 0
+
+    # Same call signature the gateway uses with the pinned google-generativeai, so a
+    # keyword the SDK doesn't accept fails here too
+    def generate_content(self, prompt):
+        with self.lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+        time.sleep(self._delay())
+        self._maybe_fail()
+        return StubResponse(self._answer(prompt))
+
+    async def generate_content_async(self, prompt):
+        with self.lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        return StubResponse(self._answer(prompt))
+
+    def _answer(self, prompt):
+        explanation = "This movie matches the tone and themes of your request."
+        # Batched explanation prompts list one "Movie ID:" per movie and expect JSON back
+        movie_ids = re.findall(r"^Movie ID: (\S+)$", prompt, re.MULTILINE)
+        if movie_ids:
+            return "```json\n" + json.dumps({movie_id: explanation for movie_id in movie_ids}) + "\n```"
+        return explanation
+
+    def _maybe_fail(self):
+        if self.error_rate and random.random() < self.error_rate:
+            raise ConnectionError("stub LLM error")
+
+    def _delay(self):
+        return max(self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms), 0) / 1000
+
+    def reset(self):
+        with self.lock:
+            self.calls = 0
+            self.prompt_chars = 0
+
+
+class StubSentenceTransformer:
+    """Deterministic hash-based encoder for runs without the real model"""
+
+    def __init__(self, name, *args, **kwargs):
+        pass
+
+    @property
+    def dim(self):
+        # Read on use: the stub is created before main() settles the dimension
+        return int(os.environ.get('BENCH_EMBEDDING_DIM', 768))
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        single = isinstance(texts, str)
+        vectors = [self._vector(t) for t in ([texts] if single else texts)]
+        return vectors[0] if single else np.stack(vectors)
+
+    def _vector(self, text):
+        seed = int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:8], 16)
+        vec = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return vec / np.linalg.norm(vec)
+
+
+def install_stub_modules(stub_encoder):
+    """Register stub Gemini (and optionally encoder) modules before the app imports them"""
+    genai = types.ModuleType('google.generativeai')
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = lambda name, **kwargs: StubGeminiModel()
+    try:
+        import google
+    except ImportError:
+        google = types.ModuleType('google')
+        google.__path__ = []
+        sys.modules['google'] = google
+    google.generativeai = genai
+    sys.modules['google.generativeai'] = genai
+
+    if stub_encoder:
+        st = types.ModuleType('sentence_transformers')
+        st.SentenceTransformer = StubSentenceTransformer
+        sys.modules['sentence_transformers'] = st
+        # Stands in for every EMBEDDING_BACKEND, so torch isn't needed either
+        embedding_model = types.ModuleType('embedding_model')
+        embedding_model.load_model = lambda: StubSentenceTransformer('stub')
+        embedding_model.model = embedding_model.load_model()
+        sys.modules['embedding_model'] = embedding_model
+
+
+# ---------- stage timing ----------
+_stage_lock = threading.Lock()
+_stage_samples = {}
+
+
+def record_stage(stage, seconds):
+    """metrics span listener that keeps every sample for exact percentiles"""
+    with _stage_lock:
+        _stage_samples.setdefault(stage, []).append(seconds)
+
+
+def drain_stage_samples():
+    with _stage_lock:
+        samples = dict(_stage_samples)
+        _stage_samples.clear()
+    return samples
+
+
+# ---------- catalog ----------
+def build_catalog(count, seed):
+    rng = random.Random(seed)
+    titles = [f"The {a} {n}" for a, n in itertools.product(TITLE_WORDS, TITLE_NOUNS)]
+    rng.shuffle(titles)
+
+    movies = []
+    for i in range(count):
+        title = titles[i % len(titles)]
+        if i >= len(titles):
+            title = f"{title} {i // len(titles) + 1}"
+        reviews = " ".join(rng.choice(REVIEW_SENTENCES) for _ in range(rng.randint(10, 40)))
+        movies.append({
+            'movie_id': f"tt{i:07d}",
+            'text_for_embedding': (
+                f"Tagline: {rng.choice(REVIEW_SENTENCES)} "
+                f"Synopsis: {' '.join(rng.choice(REVIEW_SENTENCES) for _ in range(6))} "
+                f"Reviews: {reviews}"
+            ),
+            'metadata': {
+                'movie_id': f"tt{i:07d}",
+                'title': title,
+                'genre': rng.sample(GENRES, rng.randint(1, 3)),
+                'rating': round(rng.uniform(3.0, 9.5), 1),
+                'release_date': rng.randint(1950, 2024),
+                'runtime_min': rng.randint(75, 190),
+                'url': f"https://www.imdb.com/title/tt{i:07d}/",
+            },
+        })
+    return movies
+
+
+def seed_movies(db, movies, dim, seed):
+    from qdrant_client.models import Distance, VectorParams, PointStruct
+    from config import Config
+
+    db.client.recreate_collection(
+        collection_name=Config.MOVIES_COLLECTION,
+        vectors_config=VectorParams(size=dim, distance=Distance.COSINE)
+    )
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((len(movies), dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    batch = []
+    for i, (movie, vec) in enumerate(zip(movies, vectors)):
+        batch.append(PointStruct(id=i, vector=vec.tolist(), payload=dict(movie['metadata'])))
+        if len(batch) >= 256:
+            db.client.upsert(collection_name=Config.MOVIES_COLLECTION, points=batch)
+            batch = []
+    if batch:
+        db.client.upsert(collection_name=Config.MOVIES_COLLECTION, points=batch)
+
+
+# ---------- server / client ----------
+def start_threaded_server(app, max_threads=None):
+    """Serve the Flask app with werkzeug's threaded server, as app.py does
+
+    With max_threads set, requests run on a fixed-size pool, like a
+    production WSGI server with a bounded number of worker threads.
+    """
+    from werkzeug.serving import BaseWSGIServer, make_server
+
+    class PooledWSGIServer(BaseWSGIServer):
+        pool = ThreadPoolExecutor(max_workers=max_threads or 1)
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._process, request, client_address)
+
+        def _process(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    if max_threads:
+        server = PooledWSGIServer('127.0.0.1', 0, app)
+    else:
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server.server_port, server.shutdown
+
+
+def start_asgi_server(app):
+    """Serve the ASGI app with uvicorn, as asgi.py does"""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning',
+                                           backlog=4096))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def shutdown():
+        server.should_exit = True
+        thread.join()
+
+    return port, shutdown
+
+
+class ApiClient:
+    def __init__(self, port):
+        self.port = port
+
+    def request(self, method, path, body=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=120)
+        try:
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+            return response.status, (json.loads(data) if data else None)
+        finally:
+            conn.close()
+
+
+class TrafficMix:
+    """Generates requests for each operation in the traffic mix"""
+
+    def __init__(self, client, movies, users, password, seed):
+        self.client = client
+        self.movies = movies
+        self.users = users
+        self.password = password
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.signup_ids = itertools.count()
+        self.run_id = f"{os.getpid()}{int(time.time())}"
+        # next_cursor values handed out by recommendations, for recommendations_next
+        self.cursors = deque(maxlen=256)
+
+    def _choice(self, seq):
+        with self.rng_lock:
+            return self.rng.choice(seq)
+
+    def _sample(self, seq, k):
+        with self.rng_lock:
+            return self.rng.sample(seq, k)
+
+    def _random(self):
+        with self.rng_lock:
+            return self.rng.random()
+
+    def signup(self):
+        username = f"bench_new_{self.run_id}_{next(self.signup_ids)}"
+        return self.client.request('POST', '/api/auth/signup', {'username': username, 'password': self.password})
+
+    def login(self):
+        user = self._choice(self.users)
+        return self.client.request('POST', '/api/auth/login', {'username': user['username'], 'password': self.password})
+
+    def survey_movies(self):
+        user = self._choice(self.users)
+        exclude = ",".join(m['movie_id'] for m in self._sample(self.movies, 6))
+        return self.client.request('GET', f"/api/survey/movies?exclude={exclude}", token=user['token'])
+
+    def survey_submit(self, user=None):
+        from config import Config
+
+        user = user or self._choice(self.users)
+        movie_ids = [m['movie_id'] for m in self._sample(self.movies, Config.TOTAL_MOVIES_TO_SELECT)]
+        return self.client.request('POST', '/api/survey/submit', {'movie_ids': movie_ids}, token=user['token'])
+
+    def wili_check(self):
+        user = self._choice(self.users)
+        title = self._choice(self.movies)['metadata']['title']
+        return self.client.request('POST', '/api/wili/check', {'movie_title': title}, token=user['token'])
+
+    def recommendations(self):
+        user = self._choice(self.users)
+        # The mention branch only scans the first page of the catalog
+        title = self._choice(self.movies[:100])['metadata']['title']
+        body = {'prompt': self._choice(PROMPTS).format(title=title)}
+        if self._random() < 0.3:
+            body['min_rating'] = self._choice([5, 6, 7, 8])
+        if self._random() < 0.3:
+            body['min_release_date'] = str(self._choice([1970, 1990, 2000, 2010]))
+        if self._random() < 0.3:
+            body['genre'] = self._choice(GENRES)
+        status, data = self.client.request('POST', '/api/recommendations', body, token=user['token'])
+        if status == 200 and data.get('next_cursor'):
+            self.cursors.append((user, data['next_cursor']))
+        return status, data
+
+    def recommendations_next(self):
+        try:
+            user, cursor = self.cursors.popleft()
+        except IndexError:
+            # No first page to continue from yet
+            return self.recommendations()
+        status, data = self.client.request('POST', '/api/recommendations', {'cursor': cursor}, token=user['token'])
+        if status == 200 and data.get('next_cursor'):
+            self.cursors.append((user, data['next_cursor']))
+        return status, data
+
+
+def create_users(client, count, password, run_id):
+    users = []
+    for i in range(count):
+        username = f"bench_user_{run_id}_{i}"
+        status, body = client.request('POST', '/api/auth/signup', {'username': username, 'password': password})
+        if status != 201:
+            raise RuntimeError(f"Could not create benchmark user {username}: {status} {body}")
+        users.append({'username': username, 'token': body['token']})
+    return users
+
+
+# ---------- statistics ----------
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(samples):
+    values = sorted(samples)
+    return {
+        'count': len(values),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else None,
+        'p50_ms': round(percentile(values, 50) * 1000, 3) if values else None,
+        'p95_ms': round(percentile(values, 95) * 1000, 3) if values else None,
+        'p99_ms': round(percentile(values, 99) * 1000, 3) if values else None,
+        'max_ms': round(values[-1] * 1000, 3) if values else None,
+    }
+
+
+def parse_mix(text):
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(','):
+        name, weight = part.split('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation in mix: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def run_level(traffic, mix, concurrency, total_requests, seed):
+    rng = random.Random(seed)
+    names = list(mix)
+    schedule = rng.choices(names, weights=[mix[n] for n in names], k=total_requests)
+
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+
+    def run_one(name):
+        start = time.perf_counter()
+        try:
+            status, _ = getattr(traffic, name)()
+            failed = status >= 500
+        except Exception:
+            failed = True
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies[name].append(elapsed)
+            if failed:
+                errors[name] += 1
+
+    drain_stage_samples()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run_one, schedule))
+    duration = time.perf_counter() - start
+
+    return {
+        'concurrency': concurrency,
+        'requests': total_requests,
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(total_requests / duration, 2),
+        'errors': sum(errors.values()),
+        'endpoints': {
+            name: dict(summarize(latencies[name]), errors=errors[name])
+            for name in names if latencies[name]
+        },
+        'stages': {stage: summarize(values) for stage, values in sorted(drain_stage_samples().items())},
+    }
+
+
+def print_level(level, baseline_level=None):
+    print(f"\n=== concurrency {level['concurrency']}: "
+          f"{level['throughput_rps']} req/s over {level['duration_s']}s, {level['errors']} errors ===")
+    print(f"{'endpoint/stage':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for section in ('endpoints', 'stages'):
+        for name, stats in level[section].items():
+            line = f"{name:<22}{stats['count']:>7}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+            previous = (baseline_level or {}).get(section, {}).get(name)
+            if previous and previous.get('p95_ms'):
+                delta = (stats['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+                line += f"   p95 {delta:+.1f}% vs baseline"
+            print(line)
+    if 'llm' in level:
+        print(f"LLM calls: {level['llm']['calls']}, prompt chars: {level['llm']['prompt_chars']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and latency benchmark for the Wili API")
+    parser.add_argument('--server', choices=['threaded', 'asgi'], default='threaded',
+                        help="Serve with the threaded Flask server (app.py) or the async server (asgi.py)")
+    parser.add_argument('--threads', type=int, help="Cap the threaded server at this many worker threads")
+    parser.add_argument('--concurrency', default='1,8,32', help="Comma-separated concurrency levels")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument('--movies', type=int, default=2000, help="Size of the synthetic catalog")
+    parser.add_argument('--users', type=int, default=20, help="Pre-registered users that complete the survey")
+    parser.add_argument('--mix', default='', help="Traffic mix, e.g. 'wili_check=50,recommendations=50'")
+    parser.add_argument('--llm-latency-ms', type=float, default=300, help="Stub Gemini latency per call")
+    parser.add_argument('--llm-jitter-ms', type=float, default=50, help="Uniform jitter added to the stub latency")
+    parser.add_argument('--llm-error-rate', type=float, default=0,
+                        help="Fraction of stub Gemini calls that fail with a transient error")
+    parser.add_argument('--movie-cards', action='store_true',
+                        help="Build compact movie cards (data/build_movie_cards.py) for explanation prompts")
+    parser.add_argument('--columnar-catalog', action='store_true',
+                        help="Write a columnar catalog (data/columnar_catalog.py) so searches hydrate payloads locally")
+    parser.add_argument('--stub-encoder', action='store_true', help="Use a hash-based encoder instead of the real model")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write machine-readable results to this JSON file")
+    parser.add_argument('--baseline', help="Previous results file to compare p95 latency against")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    levels = [int(c) for c in args.concurrency.split(',')]
+
+    # Point the app at an embedded store and a synthetic catalog before it is imported
+    movies = build_catalog(args.movies, args.seed)
+    catalog_file = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8')
+    json.dump(movies, catalog_file)
+    catalog_file.close()
+    os.environ['QDRANT_LOCATION'] = ':memory:'
+    os.environ['MOVIES_JSON_PATH'] = catalog_file.name
+    cards_path = catalog_file.name + '.cards.json'
+    os.environ['MOVIE_CARDS_PATH'] = cards_path
+    columnar_path = catalog_file.name + '.columns'
+    os.environ['CATALOG_PATH'] = columnar_path
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+    if args.movie_cards:
+        from build_movie_cards import build_cards
+        with open(cards_path, 'w', encoding='utf-8') as f:
+            json.dump(build_cards(movies, {}), f)
+    if args.columnar_catalog:
+        from columnar_catalog import write_catalog
+        write_catalog(list(range(len(movies))), [movie['metadata'] for movie in movies], columnar_path)
+    install_stub_modules(args.stub_encoder)
+
+    from config import Config
+    os.environ.setdefault('BENCH_EMBEDDING_DIM', str(Config.EMBEDDING_DIM))
+
+    from models import QdrantDB
+    from projection import VECTOR_DIM
+    seed_movies(QdrantDB(), movies, VECTOR_DIM, args.seed)
+
+    import app as wili_app
+    import metrics
+    import recommendation_service
+    stub_llm = StubGeminiModel(args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate)
+    recommendation_service.gemini_model = stub_llm
+    metrics.add_listener(record_stage)
+
+    if args.server == 'asgi':
+        import asgi
+        import async_recommendation_service
+        async_recommendation_service.gemini_model = stub_llm
+        port, shutdown = start_asgi_server(asgi.app)
+    else:
+        port, shutdown = start_threaded_server(wili_app.app, args.threads)
+    client = ApiClient(port)
+    password = 'bench-password'
+    run_id = f"{os.getpid()}{int(time.time())}"
+
+    try:
+        print(f"Creating {args.users} users with completed surveys...")
+        users = create_users(client, args.users, password, run_id)
+        traffic = TrafficMix(client, movies, users, password, args.seed)
+        for user in users:
+            traffic.survey_submit(user)
+
+        baseline = {}
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = {lvl['concurrency']: lvl for lvl in json.load(f)['levels']}
+
+        results = []
+        for i, concurrency in enumerate(levels):
+            stub_llm.reset()
+            level = run_level(traffic, mix, concurrency, args.requests, args.seed + i)
+            level['llm'] = {'calls': stub_llm.calls, 'prompt_chars': stub_llm.prompt_chars}
+            results.append(level)
+            print_level(level, baseline.get(concurrency))
+    finally:
+        shutdown()
+        os.unlink(catalog_file.name)
+        if os.path.exists(cards_path):
+            os.unlink(cards_path)
+        shutil.rmtree(columnar_path, ignore_errors=True)
+
+    if args.output:
+        report = {
+            'config': {
+                'server': args.server,
+                'threads': args.threads,
+                'concurrency': levels,
+                'requests': args.requests,
+                'movies': args.movies,
+                'users': args.users,
+                'mix': mix,
+                'llm_latency_ms': args.llm_latency_ms,
+                'llm_jitter_ms': args.llm_jitter_ms,
+                'llm_error_rate': args.llm_error_rate,
+                'stub_encoder': args.stub_encoder,
+                'movie_cards': args.movie_cards,
+                'columnar_catalog': args.columnar_catalog,
+                'seed': args.seed,
+            },
+            'levels': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# build_static.py
+"""
+Build step for the frontend: fingerprints and precompresses everything in
+frontend/ into frontend/dist/ and writes the manifest static_assets.py serves
+from.
+
+- CSS/JS (and any other non-HTML file) are copied to a content-hashed name,
+  e.g. css/style.3f9a1c2e.css, and the HTML pages are rewritten to reference
+  those names, so they can be cached forever.
+- HTML pages keep their names (they are the entry points) and are revalidated
+  with their ETag instead.
+- Every file gets a .gz and, when the brotli package is installed, a .br
+  variant, kept only where it is actually smaller.
+
+Run from the backend/ folder after changing the frontend:
+    python build_static.py
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FRONTEND_DIR = Path(__file__).resolve().parent.parent / 'frontend'
+OUT_DIR = Path(os.getenv('STATIC_BUILD_DIR', FRONTEND_DIR / 'dist'))
+REFERENCE_RE = re.compile(r'''(\b(?:href|src)=["'])([^"'#?]+)(["'])''')
+
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def hashed_name(path, digest):
+    stem, dot, suffix = path.rpartition('.')
+    return f"{stem}.{digest[:8]}.{suffix}" if dot else f"{path}.{digest[:8]}"
+
+
+def compress(data):
+    """Precompressed variants that are smaller than the original"""
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return {encoding: body for encoding, body in variants.items() if len(body) < len(data)}
+
+
+def rewrite_references(html, page, renamed):
+    """Point href/src attributes at the fingerprinted files"""
+    base = os.path.dirname(page)
+
+    def replace(match):
+        target = os.path.normpath(os.path.join(base, match.group(2))).replace(os.sep, '/')
+        if target not in renamed:
+            return match.group(0)
+        new = os.path.relpath(renamed[target], base or '.').replace(os.sep, '/')
+        return f"{match.group(1)}{new}{match.group(3)}"
+
+    return REFERENCE_RE.sub(replace, html)
+
+
+def write_asset(path, data, manifest, immutable):
+    """Write one served file and its compressed variants, and record it in the manifest"""
+    target = OUT_DIR / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(data)
+
+    encodings = {}
+    for encoding, body in compress(data).items():
+        suffix = '.br' if encoding == 'br' else '.gz'
+        (OUT_DIR / f"{path}{suffix}").write_bytes(body)
+        encodings[encoding] = {'file': f"{path}{suffix}", 'size': len(body)}
+
+    manifest[path] = {
+        'file': path,
+        'etag': fingerprint(data),
+        'content_type': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+        'immutable': immutable,
+        'size': len(data),
+        'encodings': encodings,
+    }
+
+
+def main():
+    if OUT_DIR.exists():
+        shutil.rmtree(OUT_DIR)
+    OUT_DIR.mkdir(parents=True)
+
+    sources = sorted(
+        p for p in FRONTEND_DIR.rglob('*')
+        if p.is_file() and OUT_DIR not in p.parents
+    )
+    pages = [p for p in sources if p.suffix == '.html']
+    assets = [p for p in sources if p.suffix != '.html']
+
+    manifest = {}
+    renamed = {}
+    for source in assets:
+        path = source.relative_to(FRONTEND_DIR).as_posix()
+        data = source.read_bytes()
+        renamed[path] = hashed_name(path, fingerprint(data))
+        write_asset(renamed[path], data, manifest, immutable=True)
+        # The plain name keeps working for pages cached before this build
+        manifest[path] = dict(manifest[renamed[path]], immutable=False)
+
+    for source in pages:
+        path = source.relative_to(FRONTEND_DIR).as_posix()
+        html = rewrite_references(source.read_text(encoding='utf-8'), path, renamed)
+        write_asset(path, html.encode('utf-8'), manifest, immutable=False)
+
+    (OUT_DIR / 'manifest.json').write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+
+    raw = sum(entry['size'] for path, entry in manifest.items() if entry['file'] == path)
+    best = sum(min([entry['size']] + [v['size'] for v in entry['encodings'].values()])
+               for path, entry in manifest.items() if entry['file'] == path)
+    print(f"✅ Built {len(pages)} pages and {len(assets)} assets → {OUT_DIR} "
+          f"({raw:,} bytes, {best:,} compressed{'' if brotli else '; install brotli for .br variants'})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+# catalog.py
+"""
+Read side of the columnar movie catalog written by data/columnar_catalog.py.
+
+Every column is memory-mapped read-only, so worker processes share the same
+page-cache pages instead of each holding a copy, and looking up a row only
+slices the mapped arrays.
+
+Ingestion reassigns point ids on every run and then swaps in a new catalog.
+The catalog is remapped when its manifest changes, and only served while its
+ingestion id matches the one stamped on the collection's points, which the
+database layer reads back every CATALOG_CHECK_INTERVAL seconds. Until both
+agree, payloads are read from Qdrant.
+"""
+import json
+import os
+import threading
+import time
+import numpy as np
+from qdrant_client.models import Record
+from config import Config
+
+
+class ColumnarCatalog:
+    def __init__(self, path):
+        self.path = path
+        manifest_path = os.path.join(path, 'manifest.json')
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        # Catalogs written before ingestion ids have none, and match a collection without them
+        self.ingestion_id = self.manifest.get('ingestion_id')
+        self.version = self.ingestion_id or os.stat(manifest_path).st_mtime_ns
+
+        self.point_ids = self._load('point_id')
+        self.text = {
+            column: (self._load(f"{column}.offsets"), self._load(f"{column}.data"))
+            for column in self.manifest['text_columns']
+        }
+        self.genre_offsets = self._load('genre.offsets')
+        self.genre_codes = self._load('genre.codes')
+        self.genres = self.manifest['genres']
+        self.floats = {column: self._load(column) for column in self.manifest['float_columns']}
+        self.ints = {column: self._load(column) for column in self.manifest['int_columns']}
+        self.int_missing = self.manifest['int_missing']
+        # L2-normalized movie vectors, in catalogs written with them
+        self.vectors = self._load('vector') if self.manifest.get('vector_dim') else None
+        # Point ids written by ingestion are 0..N-1, which makes the row lookup direct
+        self._dense = bool(len(self.point_ids) and self.point_ids[0] == 0
+                           and self.point_ids[-1] == len(self.point_ids) - 1)
+        self._titles_lower = None
+        self._movie_rows = None
+
+    def _load(self, name):
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.point_ids)
+
+    def row(self, point_id):
+        """Row index of a point id, or None if the catalog doesn't have it"""
+        if not isinstance(point_id, int):
+            return None
+        if self._dense:
+            return point_id if 0 <= point_id < len(self.point_ids) else None
+        row = int(np.searchsorted(self.point_ids, point_id))
+        return row if row < len(self.point_ids) and self.point_ids[row] == point_id else None
+
+    def text_value(self, column, row):
+        offsets, data = self.text[column]
+        return data[offsets[row]:offsets[row + 1]].tobytes().decode('utf-8')
+
+    def payload_at(self, row):
+        """Rebuild the movie payload stored at a row, in the same shape Qdrant returns"""
+        payload = {column: self.text_value(column, row) for column in self.text}
+        codes = self.genre_codes[self.genre_offsets[row]:self.genre_offsets[row + 1]]
+        payload['genre'] = [self.genres[code] for code in codes]
+        for column, values in self.floats.items():
+            if not np.isnan(values[row]):
+                payload[column] = round(float(values[row]), 4)
+        for column, values in self.ints.items():
+            if values[row] != self.int_missing:
+                payload[column] = int(values[row])
+        return payload
+
+    def payload(self, point_id):
+        row = self.row(point_id)
+        return None if row is None else self.payload_at(row)
+
+    def record_at(self, row):
+        return Record(id=int(self.point_ids[row]), payload=self.payload_at(row))
+
+    def records(self, limit):
+        """The first movies in point id order, like an unfiltered scroll"""
+        return [self.record_at(row) for row in range(min(limit, len(self)))]
+
+    def find_title(self, title):
+        """First movie whose title contains the given text (case-insensitive)"""
+        if self._titles_lower is None:
+            self._titles_lower = [self.text_value('title', row).lower() for row in range(len(self))]
+
+        title_lower = title.lower()
+        for row, candidate in enumerate(self._titles_lower):
+            if title_lower in candidate:
+                return self.record_at(row)
+        return None
+
+    def find_movie(self, movie_id):
+        """The movie with a movie_id, or None if the catalog doesn't have it"""
+        if self._movie_rows is None:
+            self._movie_rows = {self.text_value('movie_id', row): row for row in range(len(self))}
+
+        row = self._movie_rows.get(movie_id)
+        return None if row is None else self.record_at(row)
+
+    def fill_payloads(self, points):
+        """
+        Set the payload of each search result from the catalog
+
+        A point that already carries a movie_id (searches ask for just that
+        field) must name the same movie as the catalog row.
+
+        Returns:
+            The points the catalog has no row for
+        """
+        missing = []
+        for point in points:
+            payload = self.payload(point.id)
+            if payload is None or (point.payload and point.payload.get('movie_id') not in (None, payload['movie_id'])):
+                missing.append(point)
+            else:
+                point.payload = payload
+        return missing
+
+
+class CatalogHandle:
+    """The catalog on disk, remapped when it is replaced and served only while it matches the collection"""
+
+    def __init__(self, path, check_interval):
+        self.path = path
+        self.check_interval = check_interval
+        self._mtime = None
+        self._catalog = None
+        # (collection has points, their ingestion id) from the last check
+        self._collection = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._refresh()
+        if self._catalog is None:
+            print(f"No columnar catalog at {path}, movie payloads will be read from Qdrant")
+
+    def _refresh(self):
+        if not self.path:
+            return
+        try:
+            mtime = os.stat(os.path.join(self.path, 'manifest.json')).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                catalog = ColumnarCatalog(self.path)
+            except (OSError, ValueError) as e:
+                # Caught between the two renames of a swap; the next call retries
+                print(f"Error mapping the columnar catalog, keeping the current one: {e}")
+                return
+            self._catalog, self._mtime = catalog, mtime
+            # A new catalog is checked against the collection before it is served
+            self._checked_at = None
+            print(f"Mapped columnar catalog with {len(catalog)} movies from {self.path}")
+
+    def check_due(self):
+        """
+        Whether the collection's ingestion id should be read now
+
+        Claims the check, so only one caller per CATALOG_CHECK_INTERVAL reads it.
+        """
+        self._refresh()
+        if self._catalog is None:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+            return True
+
+    def confirm(self, payload):
+        """Record the payload of a point read from the collection, or None when it is empty"""
+        collection = (payload is not None, (payload or {}).get('ingestion_id'))
+        catalog = self._catalog
+        if collection != self._collection and catalog is not None and collection != (True, catalog.ingestion_id):
+            print(f"Columnar catalog {catalog.ingestion_id} doesn't match the collection's points "
+                  f"({collection[1] if collection[0] else 'empty'}), movie payloads will be read from Qdrant")
+        self._collection = collection
+
+    def current(self):
+        """The mapped catalog, or None when there is none or it wasn't written from the collection's points"""
+        self._refresh()
+        catalog = self._catalog
+        if catalog is None or self._collection != (True, catalog.ingestion_id):
+            return None
+        return catalog
+
+
+movie_catalog = CatalogHandle(Config.CATALOG_PATH, Config.CATALOG_CHECK_INTERVAL)
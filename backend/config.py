@@ -11,19 +11,77 @@ class Config:
     # Qdrant
     QDRANT_HOST = os.getenv('QDRANT_HOST', 'localhost')
     QDRANT_PORT = int(os.getenv('QDRANT_PORT', 6333))
+    QDRANT_LOCATION = os.getenv('QDRANT_LOCATION')  # e.g. ':memory:' for an embedded store
+    QDRANT_ENDPOINTS = os.getenv('QDRANT_ENDPOINTS', '')  # Comma-separated host:port or URLs; the first takes writes, reads are balanced
+    QDRANT_HEALTH_CHECK_INTERVAL = float(os.getenv('QDRANT_HEALTH_CHECK_INTERVAL', 5))  # seconds between endpoint probes
+    QDRANT_ENDPOINT_COOLDOWN = float(os.getenv('QDRANT_ENDPOINT_COOLDOWN', 30))  # seconds a failed endpoint is skipped unless a probe finds it up
     MOVIES_COLLECTION = 'movies'
     USERS_COLLECTION = 'users'
+    LISTS_COLLECTION = 'recommendation_lists'  # Candidate lists behind recommendation cursors
+    SEARCH_HNSW_EF = int(os.getenv('SEARCH_HNSW_EF')) if os.getenv('SEARCH_HNSW_EF') else None  # None = server default
+    SEARCH_EXACT = os.getenv('SEARCH_EXACT', 'false').lower() == 'true'  # Brute-force search, bypassing HNSW
     
     # Embedding Model
     EMBEDDING_MODEL = 'sentence-transformers/all-mpnet-base-v2'
     EMBEDDING_DIM = 768  # Dimension for all-mpnet-base-v2
+    EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch')  # torch, torch-int8, onnx or onnx-int8 (see encoders.py)
+    EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', 0))  # Intra-op threads per process; 0 = library default
+    EMBEDDING_ONNX_PATH = os.getenv('EMBEDDING_ONNX_PATH', 'onnx_model')  # Written by export_onnx.py
+    ENCODE_WORKERS = int(os.getenv('ENCODE_WORKERS', 2))  # Encoding threads for the async server
+    EMBEDDING_SIDECAR_SOCKET = os.getenv('EMBEDDING_SIDECAR_SOCKET', '')  # Unix socket of embedding_sidecar.py
+    EMBEDDING_SIDECAR_TIMEOUT = float(os.getenv('EMBEDDING_SIDECAR_TIMEOUT', 30))  # seconds
+    EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', 64))  # Max texts per sidecar encode call
+    EMBEDDING_BATCH_WAIT_MS = float(os.getenv('EMBEDDING_BATCH_WAIT_MS', 5))  # How long the sidecar waits to fill a batch
     
     # Gemini API
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+    BATCH_EXPLANATIONS = os.getenv('BATCH_EXPLANATIONS', 'true').lower() == 'true'  # One LLM call per request
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 8))  # Gemini calls in flight per process
+    LLM_CALL_TIMEOUT = float(os.getenv('LLM_CALL_TIMEOUT', 10))  # seconds per attempt
+    LLM_REQUEST_DEADLINE = float(os.getenv('LLM_REQUEST_DEADLINE', 15))  # seconds for all LLM calls of a request
+    LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))  # Retries for transient errors
+    LLM_RETRY_BASE_MS = float(os.getenv('LLM_RETRY_BASE_MS', 200))
+    LLM_BREAKER_FAILURES = int(os.getenv('LLM_BREAKER_FAILURES', 5))  # Consecutive failed attempts that open the breaker
+    LLM_BREAKER_RESET_SECONDS = float(os.getenv('LLM_BREAKER_RESET_SECONDS', 30))
     
     # Survey
     MOVIES_PER_ROUND = 3
     TOTAL_MOVIES_TO_SELECT = 10
     
+    # Wili likelihood calibration
+    WILI_CALIBRATION = os.getenv('WILI_CALIBRATION', 'true').lower() == 'true'  # Percentile against the catalog instead of rescaled cosine
+    WILI_SKETCH_SIZE = int(os.getenv('WILI_SKETCH_SIZE', 201))  # Quantiles kept per profile
+    WILI_SKETCH_CACHE_SIZE = int(os.getenv('WILI_SKETCH_CACHE_SIZE', 10000))  # Profiles whose sketch is kept
+    WILI_CATALOG_TTL = int(os.getenv('WILI_CATALOG_TTL', 3600))  # seconds before the catalog vectors are re-read
+
+    # Personalized feed
+    FEED_SIZE = int(os.getenv('FEED_SIZE', 50))
+    
+    # More like this
+    SIMILAR_MOVIES_LIMIT = int(os.getenv('SIMILAR_MOVIES_LIMIT', 10))  # Neighbors returned by default
+    
     # Data paths
-    MOVIES_JSON_PATH = os.getenv('MOVIES_JSON_PATH', 'data/movies_for_embedding.json')
\ No newline at end of file
+    MOVIES_JSON_PATH = os.getenv('MOVIES_JSON_PATH', 'data/movies_for_embedding.json')
+    MOVIE_CARDS_PATH = os.getenv('MOVIE_CARDS_PATH', os.path.join(os.path.dirname(MOVIES_JSON_PATH), 'movie_cards.json'))
+    CATALOG_PATH = os.getenv('CATALOG_PATH', os.path.join(os.path.dirname(MOVIES_JSON_PATH), 'catalog'))  # Columnar payloads
+    CATALOG_CHECK_INTERVAL = int(os.getenv('CATALOG_CHECK_INTERVAL', 30))  # seconds between checks that the catalog matches the collection
+    STATIC_BUILD_DIR = os.getenv('STATIC_BUILD_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend', 'dist'))
+    EMBEDDING_PROJECTION_PATH = os.getenv('EMBEDDING_PROJECTION_PATH', os.path.join(os.path.dirname(MOVIES_JSON_PATH), 'projection.npz'))  # Reduced-dimension vectors
+    KNN_GRAPH_PATH = os.getenv('KNN_GRAPH_PATH', os.path.join(os.path.dirname(MOVIES_JSON_PATH), 'knn_graph.npz'))
+    DATASET_VERSION = os.getenv('DATASET_VERSION', '')  # Defaults to a fingerprint of MOVIES_JSON_PATH
+    
+    # Recommendation cache
+    RECOMMENDATION_CACHE_TTL = int(os.getenv('RECOMMENDATION_CACHE_TTL', 600))  # seconds
+    RECOMMENDATION_CACHE_SIZE = int(os.getenv('RECOMMENDATION_CACHE_SIZE', 1024))
+    
+    # Recommendation pagination
+    RECOMMENDATION_PAGE_SIZE = int(os.getenv('RECOMMENDATION_PAGE_SIZE', 3))
+    RECOMMENDATION_CANDIDATES = int(os.getenv('RECOMMENDATION_CANDIDATES', 30))  # Ranked once per search, paged through cursors
+    RECOMMENDATION_CURSOR_TTL = int(os.getenv('RECOMMENDATION_CURSOR_TTL', 1800))  # seconds; keep >= RECOMMENDATION_CACHE_TTL
+    RECOMMENDATION_LISTS_MAX = int(os.getenv('RECOMMENDATION_LISTS_MAX', 100000))  # Stored candidate lists before the oldest are dropped early
+    
+    # Observability
+    PROFILE_SLOW_REQUESTS = os.getenv('PROFILE_SLOW_REQUESTS', 'false').lower() == 'true'
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 1000))
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', 5))
+    PROFILE_OUTPUT_DIR = os.getenv('PROFILE_OUTPUT_DIR', 'profiles')
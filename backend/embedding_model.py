@@ -0,0 +1,22 @@
+# embedding_model.py
+"""
+The embedding model, kept apart from embedding_service so it can be loaded
+without touching Qdrant: by gunicorn's master before forking
+(EMBEDDING_PRELOAD), or replaced by a client of the embedding sidecar.
+EMBEDDING_BACKEND picks the runtime (see encoders.py).
+"""
+from config import Config
+from encoders import load_encoder
+
+
+def load_model():
+    """Load the embedding model, or a client of the sidecar process that holds it"""
+    if Config.EMBEDDING_SIDECAR_SOCKET:
+        from embedding_sidecar import SidecarEncoder
+        return SidecarEncoder(Config.EMBEDDING_SIDECAR_SOCKET, timeout=Config.EMBEDDING_SIDECAR_TIMEOUT)
+
+    return load_encoder(Config.EMBEDDING_BACKEND, Config.EMBEDDING_MODEL,
+                        onnx_path=Config.EMBEDDING_ONNX_PATH, threads=Config.EMBEDDING_THREADS)
+
+
+model = load_model()
@@ -1,13 +1,20 @@
 #embedding_service.py
-from sentence_transformers import SentenceTransformer
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
 import numpy as np
 from config import Config
 from models import QdrantDB
+from projection import projection, VECTOR_DIM
+import metrics
 
-# Load the embedding model
-model = SentenceTransformer(Config.EMBEDDING_MODEL)
+# Load the embedding model (shared with a preloading master, or served by the sidecar)
+from embedding_model import model
 db = QdrantDB()
 
+# CPU-bound encoding for the async server runs here, off the event loop
+encode_executor = ThreadPoolExecutor(max_workers=Config.ENCODE_WORKERS, thread_name_prefix='encode')
+
 def compute_user_embedding(movie_ids):
     """
     Compute user embedding by averaging the embeddings of selected movies
@@ -25,9 +32,21 @@ def compute_user_embedding(movie_ids):
         if movie and movie.vector:
             embeddings.append(movie.vector)
     
+    return average_embeddings(embeddings)
+
+def average_embeddings(embeddings):
+    """
+    Average movie embeddings into a normalized user embedding
+    
+    Args:
+        embeddings: List of movie embedding vectors
+    
+    Returns:
+        numpy array of the averaged embedding
+    """
     if not embeddings:
         # Return zero embedding if no movies found
-        return np.zeros(Config.EMBEDDING_DIM)
+        return np.zeros(VECTOR_DIM)
     
     # Average all movie embeddings
     user_embedding = np.mean(embeddings, axis=0)
@@ -39,6 +58,7 @@ def compute_user_embedding(movie_ids):
     
     return user_embedding
 
+@metrics.timed('encode')
 def encode_text(text):
     """
     Encode text into an embedding vector
@@ -47,11 +67,28 @@ def encode_text(text):
         text: Text to encode
     
     Returns:
-        numpy array of the embedding
+        numpy array of the embedding, projected when the movie vectors are
     """
     embedding = model.encode(text, convert_to_numpy=True)
+    if projection:
+        embedding = projection.project(embedding)
     return embedding
 
+async def encode_text_async(text):
+    """
+    Encode text on the dedicated encoding executor
+    
+    Args:
+        text: Text to encode
+    
+    Returns:
+        numpy array of the embedding
+    """
+    loop = asyncio.get_running_loop()
+    # Copy the context so spans recorded in the executor land on this request
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(encode_executor, context.run, encode_text, text)
+
 def combine_embeddings(movie_embedding, text_embedding, movie_weight=0.7):
     """
     Combine movie and text embeddings with weighted average
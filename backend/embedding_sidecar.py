@@ -0,0 +1,193 @@
+# embedding_sidecar.py
+"""
+Embedding sidecar: one local process holds the sentence-transformers model
+and encodes text for every worker process over a Unix socket.
+
+Requests that arrive within EMBEDDING_BATCH_WAIT_MS of each other are merged
+into a single model.encode call (up to EMBEDDING_BATCH_SIZE texts).
+Workers started with EMBEDDING_SIDECAR_SOCKET set don't load the model at
+all; embedding_service uses SidecarEncoder in its place.
+
+Run from the backend/ folder before starting the workers:
+    EMBEDDING_SIDECAR_SOCKET=/tmp/wili-embed.sock python embedding_sidecar.py
+
+Wire format, both directions: 4-byte big-endian length + JSON header.
+Requests are {"texts": [...]}; responses are {"shape": [n, dim]} followed by
+n * dim float32 values, or {"error": "..."}.
+"""
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from config import Config
+
+_LENGTH = struct.Struct('>I')
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding sidecar closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class SidecarEncoder:
+    """Drop-in for SentenceTransformer.encode that forwards to the sidecar"""
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread, and never one inherited across a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(self.timeout)
+        conn.connect(self.path)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+    def _request(self, texts):
+        conn = self._connection()
+        body = json.dumps({'texts': texts}).encode('utf-8')
+        conn.sendall(_LENGTH.pack(len(body)) + body)
+
+        header = json.loads(_recv_exactly(conn, _LENGTH.unpack(_recv_exactly(conn, _LENGTH.size))[0]))
+        if header.get('error'):
+            raise RuntimeError(f"Embedding sidecar error: {header['error']}")
+        rows, dim = header['shape']
+        data = _recv_exactly(conn, rows * dim * 4)
+        return np.frombuffer(data, dtype=np.float32).reshape(rows, dim)
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        for attempt in range(2):
+            try:
+                vectors = self._request(batch)
+                break
+            except OSError as e:
+                # Drop the connection either way, so a late response can't be read as the next one
+                self._close()
+                # Only a stale connection (the sidecar restarted since it was opened) is retried.
+                # A timeout means the sidecar is busy, and a second copy of the batch would add to it.
+                if attempt or not isinstance(e, ConnectionError):
+                    raise
+        return vectors[0] if single else vectors
+
+
+class EmbeddingSidecar:
+    def __init__(self, model, batch_size, batch_wait):
+        self.model = model
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue = None
+        # The model runs on one thread; batching is what buys throughput
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='encode')
+
+    async def handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    size = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))[0]
+                    request = json.loads(await reader.readexactly(size))
+                except asyncio.IncompleteReadError:
+                    break
+
+                future = loop.create_future()
+                await self._queue.put((request['texts'], future))
+                try:
+                    vectors = await future
+                    header, body = {'shape': list(vectors.shape)}, vectors.tobytes()
+                except Exception as e:
+                    header, body = {'error': str(e)}, b''
+
+                header = json.dumps(header).encode('utf-8')
+                writer.write(_LENGTH.pack(len(header)) + header + body)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            count = len(batch[0][0])
+            deadline = loop.time() + self.batch_wait
+            while count < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                count += len(item[0])
+
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._encode, texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    def _encode(self, texts):
+        if not texts:
+            return np.zeros((0, Config.EMBEDDING_DIM), dtype=np.float32)
+        return np.asarray(self.model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+
+    async def serve(self, path):
+        self._queue = asyncio.Queue()
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(self.handle, path=path)
+        print(f"Embedding sidecar listening on {path}")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.batcher())
+
+
+def main():
+    from encoders import load_encoder
+
+    path = Config.EMBEDDING_SIDECAR_SOCKET
+    assert path, "Set EMBEDDING_SIDECAR_SOCKET to the socket path to listen on"
+
+    model = load_encoder(Config.EMBEDDING_BACKEND, Config.EMBEDDING_MODEL,
+                         onnx_path=Config.EMBEDDING_ONNX_PATH, threads=Config.EMBEDDING_THREADS)
+    sidecar = EmbeddingSidecar(model, Config.EMBEDDING_BATCH_SIZE, Config.EMBEDDING_BATCH_WAIT_MS / 1000)
+    try:
+        asyncio.run(sidecar.serve(path))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# encoder_benchmark.py
+"""
+Parity check and latency/throughput benchmark for the embedding backends.
+
+Encodes the eval prompts and a sample of movie texts with the float32 torch
+reference and with each selected backend (see encoders.py), then reports per
+backend and thread count:
+
+- cosine drift against the reference: mean and minimum cosine similarity of
+  the same text's two embeddings, and whether the minimum stays above
+  --min-cosine
+- single-prompt latency (what encode_text costs a request)
+- batch throughput in texts per second (what ingestion costs)
+
+Exits with status 1 when any backend fails the parity bound, so it can gate a
+switch of EMBEDDING_BACKEND. Run from the backend/ folder:
+    python export_onnx.py --int8
+    python encoder_benchmark.py --backends torch,torch-int8,onnx,onnx-int8 --threads 1,4 --output encoders.json
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from ann_benchmark import DEFAULT_PROMPTS, load_prompts
+from benchmark import percentile
+from config import Config
+from encoders import BACKENDS, load_encoder
+
+# Same per-movie budget as ingestion (data/embed_and_upload_local.py)
+MAX_CHARS_TOTAL = 4000
+
+
+def load_movie_texts(path, count):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            movies = json.load(f)
+    except FileNotFoundError:
+        print(f"No movies at {path}, measuring throughput on the prompts only")
+        return []
+    return [movie.get('text_for_embedding', '')[:MAX_CHARS_TOTAL] for movie in movies[:count]]
+
+
+def cosine_rows(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def measure(encoder, prompts, texts, batch_size, repeats):
+    """Single-prompt latency samples and batch throughput for one encoder"""
+    # Untimed warm-up so lazy initialization doesn't land in the first sample
+    encoder.encode(prompts[0], convert_to_numpy=True)
+
+    latencies = []
+    for _ in range(repeats):
+        for prompt in prompts:
+            start = time.perf_counter()
+            encoder.encode(prompt, convert_to_numpy=True)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    start = time.perf_counter()
+    encoder.encode(texts, convert_to_numpy=True, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'throughput_tps': round(len(texts) / elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity and speed of the embedding backends")
+    parser.add_argument('--backends', default=','.join(BACKENDS), help="Comma-separated backends to compare")
+    parser.add_argument('--threads', default=str(Config.EMBEDDING_THREADS or 1),
+                        help="Comma-separated intra-op thread counts to measure each backend with")
+    parser.add_argument('--prompts', default=DEFAULT_PROMPTS, help="Prompts for parity and latency, one per line")
+    parser.add_argument('--movies', type=int, default=256, help="Movie texts for parity and throughput")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--repeats', type=int, default=3, help="Passes over the prompts for latency")
+    parser.add_argument('--min-cosine', type=float, default=0.99,
+                        help="Lowest acceptable cosine similarity to the reference embedding")
+    parser.add_argument('--onnx-path', default=Config.EMBEDDING_ONNX_PATH)
+    parser.add_argument('--output', help="Write machine-readable results to this JSON file")
+    args = parser.parse_args()
+
+    prompts = load_prompts(args.prompts)
+    texts = load_movie_texts(Config.MOVIES_JSON_PATH, args.movies) or prompts
+    thread_counts = [int(t) for t in args.threads.split(',') if t]
+
+    reference = load_encoder('torch', Config.EMBEDDING_MODEL, threads=thread_counts[0])
+    expected = reference.encode(prompts + texts, convert_to_numpy=True, batch_size=args.batch_size)
+    print(f"{len(prompts)} prompts, {len(texts)} movie texts, min cosine {args.min_cosine}")
+
+    results = {}
+    failed = []
+    print(f"\n{'backend':<12}{'threads':>8}{'mean cos':>10}{'min cos':>10}{'parity':>8}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'texts/s':>10}")
+    for backend in [b for b in args.backends.split(',') if b]:
+        try:
+            encoder = reference if backend == 'torch' else load_encoder(
+                backend, Config.EMBEDDING_MODEL, onnx_path=args.onnx_path, threads=thread_counts[0])
+        except (FileNotFoundError, ImportError) as e:
+            print(f"{backend:<12}skipped: {e}")
+            continue
+
+        cosines = cosine_rows(expected, encoder.encode(prompts + texts, convert_to_numpy=True,
+                                                       batch_size=args.batch_size))
+        parity = {
+            'mean_cosine': round(float(cosines.mean()), 6),
+            'min_cosine': round(float(cosines.min()), 6),
+            'passed': bool(cosines.min() >= args.min_cosine),
+        }
+        if not parity['passed']:
+            failed.append(backend)
+
+        results[backend] = {'parity': parity, 'threads': {}}
+        for threads in thread_counts:
+            encoder.configure_threads(threads)
+            speed = measure(encoder, prompts, texts, args.batch_size, args.repeats)
+            results[backend]['threads'][threads] = speed
+            print(f"{backend:<12}{threads:>8}{parity['mean_cosine']:>10.5f}{parity['min_cosine']:>10.5f}"
+                  f"{'ok' if parity['passed'] else 'FAIL':>8}{speed['p50_ms']:>10.3f}{speed['p95_ms']:>10.3f}"
+                  f"{speed['throughput_tps']:>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'min_cosine': args.min_cosine, 'prompts': len(prompts), 'texts': len(texts),
+                       'backends': results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if failed:
+        print(f"\nParity check failed for: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+# encoders.py
+"""
+Selectable CPU backends for the sentence embedding model.
+
+Every backend has the SentenceTransformer.encode interface the rest of the
+code uses, and runs with an explicit intra-op thread count:
+
+- torch       the float32 sentence-transformers model (reference)
+- torch-int8  the same model with its Linear layers dynamically quantized to int8
+- onnx        the transformer exported by export_onnx.py, run by onnxruntime
+- onnx-int8   the exported model with int8 weights (export_onnx.py --int8)
+
+Kept free of Config so data/embed_and_upload_local.py can load the same
+backends. encoder_benchmark.py checks each backend's cosine drift against the
+torch reference and measures its latency and throughput.
+"""
+import json
+import os
+import numpy as np
+
+BACKENDS = ('torch', 'torch-int8', 'onnx', 'onnx-int8')
+ONNX_CONFIG = 'wili_onnx.json'
+
+
+def onnx_model_file(backend):
+    return 'model.int8.onnx' if backend == 'onnx-int8' else 'model.onnx'
+
+
+class TorchEncoder:
+    def __init__(self, model_name, quantize=False, threads=0):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        self.configure_threads(threads)
+        model = SentenceTransformer(model_name, device='cpu')
+        model.eval()
+        if quantize:
+            # Weights stored as int8, activations quantized on the fly per batch
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+    def configure_threads(self, threads):
+        import torch
+
+        if threads:
+            torch.set_num_threads(threads)
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        import torch
+
+        # inference_mode skips autograd bookkeeping entirely (no_grad still tracks versions)
+        with torch.inference_mode():
+            return self.model.encode(texts, convert_to_numpy=convert_to_numpy, **kwargs)
+
+
+class OnnxEncoder:
+    def __init__(self, path, backend='onnx', threads=0):
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(path, ONNX_CONFIG), 'r', encoding='utf-8') as f:
+            self.config = json.load(f)
+        self.model_path = os.path.join(path, onnx_model_file(backend))
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"No exported model at {self.model_path}; run export_onnx.py"
+                                    f"{' --int8' if backend == 'onnx-int8' else ''}")
+        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        self.threads = threads
+        self._session = None
+        self._session_pid = None
+
+    def configure_threads(self, threads):
+        self.threads = threads
+        self._session = None
+
+    def _get_session(self):
+        # onnxruntime's thread pool doesn't survive a fork, so each process builds its own session
+        if self._session is None or self._session_pid != os.getpid():
+            import onnxruntime as ort
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+            self._session = ort.InferenceSession(self.model_path, options, providers=['CPUExecutionProvider'])
+            self._session_pid = os.getpid()
+        return self._session
+
+    def _encode_batch(self, texts):
+        tokens = self.tokenizer(texts, padding=True, truncation=True,
+                                max_length=self.config['max_seq_length'], return_tensors='np')
+        mask = tokens['attention_mask'].astype(np.int64)
+        token_embeddings = self._get_session().run(None, {
+            'input_ids': tokens['input_ids'].astype(np.int64),
+            'attention_mask': mask
+        })[0]
+
+        # Mean pooling over the real tokens, as the sentence-transformers Pooling module does
+        weights = mask[..., None].astype(np.float32)
+        embeddings = (token_embeddings * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.config['normalize']:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.astype(np.float32)
+
+    def encode(self, texts, convert_to_numpy=True, batch_size=32, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return np.zeros((0, self.config['dim']), dtype=np.float32)
+
+        # Batch texts of similar length together so less padding is computed
+        order = np.argsort([-len(text) for text in batch], kind='stable')
+        embeddings = np.empty((len(batch), self.config['dim']), dtype=np.float32)
+        for start in range(0, len(batch), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([batch[i] for i in rows])
+
+        return embeddings[0] if single else embeddings
+
+
+def load_encoder(backend, model_name, onnx_path=None, threads=0):
+    """Load the embedding model with the given backend"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; choose one of {', '.join(BACKENDS)}")
+    print(f"Loading embedding model {model_name} with the {backend} backend"
+          f"{f' ({threads} threads)' if threads else ''}")
+    if backend.startswith('onnx'):
+        return OnnxEncoder(onnx_path, backend, threads)
+    return TorchEncoder(model_name, quantize=backend == 'torch-int8', threads=threads)
@@ -0,0 +1,96 @@
+# export_onnx.py
+"""
+Exports the embedding model's transformer to ONNX for EMBEDDING_BACKEND=onnx.
+
+Writes model.onnx (token embeddings, dynamic batch and sequence axes), the
+tokenizer, and wili_onnx.json with the pooling settings OnnxEncoder applies
+on top. With --int8 it also writes model.int8.onnx, the same graph with
+dynamically quantized int8 weights, for EMBEDDING_BACKEND=onnx-int8.
+
+Run from the backend/ folder, then check drift and speed:
+    python export_onnx.py --int8
+    python encoder_benchmark.py --backends torch,onnx,onnx-int8
+"""
+import argparse
+import json
+import os
+
+from config import Config
+from encoders import ONNX_CONFIG
+
+
+def export(model_name, out_dir, opset=14):
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling, Transformer
+
+    model = SentenceTransformer(model_name, device='cpu')
+    modules = list(model)
+    transformer = modules[0]
+    pooling = next(m for m in modules if isinstance(m, Pooling))
+    assert isinstance(transformer, Transformer), f"Unexpected first module {type(transformer).__name__}"
+    assert pooling.get_pooling_mode_str() == 'mean', \
+        f"OnnxEncoder only implements mean pooling, the model uses {pooling.get_pooling_mode_str()}"
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, input_ids, attention_mask):
+            return self.auto_model(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+    os.makedirs(out_dir, exist_ok=True)
+    sample = transformer.tokenizer(["a sample sentence to trace", "another"], padding=True, return_tensors='pt')
+    wrapper = TokenEmbeddings(transformer.auto_model).eval()
+    with torch.inference_mode():
+        torch.onnx.export(
+            wrapper,
+            (sample['input_ids'], sample['attention_mask']),
+            os.path.join(out_dir, 'model.onnx'),
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['token_embeddings'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'token_embeddings': {0: 'batch', 1: 'sequence'},
+            },
+            opset_version=opset,
+        )
+    transformer.tokenizer.save_pretrained(out_dir)
+
+    config = {
+        'source_model': model_name,
+        'dim': model.get_sentence_embedding_dimension(),
+        'max_seq_length': transformer.max_seq_length,
+        'pooling': 'mean',
+        'normalize': any(isinstance(m, Normalize) for m in modules),
+    }
+    with open(os.path.join(out_dir, ONNX_CONFIG), 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+    print(f"✅ Exported {model_name} → {os.path.join(out_dir, 'model.onnx')}")
+
+
+def quantize(out_dir):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(os.path.join(out_dir, 'model.onnx'), os.path.join(out_dir, 'model.int8.onnx'),
+                     weight_type=QuantType.QInt8)
+    print(f"✅ Quantized → {os.path.join(out_dir, 'model.int8.onnx')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument('--model', default=Config.EMBEDDING_MODEL)
+    parser.add_argument('--out', default=Config.EMBEDDING_ONNX_PATH, help="Output folder (EMBEDDING_ONNX_PATH)")
+    parser.add_argument('--int8', action='store_true', help="Also write an int8-quantized model.int8.onnx")
+    parser.add_argument('--opset', type=int, default=14)
+    args = parser.parse_args()
+
+    export(args.model, args.out, args.opset)
+    if args.int8:
+        quantize(args.out)
+
+
+if __name__ == '__main__':
+    main()
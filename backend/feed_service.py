@@ -0,0 +1,166 @@
+# feed_service.py
+"""
+Precomputed per-user feed.
+
+When a user's profile embedding changes (survey submission), a background
+worker searches for the user's top FEED_SIZE movies and stores the result
+compactly in the user's payload as movie ids and scores. /api/feed then
+serves it with a fixed number of reads, without running a vector search.
+Movie ids, unlike point ids, survive a re-ingestion of the collection.
+"""
+import queue
+import threading
+import time
+import numpy as np
+from config import Config
+from models import QdrantDB
+from recommendation_service import movie_info
+from wili_calibration import wili_calibrator
+import metrics
+
+db = QdrantDB()
+
+FEED_QUEUE_DEPTH = metrics.REGISTRY.gauge(
+    'wili_feed_refresh_queue_depth', 'Users waiting for a feed refresh')
+
+
+class FeedWorker:
+    """Background thread that recomputes user feeds, one refresh per user at a time"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._active = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def enqueue(self, user_id, exclude_movie_ids=None):
+        """
+        Schedule a feed refresh for a user
+
+        Repeated refreshes for a user that is still waiting collapse into one,
+        using the latest exclusion list.
+
+        Args:
+            user_id: User's ID
+            exclude_movie_ids: Movie IDs to leave out of the feed (None keeps the stored ones)
+        """
+        with self._lock:
+            queued = user_id in self._pending
+            self._pending[user_id] = exclude_movie_ids
+            if not queued:
+                self._queue.put(user_id)
+            FEED_QUEUE_DEPTH.set(len(self._pending))
+            self._start()
+
+    def is_pending(self, user_id):
+        with self._lock:
+            return user_id in self._pending or user_id == self._active
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='feed-worker', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            user_id = self._queue.get()
+            with self._lock:
+                exclude_movie_ids = self._pending.pop(user_id, None)
+                self._active = user_id
+                FEED_QUEUE_DEPTH.set(len(self._pending))
+            try:
+                refresh_feed(user_id, exclude_movie_ids)
+            except Exception as e:
+                metrics.record_error('feed_refresh')
+                print(f"Error refreshing feed for {user_id}: {e}")
+            finally:
+                with self._lock:
+                    self._active = None
+
+
+@metrics.timed('feed_refresh')
+def refresh_feed(user_id, exclude_movie_ids=None):
+    """
+    Compute and store a user's feed from their profile embedding
+
+    Args:
+        user_id: User's ID
+        exclude_movie_ids: Movie IDs to leave out (None keeps the stored exclusions)
+
+    Returns:
+        The stored feed record, or None if the user has no embedding yet
+    """
+    user = db.get_user_by_id(user_id)
+    if user is None or not user.vector or not any(user.vector):
+        return None
+
+    if exclude_movie_ids is None:
+        exclude_movie_ids = (user.payload.get('feed') or {}).get('excluded_movie_ids', [])
+    excluded = set(exclude_movie_ids)
+
+    results = db.search_similar_movies(np.array(user.vector), limit=Config.FEED_SIZE + len(excluded))
+    results = [result for result in results if result.payload['movie_id'] not in excluded]
+    results = results[:Config.FEED_SIZE]
+
+    feed = {
+        'movie_ids': [result.payload['movie_id'] for result in results],
+        'scores': [round(result.score, 4) for result in results],
+        'excluded_movie_ids': sorted(excluded),
+        'updated_at': int(time.time())
+    }
+    db.set_user_feed(user_id, feed)
+
+    # Score the catalog for the new profile now, so the user's next wili check only looks it up
+    if Config.WILI_CALIBRATION:
+        wili_calibrator.sketch(user.vector)
+    return feed
+
+
+def get_feed(user_id, limit=None):
+    """
+    Serve a user's precomputed feed
+
+    Args:
+        user_id: User's ID
+        limit: Maximum number of movies to return (optional)
+
+    Returns:
+        Dictionary with the feed status and its movies
+    """
+    try:
+        feed = db.get_user_feed(user_id)
+        pending = feed_worker.is_pending(user_id)
+
+        if not feed:
+            if pending:
+                return {'status': 'pending', 'movies': []}, None
+            return None, "Please complete the movie survey first to get personalized recommendations"
+
+        if 'movie_ids' not in feed:
+            # Stored as point ids, which a re-ingestion may have given to other movies
+            feed_worker.enqueue(user_id)
+            return {'status': 'pending', 'movies': []}, None
+
+        movie_ids = feed['movie_ids'][:limit] if limit else feed['movie_ids']
+        scores = dict(zip(feed['movie_ids'], feed['scores']))
+        movies = db.get_movies_by_movie_ids(movie_ids)
+
+        return {
+            'status': 'refreshing' if pending else 'ready',
+            'updated_at': feed['updated_at'],
+            'movies': [{
+                'movie_id': movie.payload['movie_id'],
+                'movie_title': movie.payload['title'],
+                'similarity_score': round(scores[movie.payload['movie_id']] * 100, 2),
+                'movie_info': movie_info(movie.payload)
+            } for movie in movies]
+        }, None
+
+    except Exception as e:
+        metrics.record_error('feed')
+        print(f"Error in get_feed: {e}")
+        return None, f"An error occurred: {str(e)}"
+
+
+feed_worker = FeedWorker()
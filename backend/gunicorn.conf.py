@@ -0,0 +1,45 @@
+# gunicorn.conf.py
+"""
+Pre-fork serving of the Flask app:
+    gunicorn -c gunicorn.conf.py app:app
+
+With EMBEDDING_PRELOAD=true the master loads the embedding model before
+forking and every worker inherits it copy-on-write, instead of each worker
+loading its own copy. Only the model is preloaded: the app itself (and its
+Qdrant connections) is still imported in each worker. With
+EMBEDDING_SIDECAR_SOCKET set the workers don't load the model at all (see
+embedding_sidecar.py).
+"""
+import gc
+import multiprocessing
+import os
+import sys
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+preload_model = os.getenv('EMBEDDING_PRELOAD', 'false').lower() == 'true'
+
+
+def on_starting(server):
+    if not preload_model:
+        return
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import embedding_model
+    server.log.info(f"Preloaded embedding model {type(embedding_model.model).__name__} before fork")
+    # Move everything loaded so far out of the collector's reach, so GC
+    # passes in the workers don't write to (and un-share) those pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Split the cores between workers instead of every worker's encoder using
+    # all of them; must happen before the first encode in the worker
+    encoder_threads = int(os.getenv('EMBEDDING_THREADS', 0)) or max(1, multiprocessing.cpu_count() // workers)
+    # Read by Config in workers that load the model themselves
+    os.environ['EMBEDDING_THREADS'] = str(encoder_threads)
+    if preload_model:
+        import embedding_model
+        configure_threads = getattr(embedding_model.model, 'configure_threads', None)
+        if configure_threads:
+            configure_threads(encoder_threads)
@@ -0,0 +1,282 @@
+# llm_gateway.py
+"""
+Process-wide gateway in front of every Gemini call.
+
+Bounds how many calls run at once, gives each call a timeout that also
+respects the request's overall LLM deadline, retries transient errors with
+jittered backoff, and trips a circuit breaker after repeated failures so a
+slow or failing provider costs callers a fast exception (and the existing
+fallback explanation) instead of a blocked worker.
+"""
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from config import Config
+import metrics
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    TRANSIENT_ERRORS = (
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.TooManyRequests,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.GatewayTimeout,
+    )
+except ImportError:
+    TRANSIENT_ERRORS = ()
+TRANSIENT_ERRORS += (TimeoutError, ConnectionError)
+
+LLM_CALLS = metrics.REGISTRY.counter(
+    'wili_llm_calls_total', 'LLM calls through the gateway by result', ['result'])
+LLM_QUEUE_WAIT = metrics.REGISTRY.histogram(
+    'wili_llm_queue_wait_seconds', 'Time spent waiting for an LLM concurrency slot')
+LLM_CIRCUIT_STATE = metrics.REGISTRY.gauge(
+    'wili_llm_circuit_state', 'LLM circuit breaker state (0 closed, 1 half-open, 2 open)')
+
+
+class LLMUnavailable(Exception):
+    """The gateway gave up on a call; callers should use their fallback"""
+
+
+class CircuitOpenError(LLMUnavailable):
+    pass
+
+
+class DeadlineExceeded(LLMUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single probe call through after reset_timeout"""
+
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+        LLM_CIRCUIT_STATE.set(self.state)
+
+    def allow(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN:
+                # One probe at a time; a probe that never reported back doesn't block forever
+                if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                    self._probe_started = now
+                    return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_started = None
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_started = None
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def _set_state(self, state):
+        if state != self.state:
+            print(f"LLM circuit breaker: {('closed', 'half-open', 'open')[self.state]} -> "
+                  f"{('closed', 'half-open', 'open')[state]}")
+        self.state = state
+        LLM_CIRCUIT_STATE.set(state)
+
+
+class RequestScope:
+    """LLM budget for one request; failed is set when any call had to fall back"""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.failed = False
+
+
+_scope = contextvars.ContextVar('wili_llm_scope', default=None)
+
+
+class LLMGateway:
+    def __init__(self, max_concurrency, call_timeout, max_retries, retry_base, breaker):
+        self.max_concurrency = max_concurrency
+        self.call_timeout = call_timeout
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.breaker = breaker
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._async_semaphore = None
+        # google-generativeai 0.3.x takes no per-call timeout, so sync calls run on
+        # these threads and the caller stops waiting at the deadline instead
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='llm')
+
+    @contextmanager
+    def request_scope(self, budget=None):
+        """Share one deadline across every LLM call made inside the block"""
+        budget = Config.LLM_REQUEST_DEADLINE if budget is None else budget
+        scope = RequestScope(time.monotonic() + budget)
+        token = _scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _scope.reset(token)
+
+    def _timeout(self):
+        """Time allowed for the next step: the call timeout, capped by the request deadline"""
+        scope = _scope.get()
+        if scope is None:
+            return self.call_timeout
+        remaining = scope.deadline - time.monotonic()
+        if remaining <= 0:
+            LLM_CALLS.inc(result='deadline')
+            raise DeadlineExceeded("LLM request deadline exceeded")
+        return min(self.call_timeout, remaining)
+
+    def _admit(self):
+        if not self.breaker.allow():
+            LLM_CALLS.inc(result='rejected')
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff, or None when there's no retry or time left"""
+        if attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, self.retry_base * 2 ** attempt)
+        scope = _scope.get()
+        if scope is not None and time.monotonic() + delay >= scope.deadline:
+            return None
+        return delay
+
+    def _failed(self, error):
+        LLM_CALLS.inc(result='timeout' if isinstance(error, (TimeoutError, asyncio.TimeoutError)) else 'error')
+        self.breaker.record_failure()
+        scope = _scope.get()
+        if scope is not None:
+            scope.failed = True
+
+    def generate(self, model, prompt):
+        """Call model.generate_content(prompt) under the gateway's limits"""
+        try:
+            return self._generate(model, prompt)
+        except LLMUnavailable:
+            scope = _scope.get()
+            if scope is not None:
+                scope.failed = True
+            raise
+
+    @staticmethod
+    def _result(future, timeout):
+        """future.result(timeout), raising a call still running at the timeout as TimeoutError"""
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if not future.done():
+                raise TimeoutError(f"LLM call timed out after {timeout:.1f}s") from None
+            raise
+
+    def _generate(self, model, prompt):
+        attempt = 0
+        while True:
+            self._admit()
+            start = time.perf_counter()
+            acquired = self._semaphore.acquire(timeout=self._timeout())
+            LLM_QUEUE_WAIT.observe(time.perf_counter() - start)
+            if not acquired:
+                LLM_CALLS.inc(result='queue_timeout')
+                raise DeadlineExceeded("Timed out waiting for an LLM slot")
+
+            try:
+                timeout = self._timeout()
+                future = self._executor.submit(model.generate_content, prompt)
+            except BaseException:
+                self._semaphore.release()
+                raise
+            # The slot stays taken until the SDK call returns, even after its caller gave up on it
+            future.add_done_callback(lambda _: self._semaphore.release())
+
+            try:
+                response = self._result(future, timeout)
+            except Exception as e:
+                self._failed(e)
+                delay = self._backoff(attempt) if isinstance(e, TRANSIENT_ERRORS) else None
+                if delay is None:
+                    raise
+            else:
+                self.breaker.record_success()
+                LLM_CALLS.inc(result='ok')
+                return response
+
+            time.sleep(delay)
+            attempt += 1
+
+    async def generate_async(self, model, prompt):
+        """Await model.generate_content_async(prompt) under the gateway's limits"""
+        try:
+            return await self._generate_async(model, prompt)
+        except LLMUnavailable:
+            scope = _scope.get()
+            if scope is not None:
+                scope.failed = True
+            raise
+
+    async def _generate_async(self, model, prompt):
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        attempt = 0
+        while True:
+            self._admit()
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._async_semaphore.acquire(), self._timeout())
+            except asyncio.TimeoutError:
+                LLM_CALLS.inc(result='queue_timeout')
+                raise DeadlineExceeded("Timed out waiting for an LLM slot")
+            finally:
+                LLM_QUEUE_WAIT.observe(time.perf_counter() - start)
+
+            try:
+                timeout = self._timeout()
+                response = await asyncio.wait_for(model.generate_content_async(prompt), timeout)
+            except LLMUnavailable:
+                raise
+            except Exception as e:
+                self._failed(e)
+                transient = isinstance(e, TRANSIENT_ERRORS + (asyncio.TimeoutError,))
+                delay = self._backoff(attempt) if transient else None
+                if delay is None:
+                    raise
+            else:
+                self.breaker.record_success()
+                LLM_CALLS.inc(result='ok')
+                return response
+            finally:
+                self._async_semaphore.release()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+llm_gateway = LLMGateway(
+    max_concurrency=Config.LLM_MAX_CONCURRENCY,
+    call_timeout=Config.LLM_CALL_TIMEOUT,
+    max_retries=Config.LLM_MAX_RETRIES,
+    retry_base=Config.LLM_RETRY_BASE_MS / 1000,
+    breaker=CircuitBreaker(Config.LLM_BREAKER_FAILURES, Config.LLM_BREAKER_RESET_SECONDS),
+)
@@ -0,0 +1,249 @@
+# metrics.py
+"""
+Timing spans and a small Prometheus-format metrics registry.
+
+Each process keeps its own registry; scrape every worker (or aggregate in
+Prometheus) when running several of them.
+"""
+import contextvars
+import threading
+import time
+from functools import wraps
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ''
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def count(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return series['count'] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['counts']):
+                    cumulative += count
+                    labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+                lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, description, labelnames=()):
+        return self.register(Counter(name, description, labelnames))
+
+    def gauge(self, name, description, labelnames=()):
+        return self.register(Gauge(name, description, labelnames))
+
+    def histogram(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, description, labelnames, buckets))
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'wili_stage_duration_seconds', 'Time spent in each pipeline stage', ['stage'])
+REQUEST_SECONDS = REGISTRY.histogram(
+    'wili_http_request_duration_seconds', 'HTTP request latency', ['endpoint', 'method', 'status'])
+QDRANT_CALLS = REGISTRY.counter(
+    'wili_qdrant_calls_total', 'Qdrant round trips', ['operation'])
+QDRANT_CALLS_PER_REQUEST = REGISTRY.histogram(
+    'wili_qdrant_calls_per_request', 'Qdrant round trips made while serving one request', ['endpoint'],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 32))
+CACHE_REQUESTS = REGISTRY.counter(
+    'wili_cache_requests_total', 'Cache lookups by result', ['cache', 'result'])
+ERRORS = REGISTRY.counter(
+    'wili_errors_total', 'Errors by stage', ['stage'])
+
+# Per-request trace: Qdrant round trips and the spans recorded while serving it
+_current_trace = contextvars.ContextVar('wili_request_trace', default=None)
+_listeners = []
+
+
+def add_listener(listener):
+    """Register a callable(stage, seconds) that is invoked after every span"""
+    _listeners.append(listener)
+
+
+def begin_request():
+    trace = {'start': time.perf_counter(), 'qdrant_calls': 0, 'spans': []}
+    _current_trace.set(trace)
+    return trace
+
+
+def end_request(endpoint, method, status):
+    """Record request-level metrics and return the finished trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    _current_trace.set(None)
+
+    trace['duration'] = time.perf_counter() - trace['start']
+    REQUEST_SECONDS.observe(trace['duration'], endpoint=endpoint, method=method, status=status)
+    QDRANT_CALLS_PER_REQUEST.observe(trace['qdrant_calls'], endpoint=endpoint)
+    return trace
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def count_qdrant_call(operation):
+    QDRANT_CALLS.inc(operation=operation)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace['qdrant_calls'] += 1
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def record_coalesced(cache):
+    """Count a request that waited on an identical in-flight computation"""
+    CACHE_REQUESTS.inc(cache=cache, result='coalesced')
+
+
+def record_error(stage):
+    ERRORS.inc(stage=stage)
+
+
+class span:
+    """Context manager that times a pipeline stage"""
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, stage=self.stage)
+        if exc_type is not None:
+            record_error(self.stage)
+
+        trace = _current_trace.get()
+        if trace is not None:
+            trace['spans'].append({
+                'stage': self.stage,
+                'offset_ms': round((self.start - trace['start']) * 1000, 3),
+                'duration_ms': round(elapsed * 1000, 3),
+                'error': exc_type.__name__ if exc_type else None,
+            })
+        for listener in _listeners:
+            listener(self.stage, elapsed)
+        return False
+
+
+def timed(stage):
+    """Decorator form of span"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
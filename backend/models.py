@@ -1,16 +1,150 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, MatchAny, Range,
+    PayloadSchemaType, SearchParams, Record
+)
 from config import Config
+from catalog import movie_catalog
+from projection import VECTOR_DIM
+from qdrant_router import EndpointRouter, health_checker
+import metrics
+import asyncio
+import numpy as np
 import uuid
 
+# Payload indexes for filtered fields; the movies entries mirror
+# MOVIE_PAYLOAD_SCHEMA in data/payload_schema.py, which ingestion enforces
+MOVIE_PAYLOAD_INDEXES = {
+    'movie_id': PayloadSchemaType.KEYWORD,
+    'genre': PayloadSchemaType.KEYWORD,
+    'rating': PayloadSchemaType.FLOAT,
+    'release_date': PayloadSchemaType.INTEGER,
+}
+USER_PAYLOAD_INDEXES = {
+    'username': PayloadSchemaType.KEYWORD,
+}
+LIST_PAYLOAD_INDEXES = {
+    'expires': PayloadSchemaType.INTEGER,
+}
+
+# Embedded stores live inside the client object, so every QdrantDB in the
+# process has to share one client to see the same data
+_embedded_clients = {}
+
+
+def endpoint_names():
+    """
+    Qdrant endpoints, primary first: the embedded QDRANT_LOCATION, the
+    QDRANT_ENDPOINTS list, or the single QDRANT_HOST:QDRANT_PORT server
+    """
+    if Config.QDRANT_LOCATION:
+        return [Config.QDRANT_LOCATION]
+    if Config.QDRANT_ENDPOINTS:
+        return [name.strip() for name in Config.QDRANT_ENDPOINTS.split(',') if name.strip()]
+    return [f"{Config.QDRANT_HOST}:{Config.QDRANT_PORT}"]
+
+
+def server_address(endpoint):
+    """Client arguments for an endpoint given as a URL or as host[:port]"""
+    if '://' in endpoint:
+        return {'url': endpoint}
+    host, _, port = endpoint.partition(':')
+    return {'host': host, 'port': int(port) if port else Config.QDRANT_PORT}
+
+
+def create_client(endpoint=None):
+    """Create a Qdrant client for an endpoint (default: the primary) or the embedded location"""
+    endpoint = endpoint or endpoint_names()[0]
+    if endpoint == Config.QDRANT_LOCATION:
+        if Config.QDRANT_LOCATION not in _embedded_clients:
+            _embedded_clients[Config.QDRANT_LOCATION] = QdrantClient(location=Config.QDRANT_LOCATION)
+        return _embedded_clients[Config.QDRANT_LOCATION]
+
+    return QdrantClient(**server_address(endpoint))
+
+
+class EmbeddedAsyncClient:
+    """Async facade over the shared embedded client, which has no network I/O to await"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+        return call
+
+
+def create_async_client(endpoint=None):
+    """Create an asyncio Qdrant client for an endpoint (default: the primary) or the embedded location"""
+    endpoint = endpoint or endpoint_names()[0]
+    if endpoint == Config.QDRANT_LOCATION:
+        return EmbeddedAsyncClient(create_client(endpoint))
+
+    return AsyncQdrantClient(**server_address(endpoint))
+
+
+def movie_id_filter(movie_id):
+    return Filter(must=[
+        FieldCondition(key="movie_id", match=MatchValue(value=movie_id))
+    ])
+
+
+def expires_before_filter(timestamp):
+    return Filter(must=[
+        FieldCondition(key="expires", range=Range(lt=timestamp))
+    ])
+
+
+def movie_ids_filter(movie_ids):
+    return Filter(must=[
+        FieldCondition(key="movie_id", match=MatchAny(any=list(movie_ids)))
+    ])
+
+
+def filter_excluded(movies, count, exclude_ids=None):
+    if exclude_ids:
+        movies = [m for m in movies if m.payload.get('movie_id') not in exclude_ids]
+
+    return movies[:count]
+
+
+def build_search_params(hnsw_ef=None, exact=None):
+    """Search-time HNSW settings, falling back to SEARCH_HNSW_EF / SEARCH_EXACT"""
+    hnsw_ef = Config.SEARCH_HNSW_EF if hnsw_ef is None else hnsw_ef
+    exact = Config.SEARCH_EXACT if exact is None else exact
+    if hnsw_ef is None and not exact:
+        return None
+    return SearchParams(hnsw_ef=hnsw_ef, exact=exact)
+
+
+def first_title_match(movies, title):
+    title_lower = title.lower()
+    matches = [m for m in movies if title_lower in m.payload.get('title', '').lower()]
+
+    return matches[0] if matches else None
+
 
 class QdrantDB:
-    def __init__(self):
-        self.client = QdrantClient(host=Config.QDRANT_HOST, port=Config.QDRANT_PORT)
+    def __init__(self, endpoints=None):
+        """
+        Args:
+            endpoints: (name, client) pairs, primary first; defaults to the configured endpoints
+        """
+        endpoints = endpoints or [(name, create_client(name)) for name in endpoint_names()]
+        self.router = EndpointRouter(endpoints)
+        # Writes and collection management go to the primary
+        self.client = self.router.clients[self.router.primary]
+        if len(endpoints) > 1:
+            for name, client in endpoints:
+                health_checker.watch(name, client)
         self._ensure_collections()
 
     def _ensure_collections(self):
-        """Ensure both movies and users collections exist"""
+        """Ensure the movies, users and recommendation lists collections exist"""
         collections = [col.name for col in self.client.get_collections().collections]
 
         # Users collection should already exist (movies)
@@ -19,39 +153,116 @@ class QdrantDB:
             self.client.create_collection(
                 collection_name=Config.USERS_COLLECTION,
                 vectors_config=VectorParams(
-                    size=Config.EMBEDDING_DIM,
+                    size=VECTOR_DIM,
                     distance=Distance.COSINE
                 )
             )
             print(f"Created collection: {Config.USERS_COLLECTION}")
+            collections.append(Config.USERS_COLLECTION)
+
+        # Candidate lists only live for RECOMMENDATION_CURSOR_TTL, so one stored
+        # at another vector size is dropped rather than reported
+        if Config.LISTS_COLLECTION in collections:
+            size = self.client.get_collection(Config.LISTS_COLLECTION).config.params.vectors.size
+            if size != VECTOR_DIM:
+                self.client.delete_collection(Config.LISTS_COLLECTION)
+                collections.remove(Config.LISTS_COLLECTION)
+        if Config.LISTS_COLLECTION not in collections:
+            self.client.create_collection(
+                collection_name=Config.LISTS_COLLECTION,
+                vectors_config=VectorParams(
+                    size=VECTOR_DIM,
+                    distance=Distance.COSINE
+                )
+            )
+            print(f"Created collection: {Config.LISTS_COLLECTION}")
+
+        # A projection added or removed since ingestion changes the vector size
+        for collection_name in (Config.MOVIES_COLLECTION, Config.USERS_COLLECTION):
+            if collection_name not in collections:
+                continue
+            size = self.client.get_collection(collection_name).config.params.vectors.size
+            if size != VECTOR_DIM:
+                print(f"Collection {collection_name} holds {size}-dim vectors but the backend uses {VECTOR_DIM} "
+                      f"(see EMBEDDING_PROJECTION_PATH); re-run ingestion and recreate the collection")
+
+        # Embedded stores ignore payload indexes
+        if Config.QDRANT_LOCATION:
+            return
+
+        self._ensure_payload_indexes(Config.USERS_COLLECTION, USER_PAYLOAD_INDEXES)
+        self._ensure_payload_indexes(Config.LISTS_COLLECTION, LIST_PAYLOAD_INDEXES)
+        if Config.MOVIES_COLLECTION in collections:
+            self._ensure_payload_indexes(Config.MOVIES_COLLECTION, MOVIE_PAYLOAD_INDEXES)
+
+    def _ensure_payload_indexes(self, collection_name, indexes):
+        """Create missing payload indexes, replace ones of the wrong type, then verify them"""
+        existing = self.client.get_collection(collection_name).payload_schema
+
+        for field, schema in indexes.items():
+            info = existing.get(field)
+            if info is not None and info.data_type == schema:
+                continue
+            if info is not None:
+                print(f"Payload index {collection_name}.{field} is {info.data_type}, expected {schema}; recreating")
+                self.client.delete_payload_index(collection_name=collection_name, field_name=field, wait=True)
+            self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=schema,
+                wait=True
+            )
+            print(f"Created payload index: {collection_name}.{field} ({schema})")
+
+        existing = self.client.get_collection(collection_name).payload_schema
+        for field, schema in indexes.items():
+            info = existing.get(field)
+            if info is None or info.data_type != schema:
+                print(f"Warning: payload index {collection_name}.{field} is not a {schema} index; "
+                      f"filtered searches on it will scan")
+
+    def _call(self, operation, **kwargs):
+        """Run one Qdrant client operation, counting and timing the round trip"""
+        metrics.count_qdrant_call(operation)
+        with metrics.span(f"qdrant_{operation}"):
+            return self.router.call(operation, kwargs)
+
+    def current_catalog(self):
+        """The columnar catalog if it was written from the points in the movies collection, else None"""
+        if movie_catalog.check_due():
+            try:
+                points = self._call('scroll',
+                    collection_name=Config.MOVIES_COLLECTION,
+                    limit=1,
+                    with_payload=['ingestion_id'],
+                    with_vectors=False
+                )[0]
+                movie_catalog.confirm(points[0].payload if points else None)
+            except Exception as e:
+                print(f"Error checking the columnar catalog against the collection: {e}")
+        return movie_catalog.current()
 
     def get_random_movies(self, count=3, exclude_ids=None):
         """Get random movies from the database"""
+        catalog = self.current_catalog()
+        if catalog:
+            return filter_excluded(catalog.records(count * 10), count, exclude_ids)
+
         # Qdrant doesn't have native random sampling, so we'll use scroll with random offset
-        movies = self.client.scroll(
+        movies = self._call('scroll',
             collection_name=Config.MOVIES_COLLECTION,
             limit=count * 10,  # Get more to filter out excluded
             with_payload=True,
             with_vectors=False
         )[0]
 
-        if exclude_ids:
-            movies = [m for m in movies if m.payload.get('movie_id') not in exclude_ids]
-
-        return movies[:count]
+        return filter_excluded(movies, count, exclude_ids)
 
     def get_movie_by_id(self, movie_id):
         """Get a specific movie by its ID"""
-        results = self.client.scroll(
+        results = self._call('scroll',
             collection_name=Config.MOVIES_COLLECTION,
-            scroll_filter={
-                "must": [
-                    {
-                        "key": "movie_id",
-                        "match": {"value": movie_id}
-                    }
-                ]
-            },
+            scroll_filter=movie_id_filter(movie_id),
             limit=1,
             with_payload=True,
             with_vectors=True
@@ -59,21 +270,36 @@ class QdrantDB:
 
         return results[0] if results else None
 
+    def list_movies(self, limit=100):
+        """Get the first page of movies (payload only)"""
+        catalog = self.current_catalog()
+        if catalog:
+            return catalog.records(limit)
+
+        return self._call('scroll',
+            collection_name=Config.MOVIES_COLLECTION,
+            limit=limit,
+            with_payload=True,
+            with_vectors=False
+        )[0]
+
+    @metrics.timed('title_lookup')
     def search_movie_by_title(self, title):
         """Search for a movie by title (case-insensitive partial match)"""
+        catalog = self.current_catalog()
+        if catalog:
+            return catalog.find_title(title)
+
         # Since Qdrant doesn't support full-text search natively,
         # we'll scroll through and filter in Python
-        movies = self.client.scroll(
+        movies = self._call('scroll',
             collection_name=Config.MOVIES_COLLECTION,
             limit=1000,
             with_payload=True,
             with_vectors=False
         )[0]
 
-        title_lower = title.lower()
-        matches = [m for m in movies if title_lower in m.payload.get('title', '').lower()]
-
-        return matches[0] if matches else None
+        return first_title_match(movies, title)
 
     def create_user(self, username, password_hash, user_embedding):
         """Create a new user in the users collection"""
@@ -89,7 +315,7 @@ class QdrantDB:
             }
         )
 
-        self.client.upsert(
+        self._call('upsert',
             collection_name=Config.USERS_COLLECTION,
             points=[point]
         )
@@ -98,16 +324,11 @@ class QdrantDB:
 
     def get_user_by_username(self, username):
         """Get user by username"""
-        results = self.client.scroll(
+        results = self._call('scroll',
             collection_name=Config.USERS_COLLECTION,
-            scroll_filter={
-                "must": [
-                    {
-                        "key": "username",
-                        "match": {"value": username}
-                    }
-                ]
-            },
+            scroll_filter=Filter(must=[
+                FieldCondition(key="username", match=MatchValue(value=username))
+            ]),
             limit=1,
             with_payload=True,
             with_vectors=True
@@ -115,37 +336,423 @@ class QdrantDB:
 
         return results[0] if results else None
 
+    def get_user_by_id(self, user_id):
+        """Get user by ID, including the user's embedding"""
+        results = self._call('retrieve',
+            collection_name=Config.USERS_COLLECTION,
+            ids=[user_id],
+            with_vectors=True
+        )
+
+        return results[0] if results else None
+
     def update_user_embedding(self, user_id, new_embedding):
         """Update a user's embedding"""
         # Get current user data WITH VECTORS
-        user = self.client.retrieve(
+        user = self.get_user_by_id(user_id)
+
+        # Update with new embedding
+        point = PointStruct(
+            id=user_id,
+            vector=new_embedding.tolist(),
+            payload=user.payload
+        )
+
+        self._call('upsert',
+            collection_name=Config.USERS_COLLECTION,
+            points=[point]
+        )
+
+    def get_user_feed(self, user_id):
+        """Get a user's precomputed feed record (payload only, no vectors)"""
+        results = self._call('retrieve',
             collection_name=Config.USERS_COLLECTION,
             ids=[user_id],
-            with_vectors=True  # 👈 include vectors
-        )[0]
+            with_payload=['feed'],
+            with_vectors=False
+        )
+
+        return results[0].payload.get('feed') if results else None
+
+    def set_user_feed(self, user_id, feed):
+        """Store a user's feed record without touching the rest of the payload"""
+        self._call('set_payload',
+            collection_name=Config.USERS_COLLECTION,
+            payload={'feed': feed},
+            points=[user_id]
+        )
+
+    def get_movies_by_point_ids(self, point_ids):
+        """Get movies by their Qdrant point IDs, in the given order"""
+        catalog = self.current_catalog()
+        if catalog:
+            return self._hydrate(catalog, [Record(id=point_id, payload=None) for point_id in point_ids])
+
+        movies = self._call('retrieve',
+            collection_name=Config.MOVIES_COLLECTION,
+            ids=list(point_ids),
+            with_payload=True,
+            with_vectors=False
+        )
+        by_id = {movie.id: movie for movie in movies}
+
+        return [by_id[point_id] for point_id in point_ids if point_id in by_id]
+
+    def store_recommendation_list(self, list_id, query_embedding, candidates):
+        """Store a ranked candidate list under its random list ID, with the query that ranked it"""
+        vector = np.asarray(query_embedding, dtype=np.float32).tolist()
+        self._call('upsert',
+            collection_name=Config.LISTS_COLLECTION,
+            points=[PointStruct(id=list_id, vector=vector, payload=candidates)]
+        )
+
+    def get_recommendation_list(self, list_id):
+        """Get a stored candidate list's payload, or None if it was never stored or has been purged"""
+        results = self._call('retrieve',
+            collection_name=Config.LISTS_COLLECTION,
+            ids=[list_id],
+            with_payload=True,
+            with_vectors=False
+        )
+
+        return results[0].payload if results else None
+
+    def purge_recommendation_lists(self, expired_before, max_lists):
+        """
+        Delete candidate lists that expired before a timestamp
+
+        Past max_lists stored lists, the older half (by expiry) is dropped
+        early, so a burst of searches can't grow the collection without bound.
+        """
+        self._call('delete',
+            collection_name=Config.LISTS_COLLECTION,
+            points_selector=expires_before_filter(expired_before)
+        )
+        stored = self._call('count', collection_name=Config.LISTS_COLLECTION, exact=True).count
+        if stored > max_lists:
+            self._call('delete',
+                collection_name=Config.LISTS_COLLECTION,
+                points_selector=expires_before_filter(expired_before + Config.RECOMMENDATION_CURSOR_TTL // 2)
+            )
+
+    def get_movies_by_movie_ids(self, movie_ids):
+        """Get movies by their movie IDs, in the given order"""
+        by_id = {}
+        catalog = self.current_catalog()
+        if catalog:
+            for movie_id in movie_ids:
+                movie = catalog.find_movie(movie_id)
+                if movie is not None:
+                    by_id[movie_id] = movie
+            metrics.record_cache('catalog', len(by_id) == len(set(movie_ids)))
+
+        missing = list(dict.fromkeys(movie_id for movie_id in movie_ids if movie_id not in by_id))
+        if missing:
+            movies = self._call('scroll',
+                collection_name=Config.MOVIES_COLLECTION,
+                scroll_filter=movie_ids_filter(missing),
+                limit=len(missing),
+                with_payload=True,
+                with_vectors=False
+            )[0]
+            by_id.update((movie.payload['movie_id'], movie) for movie in movies)
+
+        return [by_id[movie_id] for movie_id in movie_ids if movie_id in by_id]
+
+    def get_all_movie_vectors(self, batch_size=1024):
+        """
+        Every movie vector, scrolled out of Qdrant in batches
+
+        Returns:
+            (point IDs, float32 matrix with one row per movie)
+        """
+        point_ids, vectors = [], []
+        offset = None
+        while True:
+            points, offset = self._call('scroll',
+                collection_name=Config.MOVIES_COLLECTION,
+                limit=batch_size,
+                offset=offset,
+                with_payload=False,
+                with_vectors=True
+            )
+            for point in points:
+                point_ids.append(point.id)
+                vectors.append(point.vector)
+            if offset is None:
+                break
+
+        return point_ids, np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+
+    @metrics.timed('search')
+    def search_similar_movies(self, query_embedding, filters=None, limit=3, hnsw_ef=None, exact=None):
+        """
+        Search for similar movies using vector similarity
+
+        hnsw_ef and exact override SEARCH_HNSW_EF / SEARCH_EXACT for this query:
+        a larger hnsw_ef trades latency for recall, exact skips the index entirely.
+        """
+        catalog = self.current_catalog()
+        search_params = {
+            "collection_name": Config.MOVIES_COLLECTION,
+            "query_vector": query_embedding.tolist(),
+            "limit": limit,
+            # With a local catalog only ids, scores and the movie id to check the row against cross the wire
+            "with_payload": ['movie_id'] if catalog else True
+        }
+
+        if filters:
+            search_params["query_filter"] = filters
+
+        params = build_search_params(hnsw_ef, exact)
+        if params:
+            search_params["search_params"] = params
+
+        results = self._call('search', **search_params)
+        return self._hydrate(catalog, results) if catalog else results
+
+    def _hydrate(self, catalog, points):
+        """Fill in movie payloads from the local catalog, fetching any it doesn't have yet"""
+        missing = catalog.fill_payloads(points)
+        metrics.record_cache('catalog', not missing)
+        if missing:
+            payloads = {record.id: record.payload for record in self._call('retrieve',
+                collection_name=Config.MOVIES_COLLECTION,
+                ids=[point.id for point in missing],
+                with_payload=True,
+                with_vectors=False
+            )}
+            for point in missing:
+                point.payload = payloads.get(point.id)
+
+        return [point for point in points if point.payload is not None]
+
+
+class AsyncQdrantDB:
+    """asyncio counterpart of QdrantDB's read and profile-update paths, used by the ASGI server"""
+
+    def __init__(self, endpoints=None):
+        """
+        Args:
+            endpoints: (name, async client) pairs, primary first; defaults to the configured endpoints
+        """
+        endpoints = endpoints or [(name, create_async_client(name)) for name in endpoint_names()]
+        self.router = EndpointRouter(endpoints)
+        self.client = self.router.clients[self.router.primary]
+
+    async def _call(self, operation, **kwargs):
+        """Run one Qdrant client operation, counting and timing the round trip"""
+        metrics.count_qdrant_call(operation)
+        with metrics.span(f"qdrant_{operation}"):
+            return await self.router.call_async(operation, kwargs)
+
+    async def current_catalog(self):
+        """The columnar catalog if it was written from the points in the movies collection, else None"""
+        if movie_catalog.check_due():
+            try:
+                points = (await self._call('scroll',
+                    collection_name=Config.MOVIES_COLLECTION,
+                    limit=1,
+                    with_payload=['ingestion_id'],
+                    with_vectors=False
+                ))[0]
+                movie_catalog.confirm(points[0].payload if points else None)
+            except Exception as e:
+                print(f"Error checking the columnar catalog against the collection: {e}")
+        return movie_catalog.current()
+
+    async def get_random_movies(self, count=3, exclude_ids=None):
+        """Get random movies from the database"""
+        catalog = await self.current_catalog()
+        if catalog:
+            return filter_excluded(catalog.records(count * 10), count, exclude_ids)
+
+        movies = (await self._call('scroll',
+            collection_name=Config.MOVIES_COLLECTION,
+            limit=count * 10,  # Get more to filter out excluded
+            with_payload=True,
+            with_vectors=False
+        ))[0]
+
+        return filter_excluded(movies, count, exclude_ids)
+
+    async def get_movie_by_id(self, movie_id):
+        """Get a specific movie by its ID"""
+        results = (await self._call('scroll',
+            collection_name=Config.MOVIES_COLLECTION,
+            scroll_filter=movie_id_filter(movie_id),
+            limit=1,
+            with_payload=True,
+            with_vectors=True
+        ))[0]
+
+        return results[0] if results else None
+
+    async def list_movies(self, limit=100):
+        """Get the first page of movies (payload only)"""
+        catalog = await self.current_catalog()
+        if catalog:
+            return catalog.records(limit)
+
+        return (await self._call('scroll',
+            collection_name=Config.MOVIES_COLLECTION,
+            limit=limit,
+            with_payload=True,
+            with_vectors=False
+        ))[0]
+
+    async def search_movie_by_title(self, title):
+        """Search for a movie by title (case-insensitive partial match)"""
+        with metrics.span('title_lookup'):
+            catalog = await self.current_catalog()
+            if catalog:
+                return catalog.find_title(title)
+
+            movies = (await self._call('scroll',
+                collection_name=Config.MOVIES_COLLECTION,
+                limit=1000,
+                with_payload=True,
+                with_vectors=False
+            ))[0]
+
+            return first_title_match(movies, title)
+
+    async def get_user_by_id(self, user_id):
+        """Get user by ID, including the user's embedding"""
+        results = await self._call('retrieve',
+            collection_name=Config.USERS_COLLECTION,
+            ids=[user_id],
+            with_vectors=True
+        )
+
+        return results[0] if results else None
+
+    async def update_user_embedding(self, user_id, new_embedding):
+        """Update a user's embedding"""
+        user = await self.get_user_by_id(user_id)
 
-        # Update with new embedding
         point = PointStruct(
             id=user_id,
             vector=new_embedding.tolist(),
             payload=user.payload
         )
 
-        self.client.upsert(
+        await self._call('upsert',
             collection_name=Config.USERS_COLLECTION,
             points=[point]
         )
 
-    def search_similar_movies(self, query_embedding, filters=None, limit=3):
-        """Search for similar movies using vector similarity"""
+    async def get_movies_by_point_ids(self, point_ids):
+        """Get movies by their Qdrant point IDs, in the given order"""
+        catalog = await self.current_catalog()
+        if catalog:
+            return await self._hydrate(catalog, [Record(id=point_id, payload=None) for point_id in point_ids])
+
+        movies = await self._call('retrieve',
+            collection_name=Config.MOVIES_COLLECTION,
+            ids=list(point_ids),
+            with_payload=True,
+            with_vectors=False
+        )
+        by_id = {movie.id: movie for movie in movies}
+
+        return [by_id[point_id] for point_id in point_ids if point_id in by_id]
+
+    async def get_movies_by_movie_ids(self, movie_ids):
+        """Get movies by their movie IDs, in the given order"""
+        by_id = {}
+        catalog = await self.current_catalog()
+        if catalog:
+            for movie_id in movie_ids:
+                movie = catalog.find_movie(movie_id)
+                if movie is not None:
+                    by_id[movie_id] = movie
+            metrics.record_cache('catalog', len(by_id) == len(set(movie_ids)))
+
+        missing = list(dict.fromkeys(movie_id for movie_id in movie_ids if movie_id not in by_id))
+        if missing:
+            movies = (await self._call('scroll',
+                collection_name=Config.MOVIES_COLLECTION,
+                scroll_filter=movie_ids_filter(missing),
+                limit=len(missing),
+                with_payload=True,
+                with_vectors=False
+            ))[0]
+            by_id.update((movie.payload['movie_id'], movie) for movie in movies)
+
+        return [by_id[movie_id] for movie_id in movie_ids if movie_id in by_id]
+
+    async def store_recommendation_list(self, list_id, query_embedding, candidates):
+        """Store a ranked candidate list under its random list ID, with the query that ranked it"""
+        vector = np.asarray(query_embedding, dtype=np.float32).tolist()
+        await self._call('upsert',
+            collection_name=Config.LISTS_COLLECTION,
+            points=[PointStruct(id=list_id, vector=vector, payload=candidates)]
+        )
+
+    async def get_recommendation_list(self, list_id):
+        """Get a stored candidate list's payload, or None if it was never stored or has been purged"""
+        results = await self._call('retrieve',
+            collection_name=Config.LISTS_COLLECTION,
+            ids=[list_id],
+            with_payload=True,
+            with_vectors=False
+        )
+
+        return results[0].payload if results else None
+
+    async def purge_recommendation_lists(self, expired_before, max_lists):
+        """Delete candidate lists that expired before a timestamp, dropping the older half past max_lists"""
+        await self._call('delete',
+            collection_name=Config.LISTS_COLLECTION,
+            points_selector=expires_before_filter(expired_before)
+        )
+        stored = (await self._call('count', collection_name=Config.LISTS_COLLECTION, exact=True)).count
+        if stored > max_lists:
+            await self._call('delete',
+                collection_name=Config.LISTS_COLLECTION,
+                points_selector=expires_before_filter(expired_before + Config.RECOMMENDATION_CURSOR_TTL // 2)
+            )
+
+    async def search_similar_movies(self, query_embedding, filters=None, limit=3, hnsw_ef=None, exact=None):
+        """
+        Search for similar movies using vector similarity
+
+        hnsw_ef and exact override SEARCH_HNSW_EF / SEARCH_EXACT for this query:
+        a larger hnsw_ef trades latency for recall, exact skips the index entirely.
+        """
+        catalog = await self.current_catalog()
         search_params = {
             "collection_name": Config.MOVIES_COLLECTION,
             "query_vector": query_embedding.tolist(),
             "limit": limit,
-            "with_payload": True
+            # With a local catalog only ids, scores and the movie id to check the row against cross the wire
+            "with_payload": ['movie_id'] if catalog else True
         }
 
         if filters:
             search_params["query_filter"] = filters
 
-        return self.client.search(**search_params)
+        params = build_search_params(hnsw_ef, exact)
+        if params:
+            search_params["search_params"] = params
+
+        with metrics.span('search'):
+            results = await self._call('search', **search_params)
+            return await self._hydrate(catalog, results) if catalog else results
+
+    async def _hydrate(self, catalog, points):
+        """Fill in movie payloads from the local catalog, fetching any it doesn't have yet"""
+        missing = catalog.fill_payloads(points)
+        metrics.record_cache('catalog', not missing)
+        if missing:
+            payloads = {record.id: record.payload for record in await self._call('retrieve',
+                collection_name=Config.MOVIES_COLLECTION,
+                ids=[point.id for point in missing],
+                with_payload=True,
+                with_vectors=False
+            )}
+            for point in missing:
+                point.payload = payloads.get(point.id)
+
+        return [point for point in points if point.payload is not None]
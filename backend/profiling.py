@@ -0,0 +1,92 @@
+# profiling.py
+"""
+Opt-in sampling profiler for slow requests.
+
+A single background thread samples the stacks of threads that are serving
+requests. When a request finishes slower than the threshold its samples are
+written in collapsed-stack format (one "frame;frame;frame count" line per
+stack, ready for flamegraph.pl or speedscope), preceded by the request's spans.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from config import Config
+
+
+class SlowRequestProfiler:
+    def __init__(self, threshold_ms, interval_ms, output_dir):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.output_dir = output_dir
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_sampler(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='slow-request-sampler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[_collapse(frame)] += 1
+
+    def begin(self):
+        with self._lock:
+            self._ensure_sampler()
+            self._active[threading.get_ident()] = Counter()
+
+    def end(self, endpoint, trace):
+        """Stop sampling the current thread and keep the profile if the request was slow"""
+        with self._lock:
+            samples = self._active.pop(threading.get_ident(), None)
+        if samples is None or trace is None or trace['duration'] < self.threshold:
+            return None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_endpoint = ''.join(c if c.isalnum() else '_' for c in endpoint).strip('_') or 'root'
+        path = os.path.join(
+            self.output_dir,
+            f"slow-{time.strftime('%Y%m%d-%H%M%S')}-{int(trace['duration'] * 1000)}ms-{safe_endpoint}.txt"
+        )
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# endpoint: {endpoint}\n")
+            f.write(f"# duration_ms: {round(trace['duration'] * 1000, 3)}\n")
+            f.write(f"# qdrant_calls: {trace['qdrant_calls']}\n")
+            for item in trace['spans']:
+                f.write(f"# span: {json.dumps(item)}\n")
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+def _collapse(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+def create_profiler():
+    """Return the slow-request profiler if it is enabled in the config"""
+    if not Config.PROFILE_SLOW_REQUESTS:
+        return None
+    return SlowRequestProfiler(
+        threshold_ms=Config.SLOW_REQUEST_MS,
+        interval_ms=Config.PROFILE_SAMPLE_INTERVAL_MS,
+        output_dir=Config.PROFILE_OUTPUT_DIR
+    )
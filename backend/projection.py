@@ -0,0 +1,50 @@
+# projection.py
+"""
+Read side of the embedding projection fitted by data/fit_projection.py.
+
+When the artifact exists, ingestion stored every movie vector projected down
+to its output dimension, so every vector the backend compares against them
+(encoded prompts, averaged user embeddings, combined movie+prompt embeddings)
+has to live in the same reduced space. encode_text projects its output, and
+VECTOR_DIM is the size of every vector stored in or searched against Qdrant.
+"""
+import os
+import numpy as np
+from config import Config
+
+
+class EmbeddingProjection:
+    def __init__(self, path):
+        with np.load(path) as artifact:
+            self.mean = artifact['mean'].astype(np.float32)
+            self.components = artifact['components'].astype(np.float32)
+            self.version = str(artifact['version'])
+            self.source_model = str(artifact['source_model'])
+        self.output_dim, self.input_dim = self.components.shape
+        if self.input_dim != Config.EMBEDDING_DIM:
+            raise ValueError(f"Projection {self.version} expects {self.input_dim}-dim embeddings, "
+                             f"but the model produces {Config.EMBEDDING_DIM}")
+
+    def project(self, embeddings):
+        """Project one embedding or a batch of them, normalized like the stored movie vectors"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+        embeddings = embeddings / np.where(norms > 0, norms, 1.0)
+
+        projected = (embeddings - self.mean) @ self.components.T
+        norms = np.linalg.norm(projected, axis=-1, keepdims=True)
+        return projected / np.where(norms > 0, norms, 1.0)
+
+
+def load_projection(path):
+    """Load the projection at path, or return None to serve full-dimension embeddings"""
+    if not path or not os.path.exists(path):
+        return None
+    projection = EmbeddingProjection(path)
+    print(f"Loaded embedding projection {projection.version} "
+          f"({projection.input_dim} -> {projection.output_dim} dims) from {path}")
+    return projection
+
+
+projection = load_projection(Config.EMBEDDING_PROJECTION_PATH)
+VECTOR_DIM = projection.output_dim if projection else Config.EMBEDDING_DIM
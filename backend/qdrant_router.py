@@ -0,0 +1,211 @@
+# qdrant_router.py
+"""
+Read routing and failover across several Qdrant endpoints (QDRANT_ENDPOINTS).
+
+Writes always go to the primary, the first endpoint; the other endpoints are
+replicas kept in sync by Qdrant, not by the backend. Reads (search, retrieve,
+scroll, count) go to the healthy endpoint with the fewest requests in flight,
+rotating between endpoints that tie. A read that fails with a connection or
+server error marks its endpoint down and is retried on the next endpoint.
+Client errors (4xx) are raised at once, since every endpoint would answer the
+same.
+
+A down endpoint is skipped until a health check finds it reachable again. The
+health checker probes every endpoint with get_collections every
+QDRANT_HEALTH_CHECK_INTERVAL seconds, in a background thread. Without a probe,
+the endpoint is skipped for QDRANT_ENDPOINT_COOLDOWN seconds. Endpoint state is
+shared by name within the process, so the sync and async clients see the same
+health and in-flight counts.
+"""
+import itertools
+import threading
+import time
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from config import Config
+import metrics
+
+READ_OPERATIONS = frozenset({'search', 'search_batch', 'retrieve', 'scroll', 'count'})
+
+ENDPOINT_SECONDS = metrics.REGISTRY.histogram(
+    'wili_qdrant_endpoint_duration_seconds', 'Qdrant call latency per endpoint', ['endpoint', 'operation'])
+ENDPOINT_ERRORS = metrics.REGISTRY.counter(
+    'wili_qdrant_endpoint_errors_total', 'Qdrant calls that failed on an endpoint', ['endpoint'])
+ENDPOINT_UP = metrics.REGISTRY.gauge(
+    'wili_qdrant_endpoint_up', 'Whether an endpoint is taking reads (1) or skipped as down (0)', ['endpoint'])
+ENDPOINT_IN_FLIGHT = metrics.REGISTRY.gauge(
+    'wili_qdrant_endpoint_in_flight', 'Qdrant calls in flight per endpoint', ['endpoint'])
+FAILOVERS = metrics.REGISTRY.counter(
+    'wili_qdrant_failovers_total', 'Reads retried on another endpoint after an error', ['operation'])
+
+
+def is_endpoint_error(error):
+    """Errors that say something about the endpoint rather than the request"""
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code is None or error.status_code >= 500
+    return isinstance(error, (ResponseHandlingException, ConnectionError, TimeoutError))
+
+
+class EndpointState:
+    """Health and in-flight count of one endpoint"""
+
+    def __init__(self, name):
+        self.name = name
+        self.in_flight = 0
+        self.down_until = 0.0
+        self._lock = threading.Lock()
+        ENDPOINT_UP.set(1, endpoint=name)
+        ENDPOINT_IN_FLIGHT.set(0, endpoint=name)
+
+    @property
+    def up(self):
+        return time.monotonic() >= self.down_until
+
+    def begin(self):
+        with self._lock:
+            self.in_flight += 1
+            ENDPOINT_IN_FLIGHT.set(self.in_flight, endpoint=self.name)
+
+    def end(self, operation, elapsed, error=None):
+        with self._lock:
+            self.in_flight -= 1
+            ENDPOINT_IN_FLIGHT.set(self.in_flight, endpoint=self.name)
+        ENDPOINT_SECONDS.observe(elapsed, endpoint=self.name, operation=operation)
+        if error is None:
+            self.mark_up()
+        elif is_endpoint_error(error):
+            ENDPOINT_ERRORS.inc(endpoint=self.name)
+            self.mark_down(error)
+
+    def mark_up(self):
+        with self._lock:
+            was_down = not self.up
+            self.down_until = 0.0
+        if was_down:
+            print(f"Qdrant endpoint {self.name} is back up")
+        ENDPOINT_UP.set(1, endpoint=self.name)
+
+    def mark_down(self, error):
+        with self._lock:
+            was_up = self.up
+            self.down_until = time.monotonic() + Config.QDRANT_ENDPOINT_COOLDOWN
+        if was_up:
+            print(f"Qdrant endpoint {self.name} marked down: {error}")
+        ENDPOINT_UP.set(0, endpoint=self.name)
+
+
+_states = {}
+_states_lock = threading.Lock()
+
+
+def endpoint_state(name):
+    with _states_lock:
+        if name not in _states:
+            _states[name] = EndpointState(name)
+        return _states[name]
+
+
+class HealthChecker:
+    """Background thread that probes the watched endpoints and marks them up or down"""
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def watch(self, name, client):
+        with self._lock:
+            self._clients.setdefault(name, client)
+            self._start()
+
+    def _start(self):
+        # Also restarts the thread in a worker forked after it was started
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='qdrant-health', daemon=True)
+            self._thread.start()
+
+    def check(self):
+        with self._lock:
+            clients = list(self._clients.items())
+        for name, client in clients:
+            state = endpoint_state(name)
+            start = time.perf_counter()
+            try:
+                client.get_collections()
+            except Exception as e:
+                state.mark_down(e)
+            else:
+                state.mark_up()
+            ENDPOINT_SECONDS.observe(time.perf_counter() - start, endpoint=name, operation='health_check')
+
+    def _run(self):
+        while True:
+            time.sleep(Config.QDRANT_HEALTH_CHECK_INTERVAL)
+            self.check()
+
+
+health_checker = HealthChecker()
+
+
+class EndpointRouter:
+    """Sends writes to the primary and balances reads over every endpoint"""
+
+    def __init__(self, endpoints):
+        """
+        Args:
+            endpoints: (name, client) pairs, primary first; sync or async clients
+        """
+        assert endpoints, "At least one Qdrant endpoint is required"
+        self.clients = dict(endpoints)
+        self.names = [name for name, _ in endpoints]
+        self.primary = self.names[0]
+        self._turn = itertools.count()
+
+    def read_order(self):
+        """Endpoint names to try for a read: up endpoints by load, then down ones as a last resort"""
+        # Start the stable sort from a rotating endpoint so ties take turns
+        start = next(self._turn) % len(self.names)
+        states = [endpoint_state(name) for name in self.names[start:] + self.names[:start]]
+        up = sorted((s for s in states if s.up), key=lambda s: s.in_flight)
+        down = sorted((s for s in states if not s.up), key=lambda s: s.down_until)
+        return [s.name for s in up + down]
+
+    def targets(self, operation):
+        if operation in READ_OPERATIONS and len(self.names) > 1:
+            return self.read_order()
+        return [self.primary]
+
+    def call(self, operation, kwargs):
+        """Run a client operation on the primary, or a read on the best endpoint with failover"""
+        targets = self.targets(operation)
+        for attempt, name in enumerate(targets):
+            state = endpoint_state(name)
+            state.begin()
+            start = time.perf_counter()
+            try:
+                result = getattr(self.clients[name], operation)(**kwargs)
+            except Exception as e:
+                state.end(operation, time.perf_counter() - start, e)
+                if not is_endpoint_error(e) or attempt == len(targets) - 1:
+                    raise
+                FAILOVERS.inc(operation=operation)
+                continue
+            state.end(operation, time.perf_counter() - start)
+            return result
+
+    async def call_async(self, operation, kwargs):
+        """call() for routers over async clients"""
+        targets = self.targets(operation)
+        for attempt, name in enumerate(targets):
+            state = endpoint_state(name)
+            state.begin()
+            start = time.perf_counter()
+            try:
+                result = await getattr(self.clients[name], operation)(**kwargs)
+            except Exception as e:
+                state.end(operation, time.perf_counter() - start, e)
+                if not is_endpoint_error(e) or attempt == len(targets) - 1:
+                    raise
+                FAILOVERS.inc(operation=operation)
+                continue
+            state.end(operation, time.perf_counter() - start)
+            return result
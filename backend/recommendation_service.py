@@ -1,8 +1,20 @@
 import google.generativeai as genai
 import json
+import os
+import re
+import threading
+import time
+import uuid
+import jwt
+import numpy as np
+from qdrant_client.models import Filter, FieldCondition, Range, MatchValue, ScoredPoint
 from config import Config
 from models import QdrantDB
-from embedding_service import encode_text, combine_embeddings, calculate_similarity
+from embedding_service import encode_text, combine_embeddings
+from wili_calibration import wili_likelihood
+from cache import TTLCache, SingleFlight
+from llm_gateway import llm_gateway
+import metrics
 
 # Configure Gemini
 genai.configure(api_key=Config.GEMINI_API_KEY)
@@ -11,112 +23,481 @@ gemini_model = genai.GenerativeModel('gemini-2.5-flash')
 
 db = QdrantDB()
 
+# Finished recommendation responses, keyed on the normalized request
+recommendation_cache = TTLCache(maxsize=Config.RECOMMENDATION_CACHE_SIZE, ttl=Config.RECOMMENDATION_CACHE_TTL)
+recommendation_flight = SingleFlight()
+
+EXPIRED_LIST_ERROR = "These recommendations have expired, please search again"
+# Cursors are a few hundred bytes; anything much longer wasn't issued here
+MAX_CURSOR_LENGTH = 1024
+# Seconds between deletions of expired candidate lists, per process
+LIST_PURGE_INTERVAL = 60
+_last_purge = float('-inf')
+_purge_lock = threading.Lock()
+
+@metrics.timed('synopsis_load')
 def load_movie_synopsis(movie_id):
     """Load movie synopsis from movies_for_embedding.json"""
     try:
         with open(Config.MOVIES_JSON_PATH, 'r', encoding='utf-8') as f:
             movies_data = json.load(f)
-        
+
         for movie in movies_data:
             if movie['movie_id'] == movie_id:
                 return movie.get('text_for_embedding', '')
-        
+
         return None
     except Exception as e:
+        metrics.record_error('synopsis_load')
         print(f"Error loading synopsis: {e}")
         return None
 
 
+def load_movie_cards():
+    """Load the compact movie cards built by data/build_movie_cards.py"""
+    try:
+        with open(Config.MOVIE_CARDS_PATH, 'r', encoding='utf-8') as f:
+            cards = json.load(f)
+    except FileNotFoundError:
+        print(f"No movie cards at {Config.MOVIE_CARDS_PATH}, explanations will use full synopses")
+        return {}
+    except (ValueError, OSError) as e:
+        # A truncated file from an interrupted build must not keep the backend from starting
+        metrics.record_error('movie_cards_load')
+        print(f"Error loading movie cards from {Config.MOVIE_CARDS_PATH}, explanations will use full synopses: {e}")
+        return {}
+    if not isinstance(cards, dict):
+        print(f"Movie cards at {Config.MOVIE_CARDS_PATH} are not a JSON object, explanations will use full synopses")
+        return {}
+    return cards
+
+
+movie_cards = load_movie_cards()
+
+
+def load_movie_context(movie_id):
+    """Movie information for explanation prompts: the compact card, or the full synopsis without one"""
+    card = movie_cards.get(movie_id)
+    metrics.record_cache('movie_cards', card is not None)
+    if card:
+        return card
+    return load_movie_synopsis(movie_id)
+
+
+def movie_info(payload):
+    """Build the movie_info block returned by the API from a movie payload"""
+    return {
+        'genre': payload.get('genre', 'N/A'),
+        'rating': payload.get('rating', 'N/A'),
+        'release_date': payload.get('release_date', 'N/A'),
+        'runtime_min': payload.get('runtime_min', 'N/A')
+    }
+
+
+def no_synopsis_explanation():
+    return "This movie was recommended based on similarity to your preferences."
+
+
+def fallback_explanation(movie_title):
+    return f"{movie_title} was recommended based on its similarity to your preferences and the themes in your request."
+
+
+def build_explanation_prompt(movie_title, synopsis, user_prompt):
+    """Create the Gemini prompt that explains one recommendation"""
+    return f"""You are a movie recommendation assistant. Based on the following information, explain in 2-3 sentences why this movie was recommended to the user.
+
+User's Request: {user_prompt}
+
+Recommended Movie: {movie_title}
+
+Movie Information:
+{synopsis}
+
+Provide a concise, engaging explanation that highlights how this movie matches the user's request. Focus on key themes, style, and atmosphere."""
+
+
+def build_batch_explanation_prompt(movies, user_prompt):
+    """
+    Create one Gemini prompt that explains several recommendations
+
+    Args:
+        movies: List of (movie_id, movie_title, synopsis) tuples
+        user_prompt: User's original prompt
+
+    Returns:
+        Prompt asking for a JSON object mapping movie ID to explanation
+    """
+    sections = "\n\n---\n\n".join(
+        f"Movie ID: {movie_id}\nRecommended Movie: {movie_title}\nMovie Information:\n{synopsis}"
+        for movie_id, movie_title, synopsis in movies
+    )
+    example = ", ".join(f'"{movie_id}": "..."' for movie_id, _, _ in movies)
+
+    return f"""You are a movie recommendation assistant. Based on the following information, explain in 2-3 sentences why each movie was recommended to the user.
+
+User's Request: {user_prompt}
+
+{sections}
+
+For each movie, provide a concise, engaging explanation that highlights how it matches the user's request. Focus on key themes, style, and atmosphere.
+
+Respond with only a JSON object that maps each Movie ID to its explanation: {{{example}}}"""
+
+
+def parse_batch_explanations(text, movie_ids):
+    """
+    Parse a batched explanation response
+
+    Returns:
+        Dictionary of movie ID to explanation for every ID the response covers
+        (empty if the response is not the expected JSON object)
+    """
+    # Models often wrap JSON in a markdown code fence
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    explanations = {}
+    for movie_id in movie_ids:
+        explanation = data.get(movie_id)
+        if isinstance(explanation, str) and explanation.strip():
+            explanations[movie_id] = explanation.strip()
+    return explanations
+
+
+def find_mentioned_movie(movies, user_prompt):
+    """Return the first movie whose title appears in the prompt, if any"""
+    # This is simplified - you might want better NLP
+    prompt_lower = user_prompt.lower()
+    for movie in movies:
+        title = movie.payload.get('title', '').lower()
+        if title in prompt_lower:
+            return movie
+    return None
+
+
+def build_filters(min_rating=None, min_release_date=None, genre=None):
+    """Build the Qdrant filter for the recommendation search (payload types per data/payload_schema.py)"""
+    conditions = []
+
+    if min_rating:
+        conditions.append(FieldCondition(
+            key="rating",
+            range=Range(gte=float(min_rating))
+        ))
+
+    if min_release_date:
+        conditions.append(FieldCondition(
+            key="release_date",
+            range=Range(gte=int(float(min_release_date)))
+        ))
+
+    if genre:
+        # Genres are stored as lowercase keyword arrays; matches if any element is equal
+        conditions.append(FieldCondition(
+            key="genre",
+            match=MatchValue(value=genre.strip().lower())
+        ))
+
+    return Filter(must=conditions) if conditions else None
+
+
+def dataset_version():
+    """Identify the loaded catalog so cached responses never outlive a data refresh"""
+    if Config.DATASET_VERSION:
+        return Config.DATASET_VERSION
+    try:
+        stat = os.stat(Config.MOVIES_JSON_PATH)
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+    except OSError:
+        return 'unknown'
+
+
+def recommendation_cache_key(user_prompt, min_rating=None, min_release_date=None, genre=None):
+    """Normalize a recommendation request into a cache key"""
+    return (
+        dataset_version(),
+        ' '.join(user_prompt.lower().split()),
+        float(min_rating) if min_rating else None,
+        int(float(min_release_date)) if min_release_date else None,
+        genre.strip().lower() if genre else None
+    )
+
+
+def encode_cursor(list_id, offset, expires):
+    """
+    Signed cursor for the page of a stored candidate list starting at offset
+
+    It names the list by its random ID; the prompt and ranked movies stay in
+    the lists collection, so the cursor is a fixed size and reveals nothing.
+    """
+    payload = {'lid': list_id, 'offset': offset, 'exp': expires}
+    return jwt.encode(payload, Config.SECRET_KEY, algorithm='HS256')
+
+
+def decode_cursor(cursor):
+    """
+    List ID and offset behind a cursor
+
+    Returns:
+        Tuple of ((list ID, offset), error message)
+    """
+    if not isinstance(cursor, str) or len(cursor) > MAX_CURSOR_LENGTH:
+        return None, "Invalid cursor"
+    try:
+        payload = jwt.decode(cursor, Config.SECRET_KEY, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        return None, EXPIRED_LIST_ERROR
+    except jwt.InvalidTokenError:
+        return None, "Invalid cursor"
+
+    list_id, offset = payload.get('lid'), payload.get('offset')
+    if not isinstance(list_id, str) or not isinstance(offset, int) or offset < 0:
+        return None, "Invalid cursor"
+    return (list_id, offset), None
+
+
+def new_candidates(user_prompt, results):
+    """A ranked candidate list for later pages, by movie ID so it survives a re-ingestion"""
+    return {
+        'list_id': str(uuid.uuid4()),
+        'user_prompt': user_prompt,
+        'movie_ids': [result.payload['movie_id'] for result in results],
+        'scores': [result.score for result in results],
+        'expires': int(time.time()) + Config.RECOMMENDATION_CURSOR_TTL
+    }
+
+
+def has_next_page(candidates, offset=0):
+    return offset + Config.RECOMMENDATION_PAGE_SIZE < len(candidates['movie_ids'])
+
+
+def purge_due():
+    """Whether this process should delete expired lists now (at most once per LIST_PURGE_INTERVAL)"""
+    global _last_purge
+    with _purge_lock:
+        now = time.monotonic()
+        if now - _last_purge < LIST_PURGE_INTERVAL:
+            return False
+        _last_purge = now
+        return True
+
+
+def store_candidates(user_prompt, query_embedding, results):
+    """Rank-ordered candidates of a search, stored for later pages when there are any"""
+    candidates = new_candidates(user_prompt, results)
+    if has_next_page(candidates):
+        list_id = candidates['list_id']
+        db.store_recommendation_list(list_id, query_embedding,
+                                     {k: v for k, v in candidates.items() if k != 'list_id'})
+        if purge_due():
+            db.purge_recommendation_lists(int(time.time()), Config.RECOMMENDATION_LISTS_MAX)
+    return candidates
+
+
+def load_candidates(list_id):
+    """
+    A stored candidate list
+
+    Returns:
+        Tuple of (candidates, error message)
+    """
+    stored = db.get_recommendation_list(list_id)
+    if stored is None or stored['expires'] <= time.time():
+        return None, EXPIRED_LIST_ERROR
+    return dict(stored, list_id=list_id), None
+
+
+def next_cursor(candidates, offset):
+    """Cursor for the page after the one at offset, or None on the last page"""
+    if not has_next_page(candidates, offset):
+        return None
+    return encode_cursor(candidates['list_id'], offset + Config.RECOMMENDATION_PAGE_SIZE, candidates['expires'])
+
+
+def cursor_live(page):
+    """Whether a cached page's next cursor can still be served"""
+    if not page['next_cursor']:
+        return True
+    _, error = decode_cursor(page['next_cursor'])
+    return error is None
+
+
+def candidate_page(candidates, offset):
+    """Movie ids and scores of the page starting at offset"""
+    end = offset + Config.RECOMMENDATION_PAGE_SIZE
+    return candidates['movie_ids'][offset:end], candidates['scores'][offset:end]
+
+
+def scored_movies(movies, movie_ids, scores):
+    """Rebuild search results for a page from its hydrated movies, in ranked order"""
+    by_id = {movie.payload['movie_id']: movie for movie in movies}
+    return [ScoredPoint(id=by_id[movie_id].id, version=0, score=score, payload=by_id[movie_id].payload)
+            for movie_id, score in zip(movie_ids, scores) if movie_id in by_id]
+
+
+def format_recommendation(result, explanation):
+    return {
+        'movie_title': result.payload['title'],
+        'similarity_score': round(result.score * 100, 2),
+        'explanation': explanation,
+        'movie_info': movie_info(result.payload)
+    }
+
+
+def format_wili_result(movie, likelihood):
+    return {
+        'movie_title': movie.payload['title'],
+        'likelihood': round(likelihood, 2),
+        'movie_info': movie_info(movie.payload)
+    }
+
+
+@metrics.timed('explanation')
 def generate_explanation(movie_title, movie_id, user_prompt):
     """
     Generate AI explanation for why a movie was recommended
-    
+
     Args:
         movie_title: Title of the recommended movie
         movie_id: ID of the movie
         user_prompt: User's original prompt
-    
+
     Returns:
         AI-generated explanation string
     """
-    # Load synopsis and reviews
-    synopsis = load_movie_synopsis(movie_id)
-    
+    # Load movie card (or full synopsis and reviews)
+    synopsis = load_movie_context(movie_id)
+
     if not synopsis:
-        return "This movie was recommended based on similarity to your preferences."
-    
-    # Create prompt for Gemini
-    prompt = f"""You are a movie recommendation assistant. Based on the following information, explain in 2-3 sentences why this movie was recommended to the user.
+        return no_synopsis_explanation()
 
-User's Request: {user_prompt}
+    return explain_with_synopsis(movie_title, synopsis, user_prompt)
 
-Recommended Movie: {movie_title}
 
-Movie Information:
-{synopsis}
+def explain_with_synopsis(movie_title, synopsis, user_prompt):
+    """Ask Gemini to explain one recommendation whose synopsis is already loaded"""
+    # Create prompt for Gemini
+    prompt = build_explanation_prompt(movie_title, synopsis, user_prompt)
 
-Provide a concise, engaging explanation that highlights how this movie matches the user's request. Focus on key themes, style, and atmosphere."""
-    
     try:
-        response = gemini_model.generate_content(prompt)
+        with metrics.span('llm'):
+            response = llm_gateway.generate(gemini_model, prompt)
         return response.text
     except Exception as e:
         print(f"Error generating explanation: {e}")
-        return f"{movie_title} was recommended based on its similarity to your preferences and the themes in your request."
+        return fallback_explanation(movie_title)
+
+
+@metrics.timed('explanation')
+def generate_explanations(movies, user_prompt):
+    """
+    Generate AI explanations for several recommendations with one Gemini call
+
+    Movies the batched response does not cover are explained one call at a time.
+
+    Args:
+        movies: List of (movie_id, movie_title) tuples
+        user_prompt: User's original prompt
+
+    Returns:
+        Dictionary of movie ID to explanation string
+    """
+    explanations = {}
+    pending = []
+    for movie_id, movie_title in movies:
+        synopsis = load_movie_context(movie_id)
+        if synopsis:
+            pending.append((movie_id, movie_title, synopsis))
+        else:
+            explanations[movie_id] = no_synopsis_explanation()
+
+    if len(pending) > 1:
+        prompt = build_batch_explanation_prompt(pending, user_prompt)
+        try:
+            with metrics.span('llm'):
+                response = llm_gateway.generate(gemini_model, prompt)
+        except Exception as e:
+            print(f"Error generating explanations: {e}")
+            explanations.update({movie_id: fallback_explanation(title) for movie_id, title, _ in pending})
+            return explanations
+
+        parsed = parse_batch_explanations(response.text, [movie_id for movie_id, _, _ in pending])
+        if len(parsed) < len(pending):
+            metrics.record_error('llm_batch_parse')
+        explanations.update(parsed)
+
+    for movie_id, movie_title, synopsis in pending:
+        if movie_id not in explanations:
+            explanations[movie_id] = explain_with_synopsis(movie_title, synopsis, user_prompt)
+
+    return explanations
+
+
+def explain_results(results, user_prompt):
+    """Format one page of search results, explaining only the movies on it"""
+    if Config.BATCH_EXPLANATIONS:
+        explanations = generate_explanations(
+            [(result.payload['movie_id'], result.payload['title']) for result in results],
+            user_prompt
+        )
+        return [format_recommendation(result, explanations[result.payload['movie_id']])
+                for result in results]
+
+    recommendations = []
+    for result in results:
+        movie_id = result.payload['movie_id']
+        movie_title = result.payload['title']
+
+        explanation = generate_explanation(movie_title, movie_id, user_prompt)
+
+        recommendations.append(format_recommendation(result, explanation))
+
+    return recommendations
 
 
 def wili_check(user_id, movie_title):
     """
     Use Case A: Check if user would like a specific movie
-    
+
     Args:
         user_id: User's ID
         movie_title: Title of movie to check
-    
+
     Returns:
         Dictionary with likelihood percentage and explanation
     """
     try:
-        # ✅ FIXED: Ensure we retrieve vectors with the user data
-        user = db.client.retrieve(
-            collection_name=Config.USERS_COLLECTION,
-            ids=[user_id],
-            with_vectors=True  # 👈 ADDED THIS LINE
-        )[0]
-        
+        user = db.get_user_by_id(user_id)
+        if user is None:
+            return None, "User not found"
+
         user_embedding = user.vector
-        
-        # Check if user has completed survey
-        if user_embedding is None or len(user_embedding) == 0:
+
+        # Check if user has completed survey; signup stores an all-zero profile
+        if user_embedding is None or not np.any(user_embedding):
             return None, "Please complete the movie survey first to get personalized recommendations"
-        
+
         # Find the movie
         movie = db.search_movie_by_title(movie_title)
         if not movie:
             return None, f"Movie '{movie_title}' not found in database"
-        
+
         # Get movie embedding
         movie = db.get_movie_by_id(movie.payload['movie_id'])
         if movie is None or movie.vector is None:
             return None, f"Movie '{movie_title}' data is incomplete"
-        
-        movie_embedding = movie.vector
-        
-        # Calculate similarity
-        likelihood = calculate_similarity(user_embedding, movie_embedding)
-        
-        return {
-            'movie_title': movie.payload['title'],
-            'likelihood': round(likelihood, 2),
-            'movie_info': {
-                'genre': movie.payload.get('genre', 'N/A'),
-                'rating': movie.payload.get('rating', 'N/A'),
-                'release_date': movie.payload.get('release_date', 'N/A'),
-                'runtime_min': movie.payload.get('runtime_min', 'N/A')
-            }
-        }, None
-    
+
+        return format_wili_result(movie, wili_likelihood(user_embedding, movie.vector)), None
+
     except Exception as e:
+        metrics.record_error('wili_check')
         print(f"Error in wili_check: {e}")
         return None, f"An error occurred: {str(e)}"
 
@@ -124,41 +505,115 @@ def wili_check(user_id, movie_title):
 def get_recommendations(user_prompt, min_rating=None, min_release_date=None, genre=None):
     """
     Use Case B: Get movie recommendations based on prompt and filters
-    
+
+    Identical requests are answered from the recommendation cache, and
+    concurrent identical requests share a single computation. The search
+    ranks RECOMMENDATION_CANDIDATES movies but only the first page is
+    explained; the rest are served through next_cursor.
+
     Args:
         user_prompt: User's text prompt
         min_rating: Minimum rating filter (optional)
         min_release_date: Minimum release date filter (optional)
         genre: Genre filter (optional)
-    
+
+    Returns:
+        Dictionary with the first page of recommendations and the cursor for the next one
+    """
+    try:
+        key = recommendation_cache_key(user_prompt, min_rating, min_release_date, genre)
+    except (TypeError, ValueError) as e:
+        return None, f"An error occurred: {str(e)}"
+
+    # A cached first page is only useful while its cursor hasn't expired
+    hit, page = recommendation_cache.get(key)
+    hit = hit and cursor_live(page)
+    metrics.record_cache('recommendations', hit)
+    if hit:
+        return page, None
+
+    def compute():
+        with llm_gateway.request_scope() as llm_scope:
+            page, error = _compute_recommendations(user_prompt, min_rating, min_release_date, genre)
+        # Responses with fallback explanations are served but not cached
+        if error is None and not llm_scope.failed:
+            recommendation_cache.set(key, page)
+        return page, error
+
+    (page, error), shared = recommendation_flight.do(key, compute)
+    if shared:
+        metrics.record_coalesced('recommendations')
+
+    return page, error
+
+
+def get_recommendation_page(cursor):
+    """
+    Serve a later page of recommendations from the candidate list behind a cursor
+
+    Args:
+        cursor: next_cursor from the previous page
+
     Returns:
-        List of recommended movies with explanations
+        Dictionary with the page of recommendations and the cursor for the next one
     """
+    decoded, error = decode_cursor(cursor)
+    if error:
+        return None, error
+    list_id, offset = decoded
+
+    key = ('page', list_id, offset)
+    hit, page = recommendation_cache.get(key)
+    metrics.record_cache('recommendations', hit)
+    if hit:
+        return page, None
+
+    def compute():
+        with llm_gateway.request_scope() as llm_scope:
+            page, error = _compute_recommendation_page(list_id, offset)
+        if error is None and not llm_scope.failed:
+            recommendation_cache.set(key, page)
+        return page, error
+
+    (page, error), shared = recommendation_flight.do(key, compute)
+    if shared:
+        metrics.record_coalesced('recommendations')
+
+    return page, error
+
+
+def _compute_recommendation_page(list_id, offset):
+    """Hydrate and explain one page of the stored candidate list behind a cursor"""
+    try:
+        candidates, error = load_candidates(list_id)
+        if error:
+            return None, error
+        movie_ids, scores = candidate_page(candidates, offset)
+        results = scored_movies(db.get_movies_by_movie_ids(movie_ids), movie_ids, scores)
+
+        return {
+            'recommendations': explain_results(results, candidates['user_prompt']),
+            'next_cursor': next_cursor(candidates, offset)
+        }, None
+
+    except Exception as e:
+        metrics.record_error('recommendations')
+        print(f"Error in get_recommendation_page: {e}")
+        return None, f"An error occurred: {str(e)}"
+
+
+def _compute_recommendations(user_prompt, min_rating=None, min_release_date=None, genre=None):
+    """Run the encode, search and explanation pipeline for one request"""
     try:
         # Parse prompt to extract movie mentions
-        movie_mentioned = None
-        prompt_parts = user_prompt.lower().split()
-        
-        # Try to find a mentioned movie (this is simplified - you might want better NLP)
-        movies = db.client.scroll(
-            collection_name=Config.MOVIES_COLLECTION,
-            limit=100,
-            with_payload=True,
-            with_vectors=False
-        )[0]
-        
-        for movie in movies:
-            title = movie.payload.get('title', '').lower()
-            if title in user_prompt.lower():
-                movie_mentioned = movie
-                break
-        
+        movie_mentioned = find_mentioned_movie(db.list_movies(limit=100), user_prompt)
+
         # Compute query embedding
         if movie_mentioned:
             # Get movie embedding
             full_movie = db.get_movie_by_id(movie_mentioned.payload['movie_id'])
             movie_embedding = full_movie.vector
-            
+
             # Encode remaining text
             text_without_movie = user_prompt.lower().replace(movie_mentioned.payload['title'].lower(), '').strip()
             if text_without_movie:
@@ -169,54 +624,19 @@ def get_recommendations(user_prompt, min_rating=None, min_release_date=None, gen
         else:
             # Just encode the entire prompt
             query_embedding = encode_text(user_prompt)
-        
-        # Build filters
-        filters = {"must": []}
-        
-        if min_rating:
-            filters["must"].append({
-                "key": "rating",
-                "range": {"gte": float(min_rating)}
-            })
-        
-        if min_release_date:
-            filters["must"].append({
-                "key": "release_date",
-                "range": {"gte": min_release_date}
-            })
-        
-        if genre:
-            filters["must"].append({
-                "key": "genre",
-                "match": {"text": genre.lower()}
-            })
-        
+
         # Search for similar movies
-        filter_param = filters if filters["must"] else None
-        results = db.search_similar_movies(query_embedding, filters=filter_param, limit=3)
-        
-        # Generate explanations for each recommendation
-        recommendations = []
-        for result in results:
-            movie_id = result.payload['movie_id']
-            movie_title = result.payload['title']
-            
-            explanation = generate_explanation(movie_title, movie_id, user_prompt)
-            
-            recommendations.append({
-                'movie_title': movie_title,
-                'similarity_score': round(result.score * 100, 2),
-                'explanation': explanation,
-                'movie_info': {
-                    'genre': result.payload.get('genre', 'N/A'),
-                    'rating': result.payload.get('rating', 'N/A'),
-                    'release_date': result.payload.get('release_date', 'N/A'),
-                    'runtime_min': result.payload.get('runtime_min', 'N/A')
-                }
-            })
-        
-        return recommendations, None
-    
+        filter_param = build_filters(min_rating, min_release_date, genre)
+        # Rank a longer list than one page; later pages are served from it
+        results = db.search_similar_movies(query_embedding, filters=filter_param, limit=Config.RECOMMENDATION_CANDIDATES)
+        candidates = store_candidates(user_prompt, query_embedding, results)
+
+        return {
+            'recommendations': explain_results(results[:Config.RECOMMENDATION_PAGE_SIZE], user_prompt),
+            'next_cursor': next_cursor(candidates, 0)
+        }, None
+
     except Exception as e:
+        metrics.record_error('recommendations')
         print(f"Error in get_recommendations: {e}")
         return None, f"An error occurred: {str(e)}"
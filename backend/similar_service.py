@@ -0,0 +1,111 @@
+# similar_service.py
+"""
+"More like this" lookups served from the precomputed kNN graph.
+
+data/build_knn_graph.py stores each movie's top-K neighbors as arrays; this
+module keeps them in memory, picks up rebuilt files without a restart, and
+answers similar-movie requests without a vector search.
+"""
+import os
+import threading
+import numpy as np
+from config import Config
+from models import QdrantDB
+from recommendation_service import movie_info
+import metrics
+
+db = QdrantDB()
+
+
+class KnnGraph:
+    """In-memory neighbor graph, reloaded when the file on disk is replaced"""
+
+    def __init__(self, path):
+        self.path = path
+        self._mtime = None
+        # (row of each movie id, graph arrays), replaced as a whole on reload so
+        # a lookup never mixes rows from one file with arrays from another
+        self._loaded = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            with np.load(self.path) as data:
+                graph = {name: data[name] for name in ('movie_ids', 'point_ids', 'neighbors', 'scores')}
+            rows = {movie_id: row for row, movie_id in enumerate(graph['movie_ids'].tolist())}
+            self._loaded = (rows, graph)
+            self._mtime = mtime
+            print(f"Loaded kNN graph for {len(rows)} movies from {self.path}")
+
+    def neighbors(self, movie_id, limit):
+        """
+        A movie's point ID and nearest neighbors, read from a single version of the graph
+
+        Returns:
+            Tuple of (point ID, list of (point ID, similarity) tuples best first),
+            or None for an unknown movie
+        """
+        self._refresh()
+        loaded = self._loaded
+        if loaded is None:
+            return None
+        rows, graph = loaded
+        row = rows.get(movie_id)
+        if row is None:
+            return None
+
+        neighbors = graph['neighbors'][row, :limit]
+        return int(graph['point_ids'][row]), list(zip(graph['point_ids'][neighbors].tolist(),
+                                                      graph['scores'][row, :limit].tolist()))
+
+
+def get_similar_movies(movie_id, limit=10):
+    """
+    Get the movies most similar to a given movie
+
+    Args:
+        movie_id: ID of the movie
+        limit: Maximum number of similar movies to return
+
+    Returns:
+        Dictionary with the movie and its similar movies
+    """
+    try:
+        with metrics.span('similar_lookup'):
+            found = knn_graph.neighbors(movie_id, limit)
+        metrics.record_cache('knn_graph', found is not None)
+        if found is None:
+            return None, f"Movie '{movie_id}' not found"
+
+        source_id, neighbors = found
+        point_ids = [source_id] + [point_id for point_id, _ in neighbors]
+        movies = {movie.id: movie for movie in db.get_movies_by_point_ids(point_ids)}
+        movie = movies.get(point_ids[0])
+
+        return {
+            'movie_id': movie_id,
+            'movie_title': movie.payload['title'] if movie else None,
+            'similar': [{
+                'movie_id': movies[point_id].payload['movie_id'],
+                'movie_title': movies[point_id].payload['title'],
+                'similarity_score': round(score * 100, 2),
+                'movie_info': movie_info(movies[point_id].payload)
+            } for point_id, score in neighbors if point_id in movies]
+        }, None
+
+    except Exception as e:
+        metrics.record_error('similar')
+        print(f"Error in get_similar_movies: {e}")
+        return None, f"An error occurred: {str(e)}"
+
+
+knn_graph = KnnGraph(Config.KNN_GRAPH_PATH)
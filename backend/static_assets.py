@@ -0,0 +1,112 @@
+# static_assets.py
+"""
+Serves the frontend built by build_static.py from memory.
+
+The manifest and every file variant are loaded once at startup, so a request
+is a dictionary lookup: no filesystem checks, the best precompressed encoding
+the client accepts, a strong ETag per variant (304 on a match), and a
+year-long immutable cache for fingerprinted files.
+"""
+import json
+import os
+from flask import Response
+from config import Config
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+# Server preference when the client accepts several encodings equally
+ENCODING_PREFERENCE = ('br', 'gzip', 'identity')
+
+
+def parse_accept_encoding(header):
+    """Map of encoding -> q-value from an Accept-Encoding header"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header, available):
+    """Best of the available encodings the client accepts (identity unless refused)"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*')
+
+    def quality(encoding):
+        if encoding in accepted:
+            return accepted[encoding]
+        if wildcard is not None:
+            return wildcard
+        return 1.0 if encoding == 'identity' else 0.0
+
+    candidates = [e for e in ENCODING_PREFERENCE if e == 'identity' or e in available]
+    best = max(candidates, key=lambda e: (quality(e), -ENCODING_PREFERENCE.index(e)))
+    return best if quality(best) > 0 else 'identity'
+
+
+class StaticAssets:
+    def __init__(self, build_dir):
+        with open(os.path.join(build_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        bodies = {}
+
+        def body(name):
+            if name not in bodies:
+                with open(os.path.join(build_dir, name), 'rb') as f:
+                    bodies[name] = f.read()
+            return bodies[name]
+
+        self.assets = {}
+        for path, entry in manifest.items():
+            variants = {'identity': body(entry['file'])}
+            variants.update({encoding: body(v['file']) for encoding, v in entry['encodings'].items()})
+            self.assets[path] = {
+                'content_type': entry['content_type'],
+                'etag': entry['etag'],
+                'cache_control': IMMUTABLE_CACHE if entry['immutable'] else REVALIDATE_CACHE,
+                'variants': variants,
+            }
+        self.size = sum(len(b) for b in bodies.values())
+
+    def response(self, path, request):
+        """Response for a frontend path; unknown paths get index.html, as before"""
+        asset = self.assets.get(path) or self.assets['index.html']
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'), asset['variants'])
+        # Strong ETags must differ between byte-different representations
+        etag = asset['etag'] if encoding == 'identity' else f"{asset['etag']}-{encoding}"
+
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': asset['cache_control'],
+            'Vary': 'Accept-Encoding',
+        }
+        if etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(asset['variants'][encoding], mimetype=asset['content_type'], headers=headers)
+
+
+def load_static_assets(build_dir):
+    """Load the built frontend, or return None to serve frontend/ straight from disk"""
+    if not os.path.exists(os.path.join(build_dir, 'manifest.json')):
+        print(f"No static build at {build_dir}, serving the frontend from disk (run build_static.py)")
+        return None
+    assets = StaticAssets(build_dir)
+    print(f"Loaded {len(assets.assets)} static assets ({assets.size:,} bytes) from {build_dir}")
+    return assets
+
+
+static_assets = load_static_assets(Config.STATIC_BUILD_DIR)
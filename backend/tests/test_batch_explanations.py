@@ -0,0 +1,113 @@
+# test_batch_explanations.py
+"""
+Batched recommendation explanations against the benchmark's stub Gemini model.
+
+Run from the backend/ folder:
+    python -m unittest discover -s tests
+"""
+import json
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('QDRANT_LOCATION', ':memory:')
+
+import benchmark
+benchmark.install_stub_modules(stub_encoder=True)
+
+from config import Config
+import recommendation_service
+
+MOVIES = [('tt01', 'Heat'), ('tt02', 'Ronin'), ('tt03', 'Thief')]
+BATCH_EXPLANATION = "This movie matches the tone and themes of your request."
+
+
+class ScriptedGeminiModel(benchmark.StubGeminiModel):
+    """Stub model that answers batched prompts with a fixed reply and records every prompt"""
+
+    def __init__(self, batch_reply=None):
+        super().__init__()
+        self.batch_reply = batch_reply
+        self.prompts = []
+
+    def _answer(self, prompt):
+        self.prompts.append(prompt)
+        if self.batch_reply is not None and "Movie ID:" in prompt:
+            return self.batch_reply
+        if "Movie ID:" in prompt:
+            return super()._answer(prompt)
+        title = prompt.split("Recommended Movie: ", 1)[1].splitlines()[0]
+        return f"Single explanation for {title}"
+
+    def batch_calls(self):
+        return sum("Movie ID:" in prompt for prompt in self.prompts)
+
+
+def search_result(movie_id, title):
+    return SimpleNamespace(id=movie_id, score=0.9, payload={'movie_id': movie_id, 'title': title})
+
+
+class BatchExplanationTest(unittest.TestCase):
+    def explain(self, model, batch=True):
+        results = [search_result(movie_id, title) for movie_id, title in MOVIES]
+        with mock.patch.object(recommendation_service, 'gemini_model', model), \
+                mock.patch.object(recommendation_service, 'load_movie_context', lambda movie_id: "A synopsis."), \
+                mock.patch.object(Config, 'BATCH_EXPLANATIONS', batch):
+            recommendations = recommendation_service.explain_results(results, "a tense heist movie")
+        return {r['movie_title']: r['explanation'] for r in recommendations}
+
+    def test_one_call_explains_every_movie(self):
+        model = ScriptedGeminiModel()
+        explanations = self.explain(model)
+
+        self.assertEqual(model.calls, 1)
+        self.assertEqual(explanations, {title: BATCH_EXPLANATION for _, title in MOVIES})
+
+    def test_malformed_reply_falls_back_to_one_call_per_movie(self):
+        model = ScriptedGeminiModel(batch_reply='{"tt01": "Heat is a heist movie", "tt02": ')
+        explanations = self.explain(model)
+
+        self.assertEqual(model.calls, 1 + len(MOVIES))
+        self.assertEqual(explanations, {title: f"Single explanation for {title}" for _, title in MOVIES})
+
+    def test_partial_reply_falls_back_for_the_missing_movies(self):
+        model = ScriptedGeminiModel(batch_reply="```json\n" + json.dumps({'tt02': "Ronin has car chases."}) + "\n```")
+        explanations = self.explain(model)
+
+        self.assertEqual(model.calls, 1 + 2)
+        self.assertEqual(explanations, {
+            'Heat': "Single explanation for Heat",
+            'Ronin': "Ronin has car chases.",
+            'Thief': "Single explanation for Thief",
+        })
+
+    def test_batching_disabled_makes_one_call_per_movie(self):
+        model = ScriptedGeminiModel()
+        explanations = self.explain(model, batch=False)
+
+        self.assertEqual(model.calls, len(MOVIES))
+        self.assertEqual(model.batch_calls(), 0)
+        self.assertEqual(explanations, {title: f"Single explanation for {title}" for _, title in MOVIES})
+
+
+class ParseBatchExplanationsTest(unittest.TestCase):
+    def test_parses_fenced_json(self):
+        text = "```json\n" + json.dumps({'tt01': " Heat. ", 'tt02': "Ronin."}) + "\n```"
+        self.assertEqual(recommendation_service.parse_batch_explanations(text, ['tt01', 'tt02']),
+                         {'tt01': "Heat.", 'tt02': "Ronin."})
+
+    def test_drops_missing_empty_and_non_string_entries(self):
+        text = json.dumps({'tt01': "Heat.", 'tt02': "", 'tt03': 3, 'tt99': "Unknown."})
+        self.assertEqual(recommendation_service.parse_batch_explanations(text, ['tt01', 'tt02', 'tt03']),
+                         {'tt01': "Heat."})
+
+    def test_malformed_reply_parses_to_nothing(self):
+        for text in (None, "", "no json here", '{"tt01": ', '["tt01"]'):
+            self.assertEqual(recommendation_service.parse_batch_explanations(text, ['tt01']), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# test_catalog.py
+"""
+Columnar catalog reloads and the ingestion id check against the movies collection.
+
+Run from the backend/ folder:
+    python -m unittest discover -s tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data'))
+os.environ.setdefault('QDRANT_LOCATION', ':memory:')
+
+import benchmark
+benchmark.install_stub_modules(stub_encoder=True)
+
+from qdrant_client.models import Distance, PointStruct, VectorParams
+from columnar_catalog import write_catalog
+from config import Config
+from catalog import CatalogHandle
+import models
+
+VECTORS = np.random.default_rng(0).standard_normal((4, models.VECTOR_DIM)).astype(np.float32)
+
+
+class CatalogVersionTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'catalog')
+        self.handle = CatalogHandle(self.path, check_interval=0)
+        patcher = mock.patch.object(models, 'movie_catalog', self.handle)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+
+        self.db = models.QdrantDB()
+        self.db.client.recreate_collection(
+            collection_name=Config.MOVIES_COLLECTION,
+            vectors_config=VectorParams(size=models.VECTOR_DIM, distance=Distance.COSINE)
+        )
+
+    def ingest(self, ingestion_id, titles, catalog=True):
+        """Upload one movie per title under point ids 0..N-1, as ingestion does"""
+        payloads = [{'movie_id': f"tt-{title}", 'title': title, 'genre': [], 'url': '', 'ingestion_id': ingestion_id}
+                    for title in titles]
+        self.db.client.upsert(collection_name=Config.MOVIES_COLLECTION, points=[
+            PointStruct(id=i, vector=VECTORS[i].tolist(), payload=payload) for i, payload in enumerate(payloads)
+        ])
+        if catalog:
+            # A new manifest must not share the old one's mtime
+            time.sleep(0.01)
+            write_catalog(list(range(len(payloads))), payloads, self.path, vectors=VECTORS[:len(payloads)])
+
+    def titles(self, point_ids):
+        return [movie.payload['title'] for movie in self.db.get_movies_by_point_ids(point_ids)]
+
+    def test_matching_catalog_is_served(self):
+        self.ingest('run-1', ['Heat', 'Ronin', 'Thief', 'Drive'])
+
+        self.assertIsNotNone(self.db.current_catalog())
+        self.assertEqual(self.titles([0, 2]), ['Heat', 'Thief'])
+
+    def test_catalog_of_an_older_run_is_not_served(self):
+        self.ingest('run-1', ['Heat', 'Ronin', 'Thief', 'Drive'])
+        self.ingest('run-2', ['Drive', 'Thief', 'Ronin', 'Heat'], catalog=False)
+
+        self.assertIsNone(self.db.current_catalog())
+        self.assertEqual(self.titles([0, 2]), ['Drive', 'Ronin'])
+
+    def test_replaced_catalog_is_remapped(self):
+        self.ingest('run-1', ['Heat', 'Ronin', 'Thief', 'Drive'])
+        self.assertEqual(self.titles([0]), ['Heat'])
+        self.ingest('run-2', ['Drive', 'Thief', 'Ronin', 'Heat'])
+
+        self.assertEqual(self.db.current_catalog().ingestion_id, 'run-2')
+        self.assertEqual(self.titles([0]), ['Drive'])
+
+    def test_search_rejects_rows_for_another_movie(self):
+        self.ingest('run-1', ['Heat', 'Ronin', 'Thief', 'Drive'])
+        self.assertIsNotNone(self.db.current_catalog())
+        # Re-ingested after the last check: the catalog still looks current
+        self.handle.check_interval = 3600
+        self.ingest('run-2', ['Drive', 'Thief', 'Ronin', 'Heat'], catalog=False)
+
+        results = self.db.search_similar_movies(VECTORS[0], limit=1)
+        self.assertEqual([movie.payload['title'] for movie in results], ['Drive'])
+
+    def test_movie_ids_resolve_across_reingestion(self):
+        self.ingest('run-1', ['Heat', 'Ronin', 'Thief', 'Drive'])
+        movie_ids = ['tt-Thief', 'tt-Heat', 'tt-Gone']
+        self.assertEqual([m.payload['title'] for m in self.db.get_movies_by_movie_ids(movie_ids)], ['Thief', 'Heat'])
+
+        # Same movies under new point ids, read from Qdrant and then from the new catalog
+        self.ingest('run-2', ['Drive', 'Thief', 'Ronin', 'Heat'], catalog=False)
+        self.assertEqual([m.payload['title'] for m in self.db.get_movies_by_movie_ids(movie_ids)], ['Thief', 'Heat'])
+        self.ingest('run-2', ['Drive', 'Thief', 'Ronin', 'Heat'])
+        self.assertEqual([m.id for m in self.db.get_movies_by_movie_ids(movie_ids)], [1, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
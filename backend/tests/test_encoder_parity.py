@@ -0,0 +1,86 @@
+# test_encoder_parity.py
+"""
+Cosine drift of the exported ONNX encoders against the float32 torch reference.
+
+Skipped unless the reference model and the files written by export_onnx.py
+(and export_onnx.py --int8) are available. Run from the backend/ folder:
+    python -m unittest discover -s tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('QDRANT_LOCATION', ':memory:')
+
+from config import Config
+from encoders import load_encoder, onnx_model_file
+from encoder_benchmark import cosine_rows
+
+# encoder_benchmark.py's default --min-cosine
+MIN_COSINE = 0.99
+
+TEXTS = [
+    "a tense heist movie with a great score",
+    "something funny and light for a family night",
+    "slow, quiet space drama about loneliness",
+    "90s crime thriller like Heat",
+    "I want to cry: a sad romance set in Paris",
+    "Title: Ronin. Genre: action, thriller. A group of mercenaries is hired to steal a mysterious briefcase "
+    "in the south of France, and the car chases through Nice and Paris are among the best ever filmed.",
+    "Title: Moon. Genre: science fiction, drama. Near the end of a three-year stint mining helium-3 on the "
+    "far side of the Moon, an astronaut starts to question who he is.",
+]
+
+
+class stubs_set_aside:
+    """Put the real sentence_transformers in place of a stub another test module registered"""
+
+    def __enter__(self):
+        self.stub = sys.modules.get('sentence_transformers')
+        # Stubs are plain ModuleType objects, with no file behind them
+        if self.stub is not None and getattr(self.stub, '__file__', None) is None:
+            del sys.modules['sentence_transformers']
+        else:
+            self.stub = None
+
+    def __exit__(self, *exc):
+        if self.stub is not None:
+            sys.modules['sentence_transformers'] = self.stub
+
+
+class OnnxParityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        exported = [backend for backend in ('onnx', 'onnx-int8')
+                    if os.path.exists(os.path.join(Config.EMBEDDING_ONNX_PATH, onnx_model_file(backend)))]
+        if not exported:
+            raise unittest.SkipTest(f"No exported model in {Config.EMBEDDING_ONNX_PATH}; run export_onnx.py")
+
+        with stubs_set_aside():
+            try:
+                reference = load_encoder('torch', Config.EMBEDDING_MODEL)
+            except (ImportError, OSError) as e:
+                raise unittest.SkipTest(f"Reference model {Config.EMBEDDING_MODEL} unavailable: {e}")
+            cls.expected = reference.encode(TEXTS, convert_to_numpy=True)
+
+    def assert_parity(self, backend):
+        try:
+            encoder = load_encoder(backend, Config.EMBEDDING_MODEL, onnx_path=Config.EMBEDDING_ONNX_PATH)
+        except (FileNotFoundError, ImportError) as e:
+            self.skipTest(f"{backend} unavailable: {e}")
+
+        cosines = cosine_rows(self.expected, encoder.encode(TEXTS, convert_to_numpy=True))
+        worst = int(cosines.argmin())
+        self.assertGreaterEqual(float(cosines[worst]), MIN_COSINE,
+                                f"{backend} drifted on {TEXTS[worst]!r}: cosine {cosines[worst]:.4f}")
+
+    def test_onnx_matches_reference(self):
+        self.assert_parity('onnx')
+
+    def test_onnx_int8_matches_reference(self):
+        self.assert_parity('onnx-int8')
+
+
+if __name__ == '__main__':
+    unittest.main()
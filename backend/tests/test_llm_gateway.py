@@ -0,0 +1,77 @@
+# test_llm_gateway.py
+"""
+Per-call timeouts of the LLM gateway against stub models with the pinned SDK's call signature.
+
+Run from the backend/ folder:
+    python -m unittest discover -s tests
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('QDRANT_LOCATION', ':memory:')
+
+import benchmark
+from llm_gateway import LLMGateway, CircuitBreaker
+
+
+class SlowGeminiModel(benchmark.StubGeminiModel):
+    """Stub model whose calls take `seconds` and that records when each call ends"""
+
+    def __init__(self, seconds):
+        super().__init__(latency_ms=seconds * 1000)
+        self.finished = threading.Event()
+
+    def generate_content(self, prompt):
+        response = super().generate_content(prompt)
+        self.finished.set()
+        return response
+
+
+def make_gateway(call_timeout, max_concurrency=1):
+    return LLMGateway(max_concurrency=max_concurrency, call_timeout=call_timeout, max_retries=0,
+                      retry_base=0.01, breaker=CircuitBreaker(failure_threshold=100, reset_timeout=60))
+
+
+class LLMGatewayTimeoutTest(unittest.TestCase):
+    def test_fast_call_returns_the_response(self):
+        gateway = make_gateway(call_timeout=1)
+        self.assertEqual(gateway.generate(benchmark.StubGeminiModel(), "Explain").text,
+                         "This movie matches the tone and themes of your request.")
+
+    def test_slow_call_times_out_at_the_call_timeout(self):
+        gateway = make_gateway(call_timeout=0.1)
+        model = SlowGeminiModel(seconds=0.5)
+
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            gateway.generate(model, "Explain")
+        self.assertLess(time.monotonic() - start, 0.4)
+
+        # The abandoned call keeps its concurrency slot until it actually returns
+        self.assertFalse(gateway._semaphore.acquire(blocking=False))
+        self.assertTrue(model.finished.wait(2))
+        time.sleep(0.05)
+        self.assertTrue(gateway._semaphore.acquire(blocking=False))
+
+    def test_slow_async_call_times_out_at_the_call_timeout(self):
+        gateway = make_gateway(call_timeout=0.1)
+        model = SlowGeminiModel(seconds=0.5)
+
+        start = time.monotonic()
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(gateway.generate_async(model, "Explain"))
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_fast_async_call_returns_the_response(self):
+        gateway = make_gateway(call_timeout=1)
+        response = asyncio.run(gateway.generate_async(benchmark.StubGeminiModel(), "Explain"))
+        self.assertEqual(response.text, "This movie matches the tone and themes of your request.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# test_recommendation_cursor.py
+"""
+Recommendation cursors: small signed tokens naming a candidate list stored in Qdrant.
+
+Run from the backend/ folder:
+    python -m unittest discover -s tests
+"""
+import base64
+import json
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('QDRANT_LOCATION', ':memory:')
+
+import benchmark
+benchmark.install_stub_modules(stub_encoder=True)
+
+from config import Config
+import models
+import recommendation_service
+
+PROMPT = "a tense heist movie with a secret only my therapist knows"
+
+
+def cursor_claims(cursor):
+    payload = cursor.split('.')[1]
+    return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+
+
+class RecommendationCursorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        benchmark.seed_movies(recommendation_service.db, benchmark.build_catalog(40, 1), models.VECTOR_DIM, 1)
+
+    def setUp(self):
+        recommendation_service.recommendation_cache.clear()
+        patcher = mock.patch.object(recommendation_service, 'load_movie_context', lambda movie_id: "A synopsis.")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def first_page(self):
+        page, error = recommendation_service.get_recommendations(PROMPT)
+        self.assertIsNone(error)
+        return page
+
+    def test_cursor_names_the_list_without_the_prompt(self):
+        cursor = self.first_page()['next_cursor']
+
+        self.assertEqual(set(cursor_claims(cursor)), {'lid', 'offset', 'exp'})
+        self.assertNotIn('therapist', cursor)
+        self.assertLess(len(cursor), recommendation_service.MAX_CURSOR_LENGTH)
+
+    def test_pages_walk_the_stored_list(self):
+        page = self.first_page()
+        seen = [r['movie_title'] for r in page['recommendations']]
+        while page['next_cursor']:
+            page, error = recommendation_service.get_recommendation_page(page['next_cursor'])
+            self.assertIsNone(error)
+            seen.extend(r['movie_title'] for r in page['recommendations'])
+
+        self.assertEqual(len(seen), min(Config.RECOMMENDATION_CANDIDATES, 40))
+        self.assertEqual(len(set(seen)), len(seen))
+
+    def test_purged_list_reads_as_expired(self):
+        cursor = self.first_page()['next_cursor']
+        recommendation_service.db.purge_recommendation_lists(int(time.time()) + Config.RECOMMENDATION_CURSOR_TTL + 1,
+                                                             Config.RECOMMENDATION_LISTS_MAX)
+
+        page, error = recommendation_service.get_recommendation_page(cursor)
+        self.assertIsNone(page)
+        self.assertEqual(error, recommendation_service.EXPIRED_LIST_ERROR)
+
+    def test_tampered_and_oversized_cursors_are_rejected(self):
+        cursor = self.first_page()['next_cursor']
+
+        for bad in (cursor[:-2] + 'xx', 'x' * 5000, None):
+            self.assertEqual(recommendation_service.get_recommendation_page(bad), (None, "Invalid cursor"))
+
+
+if __name__ == '__main__':
+    unittest.main()
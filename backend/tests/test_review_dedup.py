@@ -0,0 +1,79 @@
+# test_review_dedup.py
+"""
+Near-duplicate review detection (data/review_dedup.py) on lightly edited reposts.
+
+Run from the backend/ folder:
+    python -m unittest discover -s tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data'))
+
+from review_dedup import NearDuplicateFilter
+
+THRILLER = ("This movie was an absolute masterpiece from start to finish. The acting was superb, especially the "
+            "lead who carried every scene with quiet intensity. The cinematography is gorgeous and the score stays "
+            "with you long after the credits roll. I would recommend it to anyone who loves a slow burn thriller.")
+# A few words swapped, a typo and a sentence tacked on
+THRILLER_EDITED = ("This movie was a total masterpiece from start to finish. The acting was excellent, especially "
+                   "the lead who carried every scene with quiet intensityy. The cinematography is stunning and the "
+                   "score stays with you long after the credits roll. I would recommend it to anyone who loves a "
+                   "slow burn thriller. Overall worth it.")
+COMEDY = ("I went in with low expectations and came out pleasantly surprised. The plot has a few holes, but the "
+          "characters are likeable and the jokes mostly land. It is not going to win any awards, but it is a "
+          "perfectly fine way to spend a Friday night with friends.")
+COMEDY_EDITED = ("I went in with low expectations and came out really surprised! The plot has a few holes, but the "
+                 "characters are likable and the jokes usually land. It's not going to win any awards, but it is a "
+                 "perfectly fine way to spend a Friday night with friends.")
+WAR = ("One of the best war films I have ever seen. It does not glorify combat and it does not preach either; it "
+       "simply shows ordinary men trying to survive. The sound design in the battle sequences is overwhelming in "
+       "the best possible way.")
+
+
+def one_bucket(dedup):
+    """Make every review land in the same bucket of every band"""
+    dedup._band_keys = lambda signature: [0] * dedup.bands
+    return dedup
+
+
+class NearDuplicateFilterTest(unittest.TestCase):
+    def test_edited_repost_is_caught(self):
+        dedup = NearDuplicateFilter()
+        self.assertIsNone(dedup.check('tt01', THRILLER))
+        self.assertIsNone(dedup.check('tt01', COMEDY))
+
+        self.assertEqual(dedup.check('tt01', THRILLER_EDITED), 'within')
+        self.assertEqual(dedup.check('tt02', COMEDY_EDITED), 'across')
+
+    def test_distinct_reviews_are_kept(self):
+        dedup = NearDuplicateFilter()
+        for movie_id, text in (('tt01', THRILLER), ('tt01', COMEDY), ('tt01', WAR)):
+            self.assertIsNone(dedup.check(movie_id, text))
+
+    def test_other_movies_are_ignored_without_cross_movie(self):
+        dedup = NearDuplicateFilter(cross_movie=False)
+        dedup.check('tt01', THRILLER)
+
+        self.assertIsNone(dedup.check('tt02', THRILLER_EDITED))
+
+    def test_every_review_in_a_bucket_is_a_candidate(self):
+        dedup = one_bucket(NearDuplicateFilter())
+        dedup.check('tt01', WAR)
+        dedup.check('tt01', THRILLER)
+
+        # The bucket's first review doesn't match; the second one does
+        self.assertEqual(dedup.check('tt01', THRILLER_EDITED), 'within')
+
+    def test_evicted_reviews_leave_their_buckets(self):
+        dedup = one_bucket(NearDuplicateFilter(max_indexed=1))
+        dedup.check('tt01', THRILLER)
+        dedup.check('tt01', COMEDY)
+
+        self.assertIsNone(dedup.check('tt01', THRILLER_EDITED))
+        self.assertEqual(dedup._buckets[0][0], [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
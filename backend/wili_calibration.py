@@ -0,0 +1,164 @@
+# wili_calibration.py
+"""
+Percentile-calibrated wili likelihood.
+
+A rescaled cosine says little on its own: against a catalog of normalized
+sentence embeddings, nearly every movie lands in the same narrow band. The
+likelihood is instead the percentile of the movie's score among the user's
+scores for every movie in the catalog.
+
+The catalog's vectors are one normalized float32 matrix. When the columnar
+catalog was written with vectors (vector.npy) and matches the collection, the
+matrix is its memory-mapped column, shared by every worker process through the
+page cache, and a catalog swapped in by ingestion is picked up. Otherwise the
+vectors are read from Qdrant on first use and re-read in a background thread
+every WILI_CATALOG_TTL seconds; checks keep using the old matrix until the new
+one is ready. For a new profile, one matrix-vector product scores the whole
+catalog. The scores are reduced to a quantile sketch of WILI_SKETCH_SIZE
+points and cached under a digest of the profile embedding, so a profile
+change is picked up without any invalidation. A check then costs one dot
+product and a binary search in the sketch.
+"""
+import hashlib
+import threading
+import time
+import numpy as np
+from config import Config
+from models import QdrantDB
+from embedding_service import calculate_similarity
+from cache import TTLCache, SingleFlight
+import metrics
+
+db = QdrantDB()
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class WiliCalibrator:
+    def __init__(self, sketch_size, catalog_ttl, cache_size, mapped_catalog=None):
+        self.probabilities = np.linspace(0, 100, sketch_size)
+        self.catalog_ttl = catalog_ttl
+        # Returns the current columnar catalog or None
+        self._mapped = mapped_catalog
+        self._catalog = None
+        self._catalog_version = None
+        self._catalog_loaded_at = None
+        self._catalog_lock = threading.Lock()
+        self._reloading = False
+        self._sketches = TTLCache(maxsize=cache_size, ttl=catalog_ttl)
+        self._flight = SingleFlight()
+
+    def _load_catalog(self):
+        """Read every movie vector from Qdrant and publish the normalized matrix"""
+        with metrics.span('wili_catalog_load'):
+            _, vectors = db.get_all_movie_vectors()
+        if not len(vectors):
+            # An empty collection is re-read on the next check rather than cached
+            print("No movie vectors for wili calibration")
+            return
+        catalog = normalize(vectors)
+        # Versioned by content, so a reload that finds the same vectors keeps the cached sketches
+        version = hashlib.blake2b(catalog.tobytes(), digest_size=16).digest()
+        with self._catalog_lock:
+            self._catalog, self._catalog_version, self._catalog_loaded_at = catalog, version, time.monotonic()
+        print(f"Loaded {len(vectors)} movie vectors for wili calibration")
+
+    def _reload(self):
+        try:
+            self._load_catalog()
+        except Exception as e:
+            print(f"Error reloading the wili catalog, keeping the old one: {e}")
+        finally:
+            with self._catalog_lock:
+                self._reloading = False
+
+    def catalog(self):
+        """
+        The normalized movie matrix and its version
+
+        The mapped catalog column when there is one. Otherwise the matrix read
+        from Qdrant: the first call loads it, and once it is older than
+        catalog_ttl a background thread re-reads it while this and later calls
+        keep returning the current one.
+        """
+        mapped = self._mapped() if self._mapped is not None else None
+        if mapped is not None and mapped.vectors is not None:
+            return mapped.vectors, ('mapped', mapped.version)
+
+        with self._catalog_lock:
+            if self._catalog is not None:
+                if time.monotonic() - self._catalog_loaded_at >= self.catalog_ttl and not self._reloading:
+                    self._reloading = True
+                    threading.Thread(target=self._reload, name='wili-catalog', daemon=True).start()
+                return self._catalog, self._catalog_version
+
+        # Nothing to serve yet; the first check waits for the load (coalesced across threads)
+        self._flight.do('catalog', self._load_catalog)
+        with self._catalog_lock:
+            return self._catalog, self._catalog_version
+
+    def sketch(self, user_embedding):
+        """
+        Quantile sketch of a profile's scores against the whole catalog
+
+        Args:
+            user_embedding: The user's profile embedding
+
+        Returns:
+            Sorted array of the score at each of sketch_size evenly spaced
+            percentiles, or None when the catalog is empty or a different size,
+            or the profile is all zeros (no survey yet)
+        """
+        if not np.any(user_embedding):
+            return None
+        catalog, version = self.catalog()
+        if catalog is None or catalog.shape[1] != len(user_embedding):
+            return None
+
+        user = normalize(user_embedding)
+        key = (version, hashlib.blake2b(user.tobytes(), digest_size=16).digest())
+        hit, sketch = self._sketches.get(key)
+        metrics.record_cache('wili_sketch', hit)
+        if hit:
+            return sketch
+
+        def compute():
+            with metrics.span('wili_sketch'):
+                scores = catalog @ user
+                sketch = np.percentile(scores, self.probabilities).astype(np.float32)
+            self._sketches.set(key, sketch)
+            return sketch
+
+        sketch, shared = self._flight.do(key, compute)
+        if shared:
+            metrics.record_coalesced('wili_sketch')
+        return sketch
+
+    def likelihood(self, user_embedding, movie_vector):
+        """
+        Percentage of the catalog the movie outscores for this user (0-100),
+        falling back to the rescaled cosine (calculate_similarity) without a
+        catalog, and 0 for an all-zero profile
+        """
+        sketch = self.sketch(user_embedding)
+        if sketch is None:
+            return calculate_similarity(user_embedding, movie_vector)
+
+        score = float(np.dot(normalize(user_embedding), normalize(movie_vector)))
+        # Binary search in the sketch, interpolating between neighboring quantiles
+        return float(np.interp(score, sketch, self.probabilities))
+
+
+wili_calibrator = WiliCalibrator(Config.WILI_SKETCH_SIZE, Config.WILI_CATALOG_TTL, Config.WILI_SKETCH_CACHE_SIZE,
+                                 db.current_catalog)
+
+
+def wili_likelihood(user_embedding, movie_vector):
+    """The likelihood wili_check reports: calibrated, unless WILI_CALIBRATION is off"""
+    if not Config.WILI_CALIBRATION:
+        return calculate_similarity(user_embedding, movie_vector)
+    return wili_calibrator.likelihood(user_embedding, movie_vector)
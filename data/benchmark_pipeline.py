@@ -0,0 +1,186 @@
+# benchmark_pipeline.py
+# Times the catalog preprocessing on a synthetic catalog: the original
+# row-wise df.apply implementation against catalog_pipeline (single process
+# and WORKERS processes), and checks that every variant writes the same
+# movies_preprocessed.csv and movies_for_embedding.json content.
+#
+#     python benchmark_pipeline.py
+import io
+import os
+import random
+import time
+
+import pandas as pd
+
+import catalog_pipeline
+
+# -------- CONFIG -------
+SIZES = [10_000, 100_000]   # synthetic catalog sizes
+WORKERS = 4
+REPEATS = 3                 # best of, per variant
+REVIEWED_SHARE = 0.7        # movies that get reviews
+SEED = 42
+# -----------------------
+
+WORDS = ("the night city dark love war secret family last story man woman world "
+         "journey house time lost home king girl boy river fire dream").split()
+GENRES = ["Drama", "Comedy", "Action", "Thriller", "Romance", "Horror", "Sci-Fi", "Crime", "Animation"]
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + rng.choice([".", "!", "?"])
+
+
+def synthetic_catalog(n, seed=SEED):
+    """movies.csv-shaped frame with the mess the cleanup handles, plus a reviews map"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        synopsis = " ".join(sentence(rng) for _ in range(rng.randint(0, 8)))
+        if rng.random() < 0.2:
+            synopsis = f"<p>{synopsis}</p>\\n  <br/>extra   spaces\\"
+        rows.append({
+            "IMDb ID": f" tt{i % (n - n // 50):07d} ",  # ~2% duplicates
+            "Movie_name": f"<b>{sentence(rng, 3)[:-1]}</b>",
+            "titleType": rng.choice(["movie", "Movie", "feature", "tvSeries", "short"]),
+            "Release Date": rng.choice([str(rng.randint(1930, 2024)), "", "unknown"]),
+            "Runtime (minutes)": rng.choice([rng.randint(60, 200), None]),
+            "Genre/s": ", ".join(rng.sample(GENRES, rng.randint(0, 3))) + rng.choice(["", ",", " , "]),
+            "Synopsis": synopsis if synopsis else None,
+            "Tagline": sentence(rng, 6) if rng.random() < 0.5 else None,
+            "Weighted Average rating": round(rng.uniform(1, 10), 1),
+            "Weighted Average Count": rng.randint(10, 100_000),
+            "IMDb URL": f"https://www.imdb.com/title/tt{i:07d}/",
+        })
+    movies = pd.DataFrame(rows)
+    reviews = {
+        f"tt{i:07d}": " ".join(sentence(rng) for _ in range(rng.randint(1, 5)))
+        for i in range(n) if rng.random() < REVIEWED_SHARE
+    }
+    return movies, reviews
+
+
+# ---------- the original row-wise implementation ----------
+def legacy_preprocess(df, max_chars=catalog_pipeline.MAX_CHARS):
+    import re
+
+    df = df.copy()
+    df["IMDb ID"] = df["IMDb ID"].astype(str).str.strip()
+    df = df.drop_duplicates(subset=["IMDb ID"])
+    if "titleType" in df.columns:
+        df = df[df["titleType"].str.lower().isin(["movie", "feature", "film", "feature film"])]
+    if "Release Date" in df.columns:
+        df["release_date"] = pd.to_numeric(df["Release Date"], errors="coerce").astype("Int64")
+    if "Runtime (minutes)" in df.columns:
+        df["runtime_mins"] = pd.to_numeric(df["Runtime (minutes)"], errors="coerce")
+
+    def clean_text(text):
+        if pd.isna(text):
+            return ""
+        text = str(text)
+        text = re.sub(r"<.*?>", "", text)
+        text = re.sub(r"\s+", " ", text)
+        text = text.replace("\\n", " ").replace("\\", "")
+        return text.strip()
+
+    for col in ["Movie_name", "Genre/s", "Synopsis", "Tagline"]:
+        if col in df.columns:
+            df[col] = df[col].apply(clean_text)
+
+    def split_genres(genre_str):
+        if not genre_str or pd.isna(genre_str):
+            return []
+        return [g.strip().lower() for g in genre_str.split(",") if g.strip()]
+    df["genres_list"] = df["Genre/s"].apply(split_genres)
+
+    def build_short_summary(row):
+        if row.get("Tagline"):
+            return row["Tagline"]
+        synopsis = row.get("Synopsis", "")
+        if synopsis:
+            sentences = re.split(r'(?<=[.!?]) +', synopsis)
+            return " ".join(sentences[:2])
+        return ""
+    df["short_summary"] = df.apply(build_short_summary, axis=1)
+    df["Synopsis"] = df["Synopsis"].apply(lambda x: x[:max_chars] if len(x) > max_chars else x)
+
+    df = df.rename(columns=catalog_pipeline.RENAME_MAP)
+    return df[[col for col in catalog_pipeline.KEEP_COLS if col in df.columns]]
+
+
+def legacy_merge(movies_df, reviews_map):
+    movies_df = movies_df.fillna("")
+    movies_df.columns = [col.strip().lower() for col in movies_df.columns]
+    movies_df["combined_reviews"] = movies_df["imdb_id"].map(reviews_map).fillna("")
+
+    def build_text_for_embedding(row):
+        parts = []
+        tagline = str(row.get("tagline", "")).strip()
+        synopsis = str(row.get("synopsis", "")).strip()
+        reviews = str(row.get("combined_reviews", "")).strip()
+        if tagline:
+            parts.append(f"Tagline: {tagline}")
+        if synopsis:
+            parts.append(f"Synopsis: {synopsis}")
+        if reviews:
+            parts.append(f"Reviews: {reviews}")
+        return " ".join(parts).strip()
+    movies_df["text_for_embedding"] = movies_df.apply(build_text_for_embedding, axis=1)
+
+    def build_metadata(row):
+        return {field: row.get(column, "") for field, column in catalog_pipeline.METADATA_FIELDS.items()}
+    movies_df["metadata"] = movies_df.apply(build_metadata, axis=1)
+
+    return movies_df[["imdb_id", "text_for_embedding", "metadata"]].rename(columns={"imdb_id": "movie_id"})
+
+
+# ---------- benchmark ----------
+def csv_roundtrip(df):
+    """What merge_movies_and_reviews.py reads back from movies_preprocessed.csv"""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return buffer.getvalue(), pd.read_csv(buffer)
+
+
+def timed(func, *args, repeats=REPEATS):
+    """Result and best wall time over `repeats` runs"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    variants = [
+        ("row-wise apply", legacy_preprocess, legacy_merge),
+        ("vectorized", catalog_pipeline.preprocess_movies, catalog_pipeline.merge_movies_and_reviews),
+        (f"vectorized x{WORKERS}",
+         lambda df: catalog_pipeline.preprocess_movies(df, workers=WORKERS),
+         lambda df, reviews: catalog_pipeline.merge_movies_and_reviews(df, reviews, workers=WORKERS)),
+    ]
+
+    print(f"{os.cpu_count()} CPUs; the process pool only pays off with several cores\n")
+    print(f"{'movies':>8} {'variant':<16}{'preprocess s':>14}{'merge s':>10}{'speedup':>9}  same output")
+    for size in SIZES:
+        movies, reviews = synthetic_catalog(size)
+        baseline = None
+        for name, preprocess, merge in variants:
+            cleaned, preprocess_s = timed(preprocess, movies)
+            cleaned_csv, reloaded = csv_roundtrip(cleaned)
+            merged, merge_s = timed(merge, reloaded, reviews)
+            merged_json = merged.to_json(orient="records", force_ascii=False)
+
+            total = preprocess_s + merge_s
+            if baseline is None:
+                baseline = (total, cleaned_csv, merged_json)
+            same = cleaned_csv == baseline[1] and merged_json == baseline[2]
+            print(f"{size:>8} {name:<16}{preprocess_s:>14.3f}{merge_s:>10.3f}{baseline[0] / total:>8.1f}x  "
+                  f"{'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
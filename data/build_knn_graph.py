@@ -0,0 +1,211 @@
+# build_knn_graph.py
+# Precomputes each movie's top-K most similar movies over the whole catalog
+# (cosine, blocked NumPy matrix multiplication) and saves them as a compact
+# array-backed graph that the backend serves for /api/movies/<id>/similar.
+#
+# embed_and_upload_local.py updates the graph incrementally after every upload;
+# run this script directly to rebuild it from the vectors stored in Qdrant.
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+# -------- CONFIG -------
+QDRANT_URL = "http://localhost:6333"
+COLLECTION_NAME = "movies"
+OUT_GRAPH = "knn_graph.npz"     # loaded by the backend (KNN_GRAPH_PATH)
+K = 50                          # neighbors kept per movie
+BLOCK_ROWS = 1024               # rows per matmul block; memory is BLOCK_ROWS x catalog size floats
+# -----------------------
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def vector_hashes(vectors):
+    """64-bit fingerprint per row, used to find the vectors that changed since the last build"""
+    return np.array([
+        int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=8).digest(), "little")
+        for row in vectors
+    ], dtype=np.uint64)
+
+
+def top_k(scores, k):
+    """Indices and scores of the k largest entries in each row, best first"""
+    if scores.shape[1] > k:
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    part = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-part, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+def neighbors_for_rows(vectors, rows, k, block_rows=BLOCK_ROWS):
+    """Exact top-k neighbors (excluding self) of the given rows against every vector"""
+    neighbors = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=np.float32)
+    for start in range(0, len(rows), block_rows):
+        block = rows[start:start + block_rows]
+        sims = vectors[block] @ vectors.T
+        sims[np.arange(len(block)), block] = -np.inf
+        idx, best = top_k(sims, k)
+        neighbors[start:start + len(block)] = idx
+        scores[start:start + len(block)] = best
+    return neighbors, scores
+
+
+def build_graph(movie_ids, point_ids, vectors, k=K, block_rows=BLOCK_ROWS):
+    """Build the full graph for a catalog"""
+    vectors = normalize(vectors)
+    k = min(k, len(movie_ids) - 1)
+    neighbors, scores = neighbors_for_rows(vectors, np.arange(len(movie_ids)), k, block_rows)
+    return {
+        "movie_ids": np.asarray(movie_ids, dtype=str),
+        "point_ids": np.asarray(point_ids, dtype=np.int64),
+        "neighbors": neighbors,
+        "scores": scores,
+        "hashes": vector_hashes(vectors),
+    }
+
+
+def update_graph(previous, movie_ids, point_ids, vectors, k=K, block_rows=BLOCK_ROWS):
+    """
+    Bring a previously built graph up to date with the current catalog.
+
+    Only rows that can have changed are recomputed in full: movies whose
+    vector is new or different, and movies whose stored neighbors include a
+    changed or removed movie. Every other row keeps its neighbors and only
+    merges in the changed movies as candidates, which costs one
+    (unchanged x changed) product instead of the full (N x N) one.
+
+    Returns:
+        Tuple of (graph, number of rows recomputed in full)
+    """
+    vectors = normalize(vectors)
+    k = min(k, len(movie_ids) - 1)
+    if previous is None or previous["neighbors"].shape[1] != k:
+        return build_graph(movie_ids, point_ids, vectors, k, block_rows), len(movie_ids)
+
+    hashes = vector_hashes(vectors)
+    old_row = {movie_id: row for row, movie_id in enumerate(previous["movie_ids"])}
+    # Old row index -> new row index, -1 where the movie was removed
+    remap = np.full(len(previous["movie_ids"]), -1, dtype=np.int64)
+    changed = np.zeros(len(movie_ids), dtype=bool)
+    for row, movie_id in enumerate(movie_ids):
+        old = old_row.get(movie_id)
+        if old is None or previous["hashes"][old] != hashes[row]:
+            changed[row] = True
+        if old is not None:
+            remap[old] = row
+
+    # Old rows that were removed or whose vector changed: neighbor lists that
+    # mention them may have lost a member, so those rows need a full recompute
+    removed_old = np.flatnonzero(remap < 0)
+    changed_old = np.flatnonzero((remap >= 0) & changed[np.maximum(remap, 0)])
+    invalid_old = np.concatenate([removed_old, changed_old])
+
+    graph = {
+        "movie_ids": np.asarray(movie_ids, dtype=str),
+        "point_ids": np.asarray(point_ids, dtype=np.int64),
+        "neighbors": np.empty((len(movie_ids), k), dtype=np.int32),
+        "scores": np.empty((len(movie_ids), k), dtype=np.float32),
+        "hashes": hashes,
+    }
+
+    kept_old = np.flatnonzero(remap >= 0)
+    kept_old = kept_old[~changed[remap[kept_old]]]
+    touches_invalid = np.isin(previous["neighbors"][kept_old], invalid_old).any(axis=1)
+    merge_old = kept_old[~touches_invalid]
+    merge_rows = remap[merge_old]
+
+    recompute = np.ones(len(movie_ids), dtype=bool)
+    recompute[merge_rows] = False
+    recompute_rows = np.flatnonzero(recompute)
+    if len(recompute_rows):
+        neighbors, scores = neighbors_for_rows(vectors, recompute_rows, k, block_rows)
+        graph["neighbors"][recompute_rows] = neighbors
+        graph["scores"][recompute_rows] = scores
+
+    changed_rows = np.flatnonzero(changed)
+    for start in range(0, len(merge_rows), block_rows):
+        rows = merge_rows[start:start + block_rows]
+        old_neighbors = remap[previous["neighbors"][merge_old[start:start + block_rows]]]
+        old_scores = previous["scores"][merge_old[start:start + block_rows]]
+        if len(changed_rows):
+            new_scores = vectors[rows] @ vectors[changed_rows].T
+            candidates = np.hstack([old_neighbors, np.broadcast_to(changed_rows, new_scores.shape)])
+            candidate_scores = np.hstack([old_scores, new_scores])
+            idx, best = top_k(candidate_scores, k)
+            graph["neighbors"][rows] = np.take_along_axis(candidates, idx, axis=1)
+            graph["scores"][rows] = best
+        else:
+            graph["neighbors"][rows] = old_neighbors
+            graph["scores"][rows] = old_scores
+
+    return graph, len(recompute_rows)
+
+
+def load_graph(path):
+    p = Path(path)
+    if not p.exists():
+        return None
+    with np.load(p) as data:
+        return {name: data[name] for name in data.files}
+
+
+def save_graph(graph, path):
+    """Write the graph next to its final path, then swap it in so readers never see a partial file"""
+    tmp = f"{path}.tmp.npz"
+    np.savez(tmp, **graph)
+    os.replace(tmp, path)
+
+
+def update_graph_file(movie_ids, point_ids, vectors, path=OUT_GRAPH, k=K):
+    """Incrementally update (or create) the graph file for the current catalog"""
+    start = time.perf_counter()
+    graph, recomputed = update_graph(load_graph(path), movie_ids, point_ids, vectors, k)
+    save_graph(graph, path)
+    print(f"✅ kNN graph: {recomputed}/{len(movie_ids)} rows recomputed in "
+          f"{time.perf_counter() - start:.1f}s → {path}")
+    return graph
+
+
+def fetch_vectors(client, batch_size=1024):
+    """Scroll every movie vector out of Qdrant, ordered by point id"""
+    movie_ids, point_ids, vectors = [], [], []
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=COLLECTION_NAME,
+            limit=batch_size,
+            offset=offset,
+            with_payload=["movie_id"],
+            with_vectors=True
+        )
+        for point in points:
+            movie_ids.append(point.payload["movie_id"])
+            point_ids.append(point.id)
+            vectors.append(point.vector)
+        if offset is None:
+            break
+    return movie_ids, point_ids, np.asarray(vectors, dtype=np.float32)
+
+
+def main():
+    client = QdrantClient(url=QDRANT_URL)
+    movie_ids, point_ids, vectors = fetch_vectors(client)
+    assert movie_ids, f"No vectors in collection {COLLECTION_NAME}"
+    print(f"🔹 Computing top-{K} neighbors for {len(movie_ids)} movies...")
+    update_graph_file(movie_ids, point_ids, vectors)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# build_movie_cards.py
+# Builds a compact, bounded-length "movie card" per movie for LLM prompts:
+# tagline, trimmed synopsis and a few representative review snippets.
+# Run after merge_movies_and_reviews.py (and preprocess_reviews.py).
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+from payload_schema import to_genres, to_int
+
+# -------- CONFIG -------
+MOVIES_FILE = "movies_for_embedding.json"
+REVIEWS_FILE = "reviews_cleaned.json"     # optional, per-review text from preprocess_reviews.py
+OUT_CARDS = "movie_cards.json"            # movie_id -> card text, loaded by the backend
+MAX_TAGLINE_CHARS = 200
+MAX_SYNOPSIS_CHARS = 600
+MAX_SNIPPETS = 3
+MAX_SNIPPET_CHARS = 220
+MIN_SNIPPET_CHARS = 40
+MAX_CARD_CHARS = 1500
+MAX_OVERLAP = 0.5                         # max word Jaccard between chosen snippets
+# -----------------------
+
+SECTION_RE = re.compile(r"\b(Tagline|Synopsis|Reviews):\s*")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+WORD_RE = re.compile(r"[a-z']+")
+STOPWORDS = set("""
+a about after all also an and any are as at be been but by can could did do does even film films for
+from get had has have he her him his how i if in into is it its just like made make me more most movie
+movies much my no not of on one only or other out over really so some than that the their them then
+there these they this to too up very was watch way we well were what when which who will with would you
+your
+""".split())
+
+
+def split_sections(text_for_embedding):
+    """Split "Tagline: ... Synopsis: ... Reviews: ..." into its sections"""
+    sections = {}
+    parts = SECTION_RE.split(text_for_embedding or "")
+    for name, body in zip(parts[1::2], parts[2::2]):
+        sections[name.lower()] = body.strip()
+    return sections
+
+
+def trim_to_sentences(text, max_chars):
+    """Keep whole sentences up to max_chars, hard-cutting at a word only if the first is too long"""
+    if len(text) <= max_chars:
+        return text
+    kept = ""
+    for sentence in SENTENCE_RE.split(text):
+        candidate = f"{kept} {sentence}".strip()
+        if len(candidate) > max_chars:
+            break
+        kept = candidate
+    if not kept:
+        kept = text[:max_chars].rsplit(" ", 1)[0] + "..."
+    return kept
+
+
+def content_words(text):
+    return [w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def pick_snippets(reviews, max_snippets=MAX_SNIPPETS):
+    """
+    Extractive selection of representative review sentences.
+
+    Sentences are scored by how many of the movie's frequent review words they
+    contain (Luhn-style centrality), then chosen greedily while skipping
+    sentences that overlap too much with ones already picked.
+    """
+    sentences = []
+    for review in reviews:
+        for sentence in SENTENCE_RE.split(review):
+            sentence = sentence.strip()
+            if MIN_SNIPPET_CHARS <= len(sentence) <= MAX_SNIPPET_CHARS:
+                sentences.append(sentence)
+    if not sentences:
+        return []
+
+    # Document frequency over reviews, so one verbose review can't dominate
+    frequency = Counter()
+    for review in reviews:
+        frequency.update(set(content_words(review)))
+
+    scored = []
+    for index, sentence in enumerate(sentences):
+        words = set(content_words(sentence))
+        if not words:
+            continue
+        score = sum(frequency[w] for w in words) / len(words) ** 0.5
+        scored.append((score, index, sentence, words))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    chosen = []
+    for _, index, sentence, words in scored:
+        if any(len(words & other) / len(words | other) > MAX_OVERLAP for _, _, other in chosen):
+            continue
+        chosen.append((index, sentence, words))
+        if len(chosen) >= max_snippets:
+            break
+
+    # Keep the original reading order
+    return [sentence for _, sentence, _ in sorted(chosen)]
+
+
+def build_card(record, reviews):
+    """Build the card text for one movie record from movies_for_embedding.json"""
+    meta = record.get("metadata", {}) or {}
+    sections = split_sections(record.get("text_for_embedding", ""))
+    if not reviews and sections.get("reviews"):
+        reviews = [sections["reviews"]]
+
+    lines = []
+    facts = []
+    genres = to_genres(meta.get("genre"))
+    if genres:
+        facts.append(f"Genres: {', '.join(genres)}")
+    year = to_int(meta.get("release_date"))
+    if year is not None:
+        facts.append(f"Year: {year}")
+    if facts:
+        lines.append(" | ".join(facts))
+    if sections.get("tagline"):
+        lines.append(f"Tagline: {trim_to_sentences(sections['tagline'], MAX_TAGLINE_CHARS)}")
+    if sections.get("synopsis"):
+        lines.append(f"Synopsis: {trim_to_sentences(sections['synopsis'], MAX_SYNOPSIS_CHARS)}")
+
+    snippets = pick_snippets(reviews)
+    if snippets:
+        lines.append("What reviewers say:")
+        lines.extend(f"- {snippet}" for snippet in snippets)
+
+    card = "\n".join(lines)
+    # Sections are individually bounded, this is the final safety net
+    return card[:MAX_CARD_CHARS]
+
+
+def load_reviews(path):
+    p = Path(path)
+    if not p.exists():
+        return {}
+    data = json.loads(p.read_text(encoding="utf-8"))
+    return {
+        movie["movie_id"]: [r["text"] for r in movie.get("reviews_raw", [])]
+        for movie in data.get("movies", [])
+    }
+
+
+def build_cards(records, reviews_by_movie):
+    cards = {}
+    for record in records:
+        movie_id = record.get("movie_id") or record.get("metadata", {}).get("movie_id")
+        if movie_id:
+            cards[movie_id] = build_card(record, reviews_by_movie.get(movie_id, []))
+    return cards
+
+
+def main():
+    p = Path(MOVIES_FILE)
+    assert p.exists(), f"{MOVIES_FILE} not found"
+
+    records = json.loads(p.read_text(encoding="utf-8"))
+    reviews_by_movie = load_reviews(REVIEWS_FILE)
+    print(f"🔹 Building cards for {len(records)} movies ({len(reviews_by_movie)} with per-review text)...")
+
+    cards = build_cards(records, reviews_by_movie)
+
+    with open(OUT_CARDS, "w", encoding="utf-8") as f:
+        json.dump(cards, f, ensure_ascii=False, indent=2)
+
+    source_chars = sum(len(r.get("text_for_embedding", "")) for r in records)
+    card_chars = sum(len(c) for c in cards.values())
+    print(f"✅ Saved {len(cards)} cards → {OUT_CARDS} "
+          f"({card_chars:,} chars vs {source_chars:,} in text_for_embedding)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# catalog_pipeline.py
+# Importable, parameterized version of the movie catalog preprocessing that
+# preprocess_movies.py and merge_movies_and_reviews.py run.
+#
+# Every step works on whole columns with pandas .str operations instead of
+# row-wise df.apply. The row-local steps run on chunks of the catalog, in a
+# process pool when workers > 1, because pandas' regex string methods still
+# loop over the values in Python. The output is the same as the row-wise
+# version (benchmark_pipeline.py checks it).
+#
+#     from catalog_pipeline import preprocess_movies_file, merge_movies_and_reviews_file
+#     preprocess_movies_file("movies.csv", "movies_preprocessed.csv", workers=4)
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import json
+
+import numpy as np
+import pandas as pd
+
+# -------- CONFIG -------
+MAX_CHARS = 4000                 # synopsis length kept
+CHUNK_SIZE = 20000               # rows per chunk for the row-local steps
+MOVIE_TYPES = ["movie", "feature", "film", "feature film"]
+TEXT_COLS = ["Movie_name", "Genre/s", "Synopsis", "Tagline"]
+RENAME_MAP = {
+    "IMDb ID": "imdb_id",
+    "Movie_name": "title",
+    "Weighted Average rating": "weighted_rating",
+    "Weighted Average Count": "weighted_count",
+    "IMDb URL": "imdb_url"
+}
+KEEP_COLS = [
+    "imdb_id", "title", "titleType", "release_date", "runtime_mins",
+    "genres_list", "Synopsis", "Tagline", "short_summary",
+    "weighted_rating", "weighted_count", "imdb_url"
+]
+METADATA_FIELDS = {
+    "movie_id": "imdb_id",
+    "title": "title",
+    "genre": "genres_list",
+    "rating": "weighted_rating",
+    "release_date": "release_date",
+    "runtime_min": "runtime_mins",
+    "url": "imdb_url"
+}
+# -----------------------
+
+
+# ---------- column operations ----------
+def clean_text(series):
+    """Strip HTML tags, collapse whitespace and drop escaped newlines and backslashes"""
+    series = series.fillna("").astype(str)
+    # The tag regex only needs to run on the values that contain a "<"
+    tagged = series.str.contains("<", regex=False)
+    series = series.mask(tagged, series[tagged].str.replace(r"<.*?>", "", regex=True))
+    return (series
+            .str.replace(r"\s+", " ", regex=True)
+            .str.replace("\\n", " ", regex=False)
+            .str.replace("\\", "", regex=False)
+            .str.strip())
+
+
+def split_genres(series):
+    """'Drama, Crime' -> ['drama', 'crime']"""
+    # Drop the whitespace around commas and any empty entries, then split once
+    genres = (series.fillna("").astype(str).str.lower()
+              .str.replace(r"\s*,[\s,]*", ",", regex=True)
+              .str.strip().str.strip(","))
+    lists = genres.str.split(",")
+    empty = genres == ""
+    lists[empty] = pd.Series([[] for _ in range(int(empty.sum()))], index=lists.index[empty], dtype=object)
+    return lists
+
+
+def build_short_summary(tagline, synopsis):
+    """The tagline, or the first two sentences of the synopsis"""
+    sentences = synopsis.fillna("").astype(str).str.split(r"(?<=[.!?]) +", n=2, regex=True)
+    first_two = sentences.str[:2].str.join(" ")
+    return pd.Series(np.where(tagline.fillna("").astype(str) != "", tagline, first_two),
+                     index=synopsis.index, dtype=object)
+
+
+def join_nonempty(parts):
+    """Join same-index string columns with single spaces, skipping empty values"""
+    joined = parts[0]
+    for part in parts[1:]:
+        separator = pd.Series(np.where((joined != "") & (part != ""), " ", ""), index=part.index)
+        joined = joined + separator + part
+    return joined
+
+
+def labeled(label, series):
+    series = series.astype(str).str.strip()
+    return (label + series).where(series != "", "")
+
+
+def build_text_for_embedding(df):
+    """'Tagline: ... Synopsis: ... Reviews: ...' from whichever of the three are present"""
+    empty = pd.Series("", index=df.index)
+    return join_nonempty([
+        labeled("Tagline: ", df.get("tagline", empty)),
+        labeled("Synopsis: ", df.get("synopsis", empty)),
+        labeled("Reviews: ", df.get("combined_reviews", empty)),
+    ]).str.strip()
+
+
+def build_metadata(df):
+    """One metadata dict per row, with "" for any missing column"""
+    columns = pd.DataFrame({
+        field: df[column] if column in df.columns else "" for field, column in METADATA_FIELDS.items()
+    }, index=df.index)
+    return pd.Series(columns.to_dict(orient="records"), index=df.index, dtype=object)
+
+
+# ---------- chunked processing ----------
+def process_in_chunks(df, func, workers=1, chunk_size=CHUNK_SIZE):
+    """Apply a row-local DataFrame function chunk by chunk, in worker processes when workers > 1"""
+    chunks = [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+    if not chunks:
+        return func(df)
+    if workers <= 1 or len(chunks) == 1:
+        return pd.concat([func(chunk) for chunk in chunks])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return pd.concat(list(pool.map(func, chunks)))
+
+
+def clean_movie_rows(df, max_chars=MAX_CHARS):
+    """Row-local part of the movie preprocessing: text cleanup, genres, summary, trimming"""
+    df = df.copy()
+    for col in TEXT_COLS:
+        if col in df.columns:
+            df[col] = clean_text(df[col])
+
+    if "Genre/s" in df.columns:
+        df["genres_list"] = split_genres(df["Genre/s"])
+
+    synopsis = df["Synopsis"] if "Synopsis" in df.columns else pd.Series("", index=df.index)
+    tagline = df["Tagline"] if "Tagline" in df.columns else pd.Series("", index=df.index)
+    df["short_summary"] = build_short_summary(tagline, synopsis)
+
+    if "Synopsis" in df.columns:
+        df["Synopsis"] = df["Synopsis"].str.slice(0, max_chars)
+    return df
+
+
+def build_embedding_rows(df):
+    """Row-local part of the merge: the embedding text and the metadata"""
+    return pd.DataFrame({
+        "movie_id": df["imdb_id"] if "imdb_id" in df.columns else "",
+        "text_for_embedding": build_text_for_embedding(df),
+        "metadata": build_metadata(df),
+    }, index=df.index)
+
+
+# ---------- pipeline ----------
+def preprocess_movies(df, max_chars=MAX_CHARS, movie_types=MOVIE_TYPES, workers=1, chunk_size=CHUNK_SIZE):
+    """Raw movies.csv frame -> the cleaned frame written to movies_preprocessed.csv"""
+    df = df.copy()
+    df["IMDb ID"] = df["IMDb ID"].astype(str).str.strip()
+    df = df.drop_duplicates(subset=["IMDb ID"])
+
+    if "titleType" in df.columns:
+        df = df[df["titleType"].str.lower().isin(movie_types)]
+
+    # Release Date column actually holds release year, so treat it as numeric
+    if "Release Date" in df.columns:
+        df["release_date"] = pd.to_numeric(df["Release Date"], errors="coerce").astype("Int64")
+    if "Runtime (minutes)" in df.columns:
+        df["runtime_mins"] = pd.to_numeric(df["Runtime (minutes)"], errors="coerce")
+
+    df = process_in_chunks(df, partial(clean_movie_rows, max_chars=max_chars), workers, chunk_size)
+
+    df = df.rename(columns=RENAME_MAP)
+    return df[[col for col in KEEP_COLS if col in df.columns]]
+
+
+def merge_movies_and_reviews(movies_df, reviews_map, workers=1, chunk_size=CHUNK_SIZE):
+    """Preprocessed movies + movie_id -> combined reviews map -> movie_id, text_for_embedding, metadata"""
+    movies_df = movies_df.fillna("")
+    movies_df.columns = [col.strip().lower() for col in movies_df.columns]
+    movies_df["combined_reviews"] = movies_df["imdb_id"].map(reviews_map).fillna("")
+    return process_in_chunks(movies_df, build_embedding_rows, workers, chunk_size)
+
+
+def preprocess_movies_file(input_csv, output_csv, **kwargs):
+    df = pd.read_csv(input_csv)
+    print(f"Loaded {len(df)} movies")
+    df_final = preprocess_movies(df, **kwargs)
+    df_final.to_csv(output_csv, index=False)
+    print(f"✅ Saved cleaned file with {len(df_final)} movies → {output_csv}")
+    return df_final
+
+
+def merge_movies_and_reviews_file(movies_csv, reviews_json, output_json, **kwargs):
+    print("🔹 Loading files...")
+    movies_df = pd.read_csv(movies_csv, encoding="utf-8")
+    with open(reviews_json, "r", encoding="utf-8") as f:
+        reviews_map = json.load(f)
+
+    print("🔹 Building text_for_embedding and metadata...")
+    movies_for_embedding = merge_movies_and_reviews(movies_df, reviews_map, **kwargs)
+
+    print(f"🔹 Saving merged file → {output_json}")
+    movies_for_embedding.to_json(output_json, orient="records", indent=2, force_ascii=False)
+    print(f"✅ Done! Successfully created {output_json}")
+    return movies_for_embedding
@@ -0,0 +1,117 @@
+# columnar_catalog.py
+# Writes the movie payloads as a columnar catalog the backend memory-maps
+# (backend/catalog.py), so searches can return ids and scores only and be
+# hydrated locally. Called by embed_and_upload_local.py after every upload.
+#
+# Layout (one .npy file per array, rows sorted by Qdrant point id):
+#   point_id.npy                          int64
+#   <text>.offsets.npy / <text>.data.npy  int64 offsets into utf-8 bytes (movie_id, title, url)
+#   genre.offsets.npy / genre.codes.npy   int64 offsets into uint16 codes of manifest["genres"]
+#   rating.npy                            float32, NaN when missing
+#   release_date.npy / runtime_min.npy    int32, INT_MISSING when missing
+#   vector.npy                            float32, L2-normalized movie vectors, when given
+#   manifest.json                         rows, columns, genre vocabulary, vector_dim, ingestion_id
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+# -------- CONFIG -------
+OUT_CATALOG = "catalog"
+# -----------------------
+
+CATALOG_VERSION = 1
+TEXT_COLUMNS = ["movie_id", "title", "url"]
+FLOAT_COLUMNS = ["rating"]
+INT_COLUMNS = ["release_date", "runtime_min"]
+INT_MISSING = np.iinfo(np.int32).min
+
+
+def text_column(values):
+    encoded = [str(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return offsets, data
+
+
+def list_column(lists, vocabulary):
+    codes = {value: i for i, value in enumerate(vocabulary)}
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(values) for values in lists])
+    flat = np.array([codes[value] for values in lists for value in values], dtype=np.uint16)
+    return offsets, flat
+
+
+def write_catalog(point_ids, payloads, path=OUT_CATALOG, vectors=None):
+    """
+    Write normalized movie payloads (see payload_schema.py) as a columnar catalog.
+
+    vectors, one row per point as uploaded to Qdrant, are stored L2-normalized
+    so the backend's wili calibration scores the catalog from the mapped file
+    instead of every worker scrolling its own copy out of Qdrant.
+
+    The manifest records the payloads' ingestion_id, the upload run the
+    backend checks against the collection before hydrating from the catalog.
+
+    The catalog is built in a sibling directory and swapped in at the end, so a
+    backend starting mid-write never maps a half-written catalog.
+    """
+    order = np.argsort(np.asarray(point_ids, dtype=np.int64), kind="stable")
+    point_ids = np.asarray(point_ids, dtype=np.int64)[order]
+    payloads = [payloads[i] for i in order]
+
+    tmp = Path(f"{path}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    np.save(tmp / "point_id.npy", point_ids)
+    for column in TEXT_COLUMNS:
+        offsets, data = text_column(p.get(column, "") for p in payloads)
+        np.save(tmp / f"{column}.offsets.npy", offsets)
+        np.save(tmp / f"{column}.data.npy", data)
+
+    genres = [p.get("genre", []) for p in payloads]
+    vocabulary = sorted({g for values in genres for g in values})
+    offsets, codes = list_column(genres, vocabulary)
+    np.save(tmp / "genre.offsets.npy", offsets)
+    np.save(tmp / "genre.codes.npy", codes)
+
+    for column in FLOAT_COLUMNS:
+        values = [p.get(column) for p in payloads]
+        np.save(tmp / f"{column}.npy", np.array([np.nan if v is None else v for v in values], dtype=np.float32))
+    for column in INT_COLUMNS:
+        values = [p.get(column) for p in payloads]
+        np.save(tmp / f"{column}.npy", np.array([INT_MISSING if v is None else v for v in values], dtype=np.int32))
+
+    vector_dim = None
+    if vectors is not None:
+        vectors = np.asarray(vectors, dtype=np.float32)[order]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.save(tmp / "vector.npy", vectors / np.where(norms > 0, norms, 1.0))
+        vector_dim = int(vectors.shape[1])
+
+    manifest = {
+        "version": CATALOG_VERSION,
+        "rows": len(payloads),
+        "text_columns": TEXT_COLUMNS,
+        "float_columns": FLOAT_COLUMNS,
+        "int_columns": INT_COLUMNS,
+        "int_missing": int(INT_MISSING),
+        "genres": vocabulary,
+        "vector_dim": vector_dim,
+        "ingestion_id": payloads[0].get("ingestion_id") if payloads else None,
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    old = Path(f"{path}.old")
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+    size = sum(f.stat().st_size for f in Path(path).iterdir())
+    print(f"✅ Columnar catalog: {len(payloads)} movies, {size / 1024:.0f} KiB → {path}")
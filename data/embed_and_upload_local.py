@@ -1,15 +1,27 @@
 # embed_and_upload_local.py
 import json
 import re
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from tqdm import tqdm
 
 import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as rest
 
+from payload_schema import MOVIE_PAYLOAD_SCHEMA, normalize_movie_payload
+from build_knn_graph import update_graph_file, OUT_GRAPH
+from columnar_catalog import write_catalog
+from embedding_artifact import write_artifact
+# the backend's encoder backends (torch, torch-int8, onnx, onnx-int8)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+from encoders import load_encoder
+from fit_projection import (fit_guarded, project, save_projection, remove_projection, load_eval_prompts, write_report,
+                            OUT_PROJECTION)
+
 # -------- CONFIG -------
 MOVIES_FILE = "movies_for_embedding.json"
 QDRANT_URL = "http://localhost:6333"
@@ -18,7 +30,27 @@ COLLECTION_NAME = "movies"
 MAX_CHARS_TOTAL = 4000
 # If you want a smaller vector size (e.g. other model), update after loading the model.
 MODEL_NAME = "all-mpnet-base-v2"
+# Encoder backend and intra-op threads (see backend/encoders.py); compare them
+# with backend/encoder_benchmark.py before switching away from torch.
+ENCODER_BACKEND = "torch"
+ENCODER_THREADS = 0  # 0 = library default (all cores)
+ONNX_MODEL_DIR = "../backend/onnx_model"  # written by backend/export_onnx.py
 DISTANCE = rest.Distance.COSINE
+# HNSW graph: larger M / EF_CONSTRUCT give better recall for more memory and indexing time.
+# Measure the effect with backend/ann_benchmark.py before changing them.
+HNSW_M = 16
+HNSW_EF_CONSTRUCT = 100
+# Store PCA-reduced vectors (e.g. 256) instead of the model's full dimension.
+# The projection is refit on this corpus and rejected if recall@10 against the
+# full vectors drops below fit_projection.MIN_RECALL; None stores full vectors.
+PROJECTION_DIM = None
+# Upserts of BATCH points, UPSERT_WORKERS requests in flight
+BATCH = 128
+UPSERT_WORKERS = 4
+# Portable export of this run (vectors, ids, payloads, model fingerprint);
+# load_embedding_artifact.py restores a collection from it without re-encoding.
+OUT_ARTIFACT = "embedding_artifact"
+ARTIFACT_DTYPE = "float32"  # or "float16" for half the size
 # -----------------------
 
 def split_parts(full_text: str):
@@ -43,9 +75,10 @@ def truncate_keep_prefix(prefix: str, reviews: str, max_chars: int):
         truncated_reviews = truncated_reviews.rsplit(" ", 1)[0]
         return (prefix + " " + truncated_reviews).strip()
 
-def main():
-    p = Path(MOVIES_FILE)
-    assert p.exists(), f"{MOVIES_FILE} not found"
+def load_texts(movies_file):
+    """Movie ids, the truncated texts to embed, and the metadata of every movie"""
+    p = Path(movies_file)
+    assert p.exists(), f"{movies_file} not found"
 
     records = json.loads(p.read_text(encoding="utf-8"))
     texts = []
@@ -62,42 +95,107 @@ def main():
         texts.append(final_text)
         metas.append(meta)
 
-    print("Loading embedding model:", MODEL_NAME)
-    model = SentenceTransformer(MODEL_NAME)
+    return ids, texts, metas
+
+def load_model():
+    return load_encoder(ENCODER_BACKEND, MODEL_NAME, onnx_path=ONNX_MODEL_DIR, threads=ENCODER_THREADS)
+
+def recreate_movies_collection(client, vector_size, collection_name=COLLECTION_NAME):
+    """Drop and create the movies collection with the HNSW settings and payload indexes"""
+    try:
+        client.delete_collection(collection_name)
+    except Exception:
+        pass
+
+    client.recreate_collection(
+        collection_name=collection_name,
+        vectors_config=rest.VectorParams(size=vector_size, distance=DISTANCE),
+        hnsw_config=rest.HnswConfigDiff(m=HNSW_M, ef_construct=HNSW_EF_CONSTRUCT)
+    )
+
+    # payload indexes for the filtered fields (see payload_schema.py)
+    for field, index_type in MOVIE_PAYLOAD_SCHEMA.items():
+        if index_type:
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=rest.PayloadSchemaType(index_type)
+            )
+
+def upload_points(client, point_ids, vectors, payloads, collection_name=COLLECTION_NAME,
+                  batch_size=BATCH, workers=UPSERT_WORKERS):
+    """
+    Upsert the points in batches, with up to `workers` batches in flight.
+    An embedded QdrantClient(path=...) is not thread-safe; use workers=1 with it.
+    """
+    def upsert(start):
+        client.upsert(
+            collection_name=collection_name,
+            points=rest.Batch(
+                ids=list(point_ids[start:start + batch_size]),
+                vectors=np.asarray(vectors[start:start + batch_size], dtype=np.float32).tolist(),
+                payloads=list(payloads[start:start + batch_size])
+            )
+        )
+        return min(batch_size, len(point_ids) - start)
+
+    starts = range(0, len(point_ids), batch_size)
+    with tqdm(total=len(point_ids), desc="Upserting", unit="pt") as progress:
+        if workers <= 1:
+            for start in starts:
+                progress.update(upsert(start))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for count in pool.map(upsert, starts):
+                    progress.update(count)
+
+def main():
+    ids, texts, metas = load_texts(MOVIES_FILE)
+
+    model = load_model()
 
     # encode in batches
     embeddings = model.encode(texts, show_progress_bar=True, batch_size=32, convert_to_numpy=True)
+    model_dim = embeddings.shape[1]
+
+    # optional reduced-dimension vectors; the backend applies the same projection to prompts
+    if PROJECTION_DIM:
+        prompts = load_eval_prompts()
+        prompt_embeddings = model.encode(prompts, convert_to_numpy=True) if prompts else np.zeros((0, embeddings.shape[1]))
+        projection, entry = fit_guarded(embeddings, prompt_embeddings, PROJECTION_DIM)
+        write_report([entry], embeddings.shape[1], len(ids))
+        save_projection(projection)
+        embeddings = project(embeddings, projection)
+    else:
+        remove_projection()
 
     # prepare Qdrant
     client = QdrantClient(url=QDRANT_URL)
     vector_size = embeddings.shape[1]
     print("Vector size:", vector_size)
 
-    # (re)create collection
-    try:
-        client.delete_collection(COLLECTION_NAME)
-    except Exception:
-        pass
+    recreate_movies_collection(client, vector_size)
 
-    client.recreate_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=rest.VectorParams(size=vector_size, distance=DISTANCE)
-    )
-
-    # upsert points in batches
-    BATCH = 128
-    points = []
-    for i, (mid, vec, meta) in enumerate(zip(ids, embeddings, metas)):
-        payload = meta or {}
-        payload.update({"movie_id": mid})
-        points.append(rest.PointStruct(id=i, vector=vec.tolist(), payload=payload))
-        if len(points) >= BATCH:
-            client.upsert(collection_name=COLLECTION_NAME, points=points)
-            points = []
-    if points:
-        client.upsert(collection_name=COLLECTION_NAME, points=points)
+    point_ids = list(range(len(ids)))
+    # Point ids are reassigned on every run; the id lets the backend tell whether
+    # its columnar catalog was written from the points now in the collection
+    ingestion_id = uuid.uuid4().hex
+    payloads = [dict(normalize_movie_payload(dict(meta or {}, movie_id=mid)), ingestion_id=ingestion_id)
+                for mid, meta in zip(ids, metas)]
+    upload_points(client, point_ids, embeddings, payloads)
 
     print("✅ Uploaded", len(ids), "vectors to Qdrant collection:", COLLECTION_NAME)
 
+    # Payload columns the backend memory-maps to hydrate id-only search results,
+    # and the vectors it scores the whole catalog with for wili calibration
+    write_catalog(point_ids, payloads, vectors=embeddings)
+
+    # "More like this" neighbors; only movies whose vectors changed are recomputed
+    update_graph_file(ids, point_ids, embeddings)
+
+    write_artifact(ids, point_ids, embeddings, payloads, MODEL_NAME, model_dim,
+                   path=OUT_ARTIFACT, dtype=ARTIFACT_DTYPE, projection_path=OUT_PROJECTION if PROJECTION_DIM else None,
+                   graph_path=OUT_GRAPH, encoder_backend=ENCODER_BACKEND)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,143 @@
+# embedding_artifact.py
+# Portable, versioned export of an ingestion run, so a new environment can
+# restore the movies collection with load_embedding_artifact.py instead of
+# re-encoding the whole corpus with embed_and_upload_local.py.
+#
+# Layout of an artifact directory:
+#   vectors.npy        float32 or float16, one row per movie, as stored in Qdrant
+#   ids.json           movie ids and Qdrant point ids, in row order
+#   payloads.jsonl     one normalized payload per row (see payload_schema.py)
+#   projection.npz     the PCA projection the vectors were reduced with, if any
+#   knn_graph.npz      the "more like this" graph, if ingestion built one
+#   manifest.json      format version, model fingerprint, shapes, dtype, checksums
+#
+# The artifact is written to a sibling directory and swapped in at the end, so
+# a loader never reads a half-written artifact.
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+# -------- CONFIG -------
+OUT_ARTIFACT = "embedding_artifact"
+VECTOR_DTYPE = "float32"     # "float16" halves the artifact; vectors are widened back to float32 on load
+# -----------------------
+
+ARTIFACT_VERSION = 1
+DTYPES = ("float32", "float16")
+
+
+def model_fingerprint(model_name, dim):
+    """
+    Identifies the embedding space: the model and its output dimension.
+    "sentence-transformers/all-mpnet-base-v2" and "all-mpnet-base-v2" are the same model.
+    """
+    return f"{model_name.rsplit('/', 1)[-1]}:{int(dim)}"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_artifact(movie_ids, point_ids, vectors, payloads, model_name, model_dim, path=OUT_ARTIFACT,
+                   dtype=VECTOR_DTYPE, projection_path=None, graph_path=None, encoder_backend=None):
+    """
+    Export the vectors and payloads of an ingestion run.
+
+    Args:
+        movie_ids, point_ids, payloads: one entry per row of vectors
+        vectors: the vectors uploaded to Qdrant (projected, when a projection was applied)
+        model_name, model_dim: the encoder and its full output dimension, for the fingerprint
+        encoder_backend: recorded for reference (int8 backends drift slightly from torch)
+        projection_path, graph_path: files copied into the artifact when they exist
+    """
+    assert dtype in DTYPES, f"Unsupported vector dtype {dtype}, expected one of {DTYPES}"
+    vectors = np.asarray(vectors)
+    assert len(movie_ids) == len(point_ids) == len(payloads) == len(vectors), "Row counts differ"
+
+    tmp = Path(f"{path}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    np.save(tmp / "vectors.npy", vectors.astype(dtype))
+    with open(tmp / "ids.json", "w", encoding="utf-8") as f:
+        json.dump({"movie_ids": list(movie_ids), "point_ids": [int(p) for p in point_ids]}, f)
+    with open(tmp / "payloads.jsonl", "w", encoding="utf-8") as f:
+        for payload in payloads:
+            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+    files = ["vectors.npy", "ids.json", "payloads.jsonl"]
+    projection_version = None
+    for source, name in ((projection_path, "projection.npz"), (graph_path, "knn_graph.npz")):
+        if source and os.path.exists(source):
+            shutil.copyfile(source, tmp / name)
+            files.append(name)
+    if "projection.npz" in files:
+        with np.load(tmp / "projection.npz") as projection:
+            projection_version = str(projection["version"])
+
+    manifest = {
+        "version": ARTIFACT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "model": model_name,
+        "model_fingerprint": model_fingerprint(model_name, model_dim),
+        "encoder_backend": encoder_backend,
+        "projection": projection_version,
+        "rows": len(vectors),
+        "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        "dtype": dtype,
+        "files": {name: file_sha256(tmp / name) for name in files},
+    }
+    with open(tmp / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    old = Path(f"{path}.old")
+    shutil.rmtree(old, ignore_errors=True)
+    if Path(path).exists():
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+    size_mb = sum((Path(path) / name).stat().st_size for name in files) / 1e6
+    print(f"✅ Exported {manifest['rows']} {dtype} vectors ({manifest['model_fingerprint']}, "
+          f"{size_mb:.1f} MB) → {path}")
+    return manifest
+
+
+def read_manifest(path=OUT_ARTIFACT):
+    with open(Path(path) / "manifest.json", "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest.get("version") == ARTIFACT_VERSION, \
+        f"Artifact version {manifest.get('version')} is not supported (expected {ARTIFACT_VERSION})"
+    return manifest
+
+
+def verify_checksums(manifest, path=OUT_ARTIFACT):
+    for name, expected in manifest["files"].items():
+        actual = file_sha256(Path(path) / name)
+        assert actual == expected, f"{name} in {path} is corrupt (sha256 {actual[:12]} != {expected[:12]})"
+
+
+def read_artifact(path=OUT_ARTIFACT, verify=True):
+    """Manifest, movie ids, point ids, float32 vectors and payloads of an artifact"""
+    manifest = read_manifest(path)
+    if verify:
+        verify_checksums(manifest, path)
+
+    vectors = np.load(Path(path) / "vectors.npy").astype(np.float32, copy=False)
+    with open(Path(path) / "ids.json", "r", encoding="utf-8") as f:
+        ids = json.load(f)
+    with open(Path(path) / "payloads.jsonl", "r", encoding="utf-8") as f:
+        payloads = [json.loads(line) for line in f]
+
+    assert len(vectors) == len(ids["movie_ids"]) == len(ids["point_ids"]) == len(payloads) == manifest["rows"], \
+        f"Artifact {path} row counts don't match its manifest"
+    return manifest, ids["movie_ids"], ids["point_ids"], vectors, payloads
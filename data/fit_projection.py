@@ -0,0 +1,190 @@
+# fit_projection.py
+# PCA projection of the movie embeddings to fewer dimensions, and the recall
+# report used to choose the size.
+#
+# For every CANDIDATE_DIMS size, the recall of the reduced vectors is measured
+# against the full-dimension baseline: for the eval prompts and a sample of
+# movies, how many of the exact top-k neighbors in the full space are still in
+# the top-k of the reduced space. Running this script only writes that report
+# (projection_report.json); it never touches projection.npz, which the backend
+# loads (EMBEDDING_PROJECTION_PATH) and which must match the vectors in Qdrant.
+#
+# Run it, pick PROJECTION_DIM from the report, then set it in
+# embed_and_upload_local.py and re-run ingestion. Ingestion refits the
+# projection, refuses it when recall@10 is below MIN_RECALL, saves the
+# versioned artifact and uploads the reduced vectors.
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+# -------- CONFIG -------
+MOVIES_FILE = "movies_for_embedding.json"
+EVAL_PROMPTS_FILE = "eval_prompts.txt"
+MODEL_NAME = "all-mpnet-base-v2"
+OUT_PROJECTION = "projection.npz"           # loaded by the backend (EMBEDDING_PROJECTION_PATH)
+OUT_REPORT = "projection_report.json"
+CANDIDATE_DIMS = (64, 128, 192, 256, 384)   # sizes compared in the report
+RECALL_K = (3, 10)
+MIN_RECALL = 0.9                            # recall@10 guard applied by ingestion
+EVAL_MOVIE_QUERIES = 500                    # movies sampled as queries
+SEED = 7
+# -----------------------
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def fit_projection(embeddings, dim, source_model=MODEL_NAME):
+    """PCA of the normalized embeddings: the mean and the top `dim` principal axes"""
+    vectors = normalize(embeddings)
+    assert dim < vectors.shape[1], f"Projection dim {dim} must be below the embedding dim {vectors.shape[1]}"
+    mean = vectors.mean(axis=0)
+    _, singular_values, axes = np.linalg.svd(vectors - mean, full_matrices=False)
+    variance = singular_values ** 2
+
+    components = axes[:dim].astype(np.float32)
+    digest = hashlib.sha256(mean.astype(np.float32).tobytes() + components.tobytes()).hexdigest()[:12]
+    return {
+        "version": f"pca{dim}-{digest}",
+        "source_model": source_model,
+        "mean": mean.astype(np.float32),
+        "components": components,
+        "explained_variance": float(variance[:dim].sum() / variance.sum()),
+    }
+
+
+def project(embeddings, projection):
+    """Same transform as backend/projection.py: normalize, center, project, normalize"""
+    return normalize((normalize(embeddings) - projection["mean"]) @ projection["components"].T)
+
+
+def top_k_rows(queries, corpus, k, exclude=None):
+    """Exact cosine top-k corpus rows per query; exclude[i] is a row to skip for query i"""
+    scores = queries @ corpus.T
+    if exclude is not None:
+        scores[np.arange(len(queries)), exclude] = -np.inf
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def recall(full_queries, full_corpus, reduced_queries, reduced_corpus, k, exclude=None):
+    """Mean share of the full-dimension top-k that the reduced vectors also rank in their top-k"""
+    truth = top_k_rows(full_queries, full_corpus, k, exclude)
+    found = top_k_rows(reduced_queries, reduced_corpus, k, exclude)
+    return float(np.mean([len(set(t) & set(f)) / k for t, f in zip(truth, found)]))
+
+
+def evaluate(embeddings, prompt_embeddings, projection, ks=RECALL_K, movie_queries=EVAL_MOVIE_QUERIES, seed=SEED):
+    """Recall@k of the projection against the full-dimension baseline, for prompts and movies"""
+    corpus = normalize(embeddings)
+    reduced = project(embeddings, projection)
+
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(corpus), size=min(movie_queries, len(corpus)), replace=False)
+    query_sets = {"movies": (corpus[sample], reduced[sample], sample)}
+    if len(prompt_embeddings):
+        query_sets["prompts"] = (normalize(prompt_embeddings), project(prompt_embeddings, projection), None)
+
+    return {
+        name: {
+            f"recall@{k}": round(recall(full_q, corpus, reduced_q, reduced, k, exclude), 4)
+            for k in ks
+        }
+        for name, (full_q, reduced_q, exclude) in query_sets.items()
+    }
+
+
+def report_entry(embeddings, prompt_embeddings, projection):
+    dim = projection["components"].shape[0]
+    return {
+        "version": projection["version"],
+        "dim": dim,
+        "explained_variance": round(projection["explained_variance"], 4),
+        "bytes_per_vector": dim * 4,
+        "recall": evaluate(embeddings, prompt_embeddings, projection),
+    }
+
+
+def guarded_recall(entry):
+    """The recall the guard checks: the worst recall@10 over the query sets"""
+    return min(scores[f"recall@{max(RECALL_K)}"] for scores in entry["recall"].values())
+
+
+def fit_guarded(embeddings, prompt_embeddings, dim, min_recall=MIN_RECALL, source_model=MODEL_NAME):
+    """Fit a projection and return it with its report entry, refusing one that loses too much recall"""
+    projection = fit_projection(embeddings, dim, source_model)
+    entry = report_entry(embeddings, prompt_embeddings, projection)
+    assert guarded_recall(entry) >= min_recall, (
+        f"Projection to {dim} dims keeps recall@{max(RECALL_K)} {guarded_recall(entry):.3f} "
+        f"< MIN_RECALL {min_recall}; pick a larger PROJECTION_DIM (see {OUT_REPORT})"
+    )
+    return projection, entry
+
+
+def save_projection(projection, path=OUT_PROJECTION):
+    """Write the artifact next to the old one and swap it in atomically"""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f,
+                 version=np.array(projection["version"]),
+                 source_model=np.array(projection["source_model"]),
+                 mean=projection["mean"],
+                 components=projection["components"],
+                 explained_variance=np.array(projection["explained_variance"]))
+    os.replace(tmp, path)
+    print(f"✅ Saved projection {projection['version']} → {path}")
+
+
+def remove_projection(path=OUT_PROJECTION):
+    """Drop a projection left over from an earlier reduced-dimension ingestion"""
+    if os.path.exists(path):
+        os.remove(path)
+        print(f"Removed stale projection {path}")
+
+
+def write_report(entries, full_dim, movies, path=OUT_REPORT):
+    report = {"full_dim": full_dim, "full_bytes_per_vector": full_dim * 4, "movies": movies, "projections": entries}
+    Path(path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print(f"{'dim':>5} {'variance':>9} " + " ".join(
+        f"{name + ' r@' + str(k):>13}" for name in entries[0]["recall"] for k in RECALL_K))
+    for entry in entries:
+        print(f"{entry['dim']:>5} {entry['explained_variance']:>9.3f} " + " ".join(
+            f"{entry['recall'][name][f'recall@{k}']:>13.3f}" for name in entry["recall"] for k in RECALL_K))
+    print(f"✅ Wrote recall report → {path}")
+
+
+def load_eval_prompts(path=EVAL_PROMPTS_FILE):
+    if not Path(path).exists():
+        return []
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def main():
+    from embed_and_upload_local import load_texts, load_model
+
+    ids, texts, _ = load_texts(MOVIES_FILE)
+
+    model = load_model()
+    embeddings = model.encode(texts, show_progress_bar=True, batch_size=32, convert_to_numpy=True)
+    prompts = load_eval_prompts()
+    prompt_embeddings = model.encode(prompts, convert_to_numpy=True) if prompts else np.zeros((0, embeddings.shape[1]))
+
+    entries = [report_entry(embeddings, prompt_embeddings, fit_projection(embeddings, dim))
+               for dim in sorted(CANDIDATE_DIMS) if dim < embeddings.shape[1]]
+    write_report(entries, embeddings.shape[1], len(ids))
+
+    passing = [entry["dim"] for entry in entries if guarded_recall(entry) >= MIN_RECALL]
+    print(f"Sizes keeping recall@{max(RECALL_K)} >= MIN_RECALL {MIN_RECALL}: {passing or 'none'}; "
+          f"set PROJECTION_DIM in embed_and_upload_local.py and re-run it to apply one")
+
+
+if __name__ == "__main__":
+    main()
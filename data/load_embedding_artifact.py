@@ -0,0 +1,95 @@
+# load_embedding_artifact.py
+# Restores the movies collection from an artifact exported by
+# embed_and_upload_local.py (see embedding_artifact.py), without loading the
+# model or re-encoding anything: checks the model fingerprint against the
+# backend's Config.EMBEDDING_MODEL, recreates the collection with the same
+# HNSW settings and payload indexes, upserts the vectors in parallel batches,
+# and puts the catalog, projection and kNN graph files in place.
+#
+#     python load_embedding_artifact.py
+import shutil
+import time
+from pathlib import Path
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as rest
+
+from embed_and_upload_local import recreate_movies_collection, upload_points
+from embedding_artifact import model_fingerprint, read_manifest, read_artifact
+from build_knn_graph import update_graph_file, OUT_GRAPH
+from columnar_catalog import write_catalog
+from fit_projection import remove_projection, OUT_PROJECTION
+# on sys.path through embed_and_upload_local
+from config import Config
+
+# -------- CONFIG -------
+ARTIFACT_DIR = "embedding_artifact"
+QDRANT_URL = "http://localhost:6333"
+COLLECTION_NAME = "movies"
+BATCH = 512
+UPSERT_WORKERS = 8
+VERIFY_CHECKSUMS = True
+# Segments above this size (KB) get an HNSW index; indexing is paused during the
+# load and turned back on at this threshold (Qdrant's default) afterwards.
+INDEXING_THRESHOLD = 20000
+# -----------------------
+
+
+def check_fingerprint(manifest, model_name=Config.EMBEDDING_MODEL, dim=Config.EMBEDDING_DIM):
+    """Refuse an artifact encoded by a different model than the backend encodes prompts with"""
+    expected = model_fingerprint(model_name, dim)
+    assert manifest["model_fingerprint"] == expected, (
+        f"Artifact was encoded with {manifest['model_fingerprint']} but the backend uses {expected} "
+        f"(Config.EMBEDDING_MODEL); its vectors would not match encoded prompts. Re-run embed_and_upload_local.py"
+    )
+
+
+def install_file(artifact_dir, name, target):
+    """Copy a file out of the artifact next to its target, then swap it in"""
+    tmp = f"{target}.tmp"
+    shutil.copyfile(Path(artifact_dir) / name, tmp)
+    Path(tmp).replace(target)
+    print(f"✅ Installed {name} → {target}")
+
+
+def restore(client, artifact_dir=ARTIFACT_DIR, collection_name=COLLECTION_NAME,
+            batch_size=BATCH, workers=UPSERT_WORKERS, verify=VERIFY_CHECKSUMS):
+    start = time.perf_counter()
+    check_fingerprint(read_manifest(artifact_dir))
+    manifest, movie_ids, point_ids, vectors, payloads = read_artifact(artifact_dir, verify=verify)
+    print(f"🔹 Loaded {manifest['rows']} {manifest['dtype']} vectors ({manifest['model_fingerprint']}, "
+          f"projection {manifest['projection'] or 'none'}) in {time.perf_counter() - start:.1f}s")
+
+    # Build the HNSW index once at the end instead of while the points arrive
+    recreate_movies_collection(client, manifest["dim"], collection_name)
+    client.update_collection(collection_name=collection_name,
+                             optimizers_config=rest.OptimizersConfigDiff(indexing_threshold=0))
+    upload_start = time.perf_counter()
+    upload_points(client, point_ids, vectors, payloads, collection_name, batch_size, workers)
+    client.update_collection(collection_name=collection_name,
+                             optimizers_config=rest.OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD))
+    print(f"✅ Upserted {len(point_ids)} points in {time.perf_counter() - upload_start:.1f}s "
+          f"→ {collection_name} (HNSW indexing continues in the background)")
+
+    write_catalog(point_ids, payloads, vectors=vectors)
+
+    # The backend must project prompts with the same projection the vectors were reduced with
+    if "projection.npz" in manifest["files"]:
+        install_file(artifact_dir, "projection.npz", OUT_PROJECTION)
+    else:
+        remove_projection()
+
+    if "knn_graph.npz" in manifest["files"]:
+        install_file(artifact_dir, "knn_graph.npz", OUT_GRAPH)
+    else:
+        update_graph_file(movie_ids, point_ids, vectors)
+
+    print(f"✅ Restored {collection_name} from {artifact_dir} in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    restore(QdrantClient(url=QDRANT_URL))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# payload_schema.py
+# Declared payload schema for the Qdrant "movies" collection.
+# Ingestion normalizes every payload through normalize_movie_payload, and the
+# backend (backend/models.py, MOVIE_PAYLOAD_INDEXES) creates matching payload
+# indexes so filtered searches on rating, release year and genre stay fast.
+import math
+
+# field -> Qdrant payload index type ("keyword", "float", "integer"), None = stored only
+MOVIE_PAYLOAD_SCHEMA = {
+    "movie_id": "keyword",
+    "title": None,
+    "genre": "keyword",        # array of lowercase genre names
+    "rating": "float",
+    "release_date": "integer",  # release year
+    "runtime_min": None,
+    "url": None,
+    "ingestion_id": None,      # upload run; the columnar catalog records the same id
+}
+
+
+def _is_missing(value):
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    return isinstance(value, str) and not value.strip()
+
+
+def to_float(value):
+    if _is_missing(value):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_int(value):
+    number = to_float(value)
+    return int(number) if number is not None else None
+
+
+def to_genres(value):
+    """Normalize a genre list or comma-separated string to lowercase keywords"""
+    if _is_missing(value):
+        return []
+    if isinstance(value, str):
+        value = value.strip()
+        # Lists may arrive stringified from a CSV round trip: "['drama', 'crime']"
+        if value.startswith("[") and value.endswith("]"):
+            value = value[1:-1].replace("'", "").replace('"', "")
+        value = value.split(",")
+    genres = []
+    for genre in value:
+        genre = str(genre).strip().lower()
+        if genre and genre not in genres:
+            genres.append(genre)
+    return genres
+
+
+def normalize_movie_payload(meta):
+    """
+    Coerce a movie metadata dict to the declared schema.
+
+    Numeric fields that are empty or unparseable are left out of the payload
+    (rather than stored as ""), so range filters simply don't match them.
+    """
+    payload = {
+        "movie_id": str(meta.get("movie_id", "")).strip(),
+        "title": str(meta.get("title", "") or "").strip(),
+        "genre": to_genres(meta.get("genre")),
+        "url": str(meta.get("url", "") or "").strip(),
+    }
+    numeric = {
+        "rating": to_float(meta.get("rating")),
+        "release_date": to_int(meta.get("release_date")),
+        "runtime_min": to_int(meta.get("runtime_min")),
+    }
+    payload.update({key: value for key, value in numeric.items() if value is not None})
+    return payload
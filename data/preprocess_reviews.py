@@ -5,15 +5,22 @@ import hashlib
 from pathlib import Path
 from typing import List, Dict
 
+from review_dedup import NearDuplicateFilter, DedupReport, load_token_counter
+
 INPUT = "reviews.json"
 OUT_CLEAN = "reviews_cleaned.json"      # full structured output
 OUT_MAP = "reviews_map.json"            # movie_id -> combined_reviews (single string)
 OUT_FLAT = "reviews_flat.csv"           # each cleaned review as a row
+OUT_DEDUP_REPORT = "reviews_dedup_report.json"  # reviews/chars/tokens removed as duplicates
 
 # Configuration
 MIN_REVIEW_CHARS = 15       # drop reviews shorter than this
 MAX_REVIEWS_PER_MOVIE = None  # set to int to limit reviews per movie (None = keep all)
 TRUNCATION_PATTERNS = [r"\.\.\.Read all$", r"\.\.\. Read all$", r"\.{3}Read all$"]  # patterns to strip
+NEAR_DUP_THRESHOLD = 0.6    # MinHash-estimated character-shingle Jaccard above which a review is a near-duplicate (None = exact only)
+NEAR_DUP_ACROSS_MOVIES = True  # also drop reviews that near-duplicate another movie's review (copy-pasted spam)
+NEAR_DUP_MAX_INDEXED = 200_000  # reviews kept in the LSH index; bounds memory on large corpora
+TOKENIZER = "sentence-transformers/all-mpnet-base-v2"  # for the token counts in the report
 
 # ---------- helper functions ----------
 def clean_text(s: str) -> str:
@@ -40,6 +47,9 @@ p = Path(INPUT)
 if not p.exists():
     raise FileNotFoundError(f"{INPUT} not found in current directory.")
 
+# Loaded whole: the cleaned outputs are single JSON documents built in memory
+# below, so streaming the input would not lower peak memory by much. Only the
+# near-duplicate index is bounded (NEAR_DUP_MAX_INDEXED).
 with p.open("r", encoding="utf-8") as f:
     data = json.load(f)
 
@@ -47,6 +57,14 @@ if "movies" not in data or not isinstance(data["movies"], list):
     raise ValueError("Input JSON expected to contain top-level key 'movies' with a list.")
 
 # ---------- process ----------
+near_dups = NearDuplicateFilter(
+    threshold=NEAR_DUP_THRESHOLD,
+    max_indexed=NEAR_DUP_MAX_INDEXED,
+    cross_movie=NEAR_DUP_ACROSS_MOVIES
+) if NEAR_DUP_THRESHOLD is not None else None
+count_tokens, tokenizer_name = load_token_counter(TOKENIZER)
+report = DedupReport(count_tokens)
+
 cleaned_movies = []
 reviews_map: Dict[str, str] = {}
 flat_rows = []
@@ -72,9 +90,16 @@ for movie in data["movies"]:
 
         h = hash_text(txt)
         if h in seen_hashes:
+            report.remove("exact", txt)
             continue
         seen_hashes.add(h)
 
+        match = near_dups.check(movie_id, txt) if near_dups else None
+        if match:
+            report.remove(f"near_{match}", txt)
+            continue
+        report.keep(txt)
+
         cleaned_item = {
             "review_id": review_id or h[:16],
             "text": txt
@@ -116,6 +141,17 @@ with open(OUT_FLAT, "w", encoding="utf-8", newline="") as f:
     for row in flat_rows:
         writer.writerow(row)
 
+dedup_summary = report.summary(tokenizer_name)
+with open(OUT_DEDUP_REPORT, "w", encoding="utf-8") as f:
+    json.dump(dedup_summary, f, indent=2)
+
+removed = dedup_summary["removed"]
+print(f"Removed {removed['total']['reviews']} duplicate reviews "
+      f"({removed['exact']['reviews']} exact, {removed['near_within']['reviews']} near within a movie, "
+      f"{removed['near_across']['reviews']} near across movies): "
+      f"{removed['total']['chars']} chars, {removed['total']['tokens']} tokens ({tokenizer_name}) "
+      f"= {dedup_summary['removed_share']['tokens']:.1%} of the review tokens before embedding")
 print(f"Saved cleaned reviews -> {OUT_CLEAN}")
 print(f"Saved movie->combined mapping -> {OUT_MAP}")
 print(f"Saved flat reviews CSV -> {OUT_FLAT}")
+print(f"Saved dedup report -> {OUT_DEDUP_REPORT}")
@@ -0,0 +1,185 @@
+# review_dedup.py
+# Near-duplicate review detection with MinHash signatures and an LSH index,
+# used by preprocess_reviews.py after the exact (SHA-256) duplicate check.
+#
+# Each review is reduced to character shingles, hashed into a NUM_PERM-value
+# MinHash signature, and looked up in an LSH index (the signature split into
+# bands; reviews sharing any band are candidates). A candidate whose estimated
+# Jaccard similarity reaches the threshold makes the review a near-duplicate of
+# the earlier one, within the same movie or, with cross_movie=True, across movies.
+#
+# Character shingles keep a lightly edited copy close: a swapped word or a typo
+# changes about SHINGLE_CHARS shingles, where it knocks out up to five 5-word
+# shingles. Reposts with a few words changed score around 0.6-0.8, unrelated
+# reviews below 0.2. The bands are tuned to miss few pairs at the threshold,
+# since a candidate below it only costs one signature comparison.
+#
+# Reviews are checked one at a time, and the index keeps at most max_indexed
+# reviews (oldest evicted first), so the index stays at roughly
+# max_indexed * (NUM_PERM * 4 bytes + one bucket entry per band) whatever the
+# size of the corpus.
+import re
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# -------- CONFIG -------
+THRESHOLD = 0.6             # estimated Jaccard similarity of shingle sets
+NUM_PERM = 128              # MinHash signature length
+SHINGLE_CHARS = 5           # characters per shingle
+FALSE_NEGATIVE_WEIGHT = 0.8  # LSH tuning: cost of a missed pair relative to a wasted candidate check
+MAX_INDEXED = 200_000       # reviews kept in the LSH index
+SEED = 1
+# -----------------------
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def shingles(text, size=SHINGLE_CHARS):
+    """
+    Character shingles of the lowercased words, joined by single spaces so
+    punctuation and spacing don't matter; a review shorter than one shingle
+    is a single shingle
+    """
+    text = " ".join(_WORD_RE.findall(text.lower()))
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def lsh_params(threshold, num_perm, false_negative_weight=FALSE_NEGATIVE_WEIGHT):
+    """Bands and rows per band that best separate pairs above and below the threshold"""
+    def area(probability, start, end):
+        xs = np.linspace(start, end, 200)
+        return float(probability(xs).mean()) * (end - start)
+
+    best, best_error = None, None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            # Chance that a pair with similarity s shares at least one band
+            probability = lambda s: 1 - (1 - s ** rows) ** bands  # noqa: E731
+            false_positives = area(probability, 0.0, threshold)
+            false_negatives = area(lambda s: 1 - probability(s), threshold, 1.0)
+            error = (1 - false_negative_weight) * false_positives + false_negative_weight * false_negatives
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=SEED):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set),
+                             dtype=np.uint64, count=len(shingle_set))
+        # (a * x + b) mod p for every shingle and permutation, then the minimum per permutation
+        permuted = ((hashes[:, None] * self.a + self.b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateFilter:
+    """Streaming near-duplicate check over reviews, with a size-bounded LSH index"""
+
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM, shingle_chars=SHINGLE_CHARS,
+                 max_indexed=MAX_INDEXED, cross_movie=True, seed=SEED):
+        self.threshold = threshold
+        self.shingle_chars = shingle_chars
+        self.max_indexed = max_indexed
+        self.cross_movie = cross_movie
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        # band key -> refs of every indexed review with that band, oldest first
+        self._buckets = [{} for _ in range(self.bands)]
+        # ref -> (movie_id, signature), oldest first
+        self._indexed = OrderedDict()
+        self._next_ref = 0
+
+    def _band_keys(self, signature):
+        return [hash(signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def check(self, movie_id, text):
+        """
+        Return None for a new review (which is indexed), or 'within' / 'across'
+        when it is a near-duplicate of an earlier review of the same / another movie
+        """
+        signature = self.hasher.signature(shingles(text, self.shingle_chars))
+        keys = self._band_keys(signature)
+
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self._buckets[band].get(key, ()))
+        for ref in sorted(candidates):
+            other_movie, other_signature = self._indexed[ref]
+            if not self.cross_movie and other_movie != movie_id:
+                continue
+            if np.mean(other_signature == signature) >= self.threshold:
+                return "within" if other_movie == movie_id else "across"
+
+        self._add(movie_id, signature, keys)
+        return None
+
+    def _add(self, movie_id, signature, keys):
+        ref = self._next_ref
+        self._next_ref += 1
+        self._indexed[ref] = (movie_id, signature)
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(ref)
+
+        if len(self._indexed) > self.max_indexed:
+            old_ref, (_, old_signature) = self._indexed.popitem(last=False)
+            for band, key in enumerate(self._band_keys(old_signature)):
+                refs = self._buckets[band][key]
+                # The evicted review is the oldest, so it heads every bucket it is in
+                refs.pop(0)
+                if not refs:
+                    del self._buckets[band][key]
+
+
+def load_token_counter(tokenizer_name):
+    """Token counts with the embedding model's tokenizer, or a word/punctuation estimate without transformers"""
+    try:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+        return (lambda text: len(tokenizer.tokenize(text))), tokenizer_name
+    except Exception:
+        return (lambda text: len(_TOKEN_RE.findall(text))), "word/punctuation estimate"
+
+
+class DedupReport:
+    """Counts of the reviews, characters and tokens removed, by reason"""
+
+    REASONS = ("exact", "near_within", "near_across")
+
+    def __init__(self, count_tokens):
+        self.count_tokens = count_tokens
+        self.kept = {"reviews": 0, "chars": 0, "tokens": 0}
+        self.removed = {reason: {"reviews": 0, "chars": 0, "tokens": 0} for reason in self.REASONS}
+
+    def _add(self, counts, text):
+        counts["reviews"] += 1
+        counts["chars"] += len(text)
+        counts["tokens"] += self.count_tokens(text)
+
+    def keep(self, text):
+        self._add(self.kept, text)
+
+    def remove(self, reason, text):
+        self._add(self.removed[reason], text)
+
+    def summary(self, tokenizer):
+        removed = {key: sum(counts[key] for counts in self.removed.values()) for key in self.kept}
+        total = {key: self.kept[key] + removed[key] for key in self.kept}
+        return {
+            "tokenizer": tokenizer,
+            "kept": self.kept,
+            "removed": dict(self.removed, total=removed),
+            "removed_share": {key: round(removed[key] / total[key], 4) if total[key] else 0.0 for key in total},
+        }
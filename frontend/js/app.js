@@ -121,6 +121,27 @@ function displayWiliResult(data) {
     `;
 }
 
+// Cursor for the next page of the current recommendations, and how many are shown
+let recommendationsCursor = null;
+let recommendationsShown = 0;
+
+// Request a page of recommendations (filters for the first page, a cursor after that)
+async function fetchRecommendations(body) {
+    const response = await fetch(`${API_URL}/recommendations`, {
+        method: 'POST',
+        headers: getAuthHeaders(),
+        body: JSON.stringify(body)
+    });
+    
+    const data = await response.json();
+    
+    if (!response.ok) {
+        throw new Error(data.error || 'Failed to get recommendations');
+    }
+    
+    return data;
+}
+
 // Handle recommendations (Use Case B)
 async function handleRecommendations(e) {
     e.preventDefault();
@@ -139,19 +160,10 @@ async function handleRecommendations(e) {
         if (minYear) body.min_release_date = minYear;
         if (genre) body.genre = genre;
         
-        const response = await fetch(`${API_URL}/recommendations`, {
-            method: 'POST',
-            headers: getAuthHeaders(),
-            body: JSON.stringify(body)
-        });
-        
-        const data = await response.json();
+        const data = await fetchRecommendations(body);
         
-        if (!response.ok) {
-            throw new Error(data.error || 'Failed to get recommendations');
-        }
-        
-        displayRecommendations(data.recommendations);
+        recommendationsShown = 0;
+        displayRecommendations(data.recommendations, data.next_cursor, false);
         
     } catch (error) {
         showAlert(error.message, 'error');
@@ -160,16 +172,36 @@ async function handleRecommendations(e) {
     }
 }
 
-// Display recommendations
-function displayRecommendations(recommendations) {
+// Load the next page of the current recommendations
+async function loadMoreRecommendations() {
+    if (!recommendationsCursor) return;
+    
+    showLoading(true);
+    
+    try {
+        const data = await fetchRecommendations({ cursor: recommendationsCursor });
+        displayRecommendations(data.recommendations, data.next_cursor, true);
+    } catch (error) {
+        showAlert(error.message, 'error');
+    } finally {
+        showLoading(false);
+    }
+}
+
+// Display recommendations (append adds a page below the ones already shown)
+function displayRecommendations(recommendations, nextCursor, append) {
     const resultDiv = document.getElementById('recommendationsResult');
     
-    if (!recommendations || recommendations.length === 0) {
+    recommendationsCursor = nextCursor || null;
+    const moreButton = document.getElementById('moreRecommendations');
+    if (moreButton) moreButton.remove();
+    
+    if (!append && (!recommendations || recommendations.length === 0)) {
         resultDiv.innerHTML = '<p>No recommendations found. Try adjusting your filters.</p>';
         return;
     }
     
-    let html = '<h3 style="margin-top: 30px; margin-bottom: 20px;">Top Recommendations:</h3>';
+    let html = append ? '' : '<h3 style="margin-top: 30px; margin-bottom: 20px;">Top Recommendations:</h3>';
     
     recommendations.forEach((rec, index) => {
         // ✅ FIXED: Extract year from release_date (handles both integers and strings)
@@ -194,7 +226,7 @@ function displayRecommendations(recommendations) {
         
         html += `
             <div class="result-card">
-                <h3>${index + 1}. ${rec.movie_title}</h3>
+                <h3>${recommendationsShown + index + 1}. ${rec.movie_title}</h3>
                 <div class="score">
                     ${rec.similarity_score}% Match
                 </div>
@@ -222,7 +254,21 @@ function displayRecommendations(recommendations) {
         `;
     });
     
-    resultDiv.innerHTML = html;
+    recommendationsShown += recommendations.length;
+    
+    if (recommendationsCursor) {
+        html += `
+            <button id="moreRecommendations" class="btn-secondary" onclick="loadMoreRecommendations()" style="width: auto; padding: 15px 40px;">
+                Show more
+            </button>
+        `;
+    }
+    
+    if (append) {
+        resultDiv.insertAdjacentHTML('beforeend', html);
+    } else {
+        resultDiv.innerHTML = html;
+    }
 }
 
 // Show/hide loading